@@ -0,0 +1,67 @@
+"""
+Microbenchmark comparing the message encode/decode paths of the CSV and the
+binary emitter-receiver classes.
+
+The encode/decode steps are the exact operations performed by
+CSVSupervisorEnv/CSVRobot and BinarySupervisorEnv/BinaryRobot, so this
+script runs without Webots.
+
+Usage: python benchmarks/bench_binary_messages.py [--repeat N]
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+SIZES = [8, 64, 512, 4096]
+
+
+def csv_encode(data):
+    return (",".join(map(str, data))).encode("utf-8")
+
+
+def csv_decode(message):
+    # The user still has to convert every field to a float
+    return [float(value) for value in message.decode("utf-8").split(",")]
+
+
+def binary_encode(data, dtype=np.float32):
+    return np.ascontiguousarray(data, dtype=dtype).tobytes()
+
+
+def binary_decode(message, dtype=np.float32):
+    return np.frombuffer(message, dtype=dtype)
+
+
+def bench(function, argument, repeat):
+    timer = timeit.Timer(lambda: function(argument))
+    return min(timer.repeat(repeat=5, number=repeat)) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print("{:>6} | {:>12} {:>12} | {:>12} {:>12} | {:>8} {:>8}".format(
+        "size", "csv enc us", "csv dec us", "bin enc us", "bin dec us",
+        "bytes", "csv/bin"))
+    for size in SIZES:
+        data = np.random.uniform(-1.0, 1.0, size).tolist()
+        csv_message = csv_encode(data)
+        binary_message = binary_encode(data)
+
+        csv_enc = bench(csv_encode, data, args.repeat)
+        csv_dec = bench(csv_decode, csv_message, args.repeat)
+        bin_enc = bench(binary_encode, data, args.repeat)
+        bin_dec = bench(binary_decode, binary_message, args.repeat)
+
+        print("{:>6} | {:>12.2f} {:>12.2f} | {:>12.2f} {:>12.2f} | "
+              "{:>8} {:>8.1f}".format(
+                  size, csv_enc * 1e6, csv_dec * 1e6, bin_enc * 1e6,
+                  bin_dec * 1e6, len(binary_message),
+                  (csv_enc + csv_dec) / (bin_enc + bin_dec)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark of ImageObservation against the naive conversion of camera images
+to NumPy arrays, which allocates new arrays on every step.
+
+A stand-in camera returning random BGRA images is used, so this script runs
+without Webots.
+
+Usage, from the repository root:
+    PYTHONPATH=. python benchmarks/bench_image_observation.py [--repeat N]
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from deepbots.observations import ImageObservation
+
+RESOLUTIONS = [(64, 64), (128, 128), (320, 240), (640, 480)]
+FRAME_STACK = 4
+
+
+class FakeCamera:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.image = np.random.randint(0, 256, width * height * 4,
+                                       dtype=np.uint8).tobytes()
+
+    def getWidth(self):
+        return self.width
+
+    def getHeight(self):
+        return self.height
+
+    def getImage(self):
+        return self.image
+
+
+class NaiveObservation:
+    """
+    The conversion users typically write: a new array per step, a mean over
+    the color channels and np.roll for frame stacking.
+    """
+    def __init__(self, camera, frame_stack):
+        self.camera = camera
+        self.frames = np.zeros(
+            (frame_stack, camera.getHeight(), camera.getWidth()),
+            dtype=np.float32)
+
+    def update(self):
+        image = np.array(bytearray(self.camera.getImage()),
+                         dtype=np.uint8).reshape(
+                             (self.camera.getHeight(),
+                              self.camera.getWidth(), 4))
+        gray = image[..., :3].mean(axis=-1).astype(np.float32) / 255.0
+        self.frames = np.roll(self.frames, -1, axis=0)
+        self.frames[-1] = gray
+        return self.frames
+
+
+def bench(update, repeat):
+    timer = timeit.Timer(update)
+    return min(timer.repeat(repeat=5, number=repeat)) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print("{:>10} | {:>12} {:>12} {:>12} | {:>8}".format(
+        "resolution", "naive us", "rgb us", "gray us", "speedup"))
+    for width, height in RESOLUTIONS:
+        camera = FakeCamera(width, height)
+        naive = NaiveObservation(camera, FRAME_STACK)
+        rgb = ImageObservation(camera, frame_stack=FRAME_STACK)
+        gray = ImageObservation(camera,
+                                grayscale=True,
+                                frame_stack=FRAME_STACK)
+
+        naive_time = bench(naive.update, args.repeat)
+        rgb_time = bench(rgb.update, args.repeat)
+        gray_time = bench(gray.update, args.repeat)
+
+        print("{:>10} | {:>12.1f} {:>12.1f} {:>12.1f} | {:>8.1f}".format(
+            "{}x{}".format(width, height), naive_time * 1e6, rgb_time * 1e6,
+            gray_time * 1e6, naive_time / gray_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Import-time regression benchmark of the deepbots packages.
+
+Every import is timed in a fresh interpreter, the best of --repeat runs is
+reported. The stand-in controller module of benchmarks/fake_controller is
+used, so this script runs without Webots.
+
+The script exits with status 1 if a cold import of the robot controller
+classes takes longer than --budget-ms, or if it loads any of the heavy
+dependencies that robot controllers do not need (NumPy, gym,
+tensorboardX).
+
+Usage, from the repository root:
+    PYTHONPATH=. python benchmarks/bench_import_time.py [--repeat N]
+        [--budget-ms MS]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+FAKE_CONTROLLER = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "fake_controller")
+HEAVY_MODULES = ("numpy", "gym", "tensorboardX")
+
+# Statement timed, whether it is subject to the budget
+IMPORTS = [
+    ("import deepbots", True),
+    ("import deepbots.robots", True),
+    ("from deepbots.robots import CSVRobot", True),
+    ("import deepbots.supervisor.wrappers", True),
+    ("from deepbots.supervisor import RobotSupervisorEnv", False),
+    ("from deepbots.supervisor.wrappers import TensorboardLogger", False),
+]
+
+TIMER = """
+import json, sys, time
+start = time.perf_counter()
+{}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [name for name in {!r} if name in sys.modules]]))
+"""
+
+
+def time_import(statement):
+    """
+    :return: tuple, (seconds, heavy modules loaded) of the statement run in
+        a fresh interpreter
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [FAKE_CONTROLLER, os.getcwd(),
+         env.get("PYTHONPATH", "")]).rstrip(os.pathsep)
+    output = subprocess.run(
+        [sys.executable, "-c",
+         TIMER.format(statement, HEAVY_MODULES)],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        check=True,
+        universal_newlines=True).stdout
+    elapsed, heavy = json.loads(output.strip().splitlines()[-1])
+    return elapsed, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    failures = []
+    for statement, budgeted in IMPORTS:
+        try:
+            results = [time_import(statement) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError:
+            print("{:<60} failed".format(statement))
+            if budgeted:
+                failures.append(statement)
+            continue
+        elapsed = min(elapsed for elapsed, _ in results) * 1000
+        heavy = results[0][1]
+        print("{:<60} {:>8.1f} ms  {}".format(statement, elapsed,
+                                              ", ".join(heavy)))
+        if budgeted and (elapsed > args.budget_ms or heavy):
+            failures.append(statement)
+
+    if failures:
+        print("Over the {} ms budget or loading {}: {}".format(
+            args.budget_ms, ", ".join(HEAVY_MODULES), "; ".join(failures)))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
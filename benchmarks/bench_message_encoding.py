@@ -0,0 +1,230 @@
+"""
+Benchmark of the MessageEncoding stages against CSV and raw binary
+messages, in message size and encode + decode time per message.
+
+Messages are sensor arrays of which a fraction of the values changes on
+every step. Every encoding is round-tripped first: lossless encodings must
+reproduce the messages exactly, quantized ones within half a quantization
+step, and a decoder that misses a delta must recover on the next keyframe.
+A BinarySupervisorEnv with action_repeat must also decode the delta
+encoded observations of a BinaryRobot, running in lockstep with the
+stand-in controller module of benchmarks/fake_controller, without missing
+any although the packets of the intermediate timesteps are dropped. The
+script fails if any check does not hold.
+
+Usage, from the repository root:
+    PYTHONPATH=. python benchmarks/bench_message_encoding.py [--steps N]
+        [--changed FRACTION]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("DEEPBOTS_FAKE_TICK_COST", "0")
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                    "fake_controller"))
+
+import numpy as np  # noqa: E402
+
+from deepbots.comms.message_encoding import MessageEncoding  # noqa: E402
+from deepbots.robots.controllers.binary_robot import \
+    BinaryRobot  # noqa: E402
+from deepbots.supervisor.controllers.binary_supervisor_env import \
+    BinarySupervisorEnv  # noqa: E402
+
+SIZES = [16, 256, 4096]
+SCALE = 1000.0
+DTYPE = np.float32
+
+
+class CSVCodec:
+    """
+    The CSVRobot/CSVSupervisorEnv message format.
+    """
+    lossless = True
+
+    def encode(self, values):
+        return ",".join(map(str, values.tolist())).encode("utf-8")
+
+    def decode(self, message):
+        return np.array(str(message, "utf-8").split(","), dtype=DTYPE)
+
+
+class RawCodec:
+    """
+    The BinaryRobot/BinarySupervisorEnv message format.
+    """
+    lossless = True
+
+    def encode(self, values):
+        return np.ascontiguousarray(values, dtype=DTYPE).tobytes()
+
+    def decode(self, message):
+        return np.frombuffer(message, dtype=DTYPE)
+
+
+class EncodingCodec:
+    def __init__(self, **kwargs):
+        self.encoding = MessageEncoding(**kwargs)
+        self.lossless = self.encoding.scale is None
+        self.encoder = self.encoding.encoder(DTYPE)
+        self.decoder = self.encoding.decoder(DTYPE)
+
+    def encode(self, values):
+        return self.encoder.encode(values)
+
+    def decode(self, message):
+        return self.decoder.decode(message)
+
+
+CODECS = {
+    "csv": CSVCodec,
+    "raw": RawCodec,
+    "quantized": lambda: EncodingCodec(scale=SCALE),
+    "delta": lambda: EncodingCodec(delta=True),
+    "quantized_delta": lambda: EncodingCodec(scale=SCALE, delta=True),
+    "zlib": lambda: EncodingCodec(compression="zlib"),
+    "quantized_delta_zlib":
+    lambda: EncodingCodec(scale=SCALE, delta=True, compression="zlib"),
+}
+
+
+def make_messages(size, steps, changed, seed=0):
+    """
+    :return: np.ndarray of steps messages, a random walk in [-10, 10) where
+        only a fraction of the values changes between messages
+    """
+    random = np.random.RandomState(seed)
+    messages = np.empty((steps, size), dtype=DTYPE)
+    values = random.uniform(-10, 10, size).astype(DTYPE)
+    for step in range(steps):
+        mask = random.random_sample(size) < changed
+        values[mask] += random.normal(0, 0.1, mask.sum()).astype(DTYPE)
+        np.clip(values, -10, 10, out=values)
+        messages[step] = values
+    return messages
+
+
+def check_round_trip(name, codec, messages):
+    for values in messages:
+        decoded = codec.decode(codec.encode(values))
+        if codec.lossless:
+            assert np.array_equal(decoded, values), name
+        else:
+            assert np.abs(decoded - values).max() <= 0.5 / SCALE + 1e-6, name
+
+
+def check_delta_recovery(messages):
+    encoding = MessageEncoding(delta=True, keyframe_interval=10)
+    encoder = encoding.encoder(DTYPE)
+    decoder = encoding.decoder(DTYPE)
+    packets = [encoder.encode(values) for values in messages[:25]]
+    decoded = [decoder.decode(packet) for i, packet in enumerate(packets)
+               if i != 3]
+    # Messages 4 to 9 are deltas on the missed message 3, 10 is a keyframe
+    assert all(values is None for values in decoded[3:9])
+    assert decoder.messages_discarded == 6
+    for values, expected in zip(decoded[9:], messages[10:25]):
+        assert np.array_equal(values, expected)
+
+
+class ReplayRobot(BinaryRobot):
+    """
+    Sends the messages provided, one per timestep.
+    """
+    def __init__(self, messages, encoding):
+        super().__init__(observation_encoding=encoding)
+        self.messages = messages
+        self.sent = 0
+
+    def create_message(self):
+        self.sent += 1
+        return self.messages[self.sent - 1]
+
+    def use_message_data(self, message):
+        pass
+
+
+class ReplaySupervisor(BinarySupervisorEnv):
+    def __init__(self, messages, encoding, action_repeat):
+        super().__init__(observation_encoding=encoding,
+                         action_repeat=action_repeat)
+        self.robot = ReplayRobot(messages, encoding)
+
+    def _simulation_step(self, timestep):
+        # The robot controller runs in lockstep, as it does in Webots
+        super()._simulation_step(timestep)
+        self.robot.step(self.robot.timestep)
+        self.robot.handle_receiver()
+        self.robot.handle_emitter()
+
+    def get_observations(self):
+        return self.handle_receiver()
+
+    def get_default_observation(self):
+        return None
+
+    def get_reward(self, action):
+        return 0.0
+
+    def is_done(self):
+        return False
+
+    def get_info(self):
+        return {}
+
+
+def check_action_repeat(messages, action_repeat=3):
+    # Without decoding the dropped packets, the first delta after a
+    # dropped one could not be applied until the next keyframe
+    encoding = MessageEncoding(delta=True,
+                               keyframe_interval=len(messages) + 1)
+    env = ReplaySupervisor(messages, encoding, action_repeat)
+    try:
+        for _ in range(len(messages) // action_repeat):
+            observation = env.step([0.0])[0]
+            assert np.array_equal(observation,
+                                  messages[env.robot.sent - 1])
+        assert env.receive_stats.total_packets_dropped > 0
+        assert env._observation_decoder.messages_discarded == 0
+    finally:
+        env.close()
+
+
+def benchmark(codec, messages):
+    total_bytes = 0
+    start = time.perf_counter()
+    for values in messages:
+        message = codec.encode(values)
+        total_bytes += len(message)
+        codec.decode(message)
+    elapsed = time.perf_counter() - start
+    return total_bytes / len(messages), elapsed / len(messages) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--changed",
+                        type=float,
+                        default=0.1,
+                        help="Fraction of values changing per message")
+    args = parser.parse_args()
+
+    check_delta_recovery(make_messages(64, 25, args.changed))
+    check_action_repeat(make_messages(64, 30, args.changed))
+    print("{:>8} {:>22} {:>12} {:>14}".format("size", "encoding",
+                                               "bytes/msg", "us/msg"))
+    for size in SIZES:
+        messages = make_messages(size, args.steps, args.changed)
+        for name, make_codec in CODECS.items():
+            check_round_trip(name, make_codec(), messages)
+            message_bytes, micros = benchmark(make_codec(), messages)
+            print("{:>8} {:>22} {:>12.0f} {:>14.2f}".format(
+                size, name, message_bytes, micros))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Scaling benchmark of MultiRobotSupervisorEnv against a RobotSupervisorEnv
+that loops over Python lists of motors and sensors per robot, from 1 to 100
+robots with 2 wheel motors and 8 distance sensors each.
+
+Time per step and per robot is reported for step(), i.e. action
+application, one simulation tick and observation reading. The stand-in
+controller module of benchmarks/fake_controller is used, with no tick cost,
+so that only the Python overhead of deepbots is measured. Both
+environments are checked to apply the same velocities and read the same
+observations.
+
+Usage, from the repository root:
+    PYTHONPATH=. python benchmarks/bench_multi_robot.py [--steps N]
+        [--robots 1 10 100]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("DEEPBOTS_FAKE_TICK_COST", "0")
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                    "fake_controller"))
+
+import numpy as np  # noqa: E402
+from gym.spaces import Box  # noqa: E402
+
+from deepbots.supervisor.controllers.multi_robot_supervisor_env import \
+    MultiRobotSupervisorEnv  # noqa: E402
+from deepbots.supervisor.controllers.robot_supervisor_env import \
+    RobotSupervisorEnv  # noqa: E402
+
+MOTORS = ("left wheel motor", "right wheel motor")
+SENSORS = 8
+
+
+def device_names(robot):
+    motors = ["robot {} {}".format(robot, motor) for motor in MOTORS]
+    sensors = ["robot {} ds{}".format(robot, i) for i in range(SENSORS)]
+    return motors, sensors
+
+
+class LoopSupervisor(RobotSupervisorEnv):
+    """
+    The per-robot loops of a swarm controlled by a RobotSupervisorEnv.
+    """
+    def __init__(self, n_robots):
+        super().__init__()
+        self.observation_space = Box(-np.inf, np.inf, (n_robots, SENSORS))
+        self.action_space = Box(-1.0, 1.0, (n_robots, len(MOTORS)))
+        self.robots = []
+        for robot in range(n_robots):
+            motors, sensors = device_names(robot)
+            sensors = [self.getDevice(name) for name in sensors]
+            for sensor in sensors:
+                sensor.enable(self.timestep)
+            self.robots.append(
+                ([self.getDevice(name) for name in motors], sensors))
+
+    def apply_action(self, action):
+        for (motors, _), robot_action in zip(self.robots, action):
+            for motor, velocity in zip(motors, robot_action):
+                motor.setVelocity(float(velocity))
+
+    def get_observations(self):
+        return np.array([[sensor.getValue() for sensor in sensors]
+                         for _, sensors in self.robots])
+
+    def get_default_observation(self):
+        return self.get_observations()
+
+    def get_reward(self, action):
+        return np.zeros(len(self.robots))
+
+    def is_done(self):
+        return False
+
+    def get_info(self):
+        return {}
+
+
+class VectorizedSupervisor(MultiRobotSupervisorEnv):
+    def __init__(self, n_robots):
+        super().__init__()
+        self.observation_space = Box(-np.inf, np.inf, (n_robots, SENSORS))
+        self.action_space = Box(-1.0, 1.0, (n_robots, len(MOTORS)))
+        for robot in range(n_robots):
+            self.register_robot(*device_names(robot))
+
+    def get_reward(self, action):
+        self.rewards[...] = 0.0
+        return self.rewards
+
+    def is_done(self):
+        return False
+
+    def get_info(self):
+        return {}
+
+
+def check_equivalence(n_robots):
+    actions = np.random.RandomState(0).uniform(-1, 1, (n_robots, len(MOTORS)))
+    velocities, observations = [], []
+    for env in (LoopSupervisor(n_robots), VectorizedSupervisor(n_robots)):
+        env.reset()
+        observation = env.step(actions)[0]
+        assert observation.shape == (n_robots, SENSORS)
+        observations.append(observation)
+        velocities.append([
+            env.getDevice(name).velocity for robot in range(n_robots)
+            for name in device_names(robot)[0]
+        ])
+    assert velocities[0] == velocities[1] == actions.ravel().tolist()
+    assert np.array_equal(observations[0], observations[1])
+
+
+def benchmark(env, steps):
+    actions = np.random.RandomState(0).uniform(
+        -1, 1, (steps, ) + env.action_space.shape)
+    env.reset()
+    start = time.perf_counter()
+    for action in actions:
+        env.step(action)
+    return (time.perf_counter() - start) / steps * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--robots",
+                        type=int,
+                        nargs="+",
+                        default=[1, 2, 5, 10, 20, 50, 100])
+    args = parser.parse_args()
+
+    check_equivalence(3)
+    print("{:>8} {:>14} {:>14} {:>16} {:>16}".format("robots", "loop us/step",
+                                                     "vec us/step",
+                                                     "loop us/robot",
+                                                     "vec us/robot"))
+    for n_robots in args.robots:
+        loop = benchmark(LoopSupervisor(n_robots), args.steps)
+        vectorized = benchmark(VectorizedSupervisor(n_robots), args.steps)
+        print("{:>8} {:>14.1f} {:>14.1f} {:>16.2f} {:>16.2f}".format(
+            n_robots, loop, vectorized, loop / n_robots,
+            vectorized / n_robots))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Benchmark of RemoteEnv against an EnvServer serving a RobotSupervisorEnv in
+another process, over TCP and Unix sockets, in steps per second for the
+blocking step() and for pipelined steps, step_many() batches of
+--in-flight steps.
+
+The server process uses the stand-in controller module of
+benchmarks/fake_controller with no tick cost, so that the overhead of the
+remote protocol is measured. Before measuring, the observations, rewards,
+dones and infos received remotely are checked against the ones of a local
+environment, including across episode ends with auto_reset, and an
+exception raised by the served environment must reach the client.
+
+Usage, from the repository root:
+    PYTHONPATH=. python benchmarks/bench_remote_env.py [--steps N]
+        [--sizes 4 1024] [--in-flight 16]
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DEEPBOTS_FAKE_TICK_COST", "0")
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                    "fake_controller"))
+
+import numpy as np  # noqa: E402
+from gym.spaces import Box  # noqa: E402
+
+from deepbots.remote.env_server import EnvServer  # noqa: E402
+from deepbots.remote.remote_env import RemoteEnv  # noqa: E402
+from deepbots.supervisor.controllers.robot_supervisor_env import \
+    RobotSupervisorEnv  # noqa: E402
+
+EPISODE_LENGTH = 50
+ACTION_SIZE = 2
+
+
+class BenchRobotSupervisor(RobotSupervisorEnv):
+    def __init__(self, observation_size):
+        super().__init__()
+        self.observation_space = Box(-np.inf, np.inf, (observation_size, ))
+        self.action_space = Box(-1.0, 1.0, (ACTION_SIZE, ))
+        self.observation = np.zeros(observation_size, dtype=np.float32)
+        self.motor = self.getDevice("motor")
+        self.steps = 0
+
+    def apply_action(self, action):
+        if not np.all(np.isfinite(action)):
+            raise ValueError("Received a non-finite action")
+        self.motor.setVelocity(float(action[0]))
+
+    def get_observations(self):
+        self.observation[0] = self.getTime()
+        self.observation[1] = self.motor.getVelocity()
+        return self.observation
+
+    def get_default_observation(self):
+        self.steps = 0
+        return self.observation
+
+    def get_reward(self, action):
+        return float(action[1])
+
+    def is_done(self):
+        self.steps += 1
+        return self.steps >= EPISODE_LENGTH
+
+    def get_info(self):
+        return {"steps": self.steps}
+
+
+def serve(address, observation_size, ready):
+    server = EnvServer(BenchRobotSupervisor(observation_size),
+                       address,
+                       auto_reset=True)
+    ready.put(server.address)
+    server.serve()
+
+
+def start_server(address, observation_size):
+    ctx = mp.get_context("spawn")
+    ready = ctx.Queue()
+    process = ctx.Process(target=serve,
+                          args=(address, observation_size, ready),
+                          daemon=True)
+    process.start()
+    bound = ready.get(timeout=60)
+    if isinstance(bound, tuple):
+        address = "tcp://{}:{}".format(*bound)
+    return process, address
+
+
+def check_remote(address, observation_size, actions):
+    local = BenchRobotSupervisor(observation_size)
+    remote = RemoteEnv(address)
+    assert remote.observation_space == local.observation_space
+    assert remote.action_space == local.action_space
+
+    assert np.array_equal(remote.reset(), local.reset())
+    half = len(actions) // 2
+    results = [remote.step(action) for action in actions[:half]]
+    for action in actions[half:half + 3]:
+        remote.step_async(action)
+    results.extend(remote.step_wait() for _ in range(3))
+    results.extend(remote.step_many(actions[half + 3:]))
+
+    for action, (observation, reward, done, info) in zip(actions, results):
+        expected = local.step(action)
+        if expected[2]:
+            expected[3]["terminal_observation"] = expected[0].copy()
+            local.reset()
+        assert np.array_equal(observation, expected[0])
+        assert (reward, done) == expected[1:3]
+        assert info.keys() == expected[3].keys()
+        assert info["steps"] == expected[3]["steps"]
+
+    try:
+        remote.step(np.full(ACTION_SIZE, np.nan))
+    except RuntimeError as error:
+        assert "non-finite" in str(error)
+    else:
+        raise AssertionError("The server exception did not reach the client")
+    remote.close()
+
+
+def benchmark(address, actions, in_flight):
+    remote = RemoteEnv(address, max_in_flight=in_flight)
+    remote.reset()
+    start = time.perf_counter()
+    for action in actions:
+        remote.step(action)
+    blocking = len(actions) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    remote.step_many(actions)
+    pipelined = len(actions) / (time.perf_counter() - start)
+    remote.close()
+    return blocking, pipelined
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=5000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 1024])
+    parser.add_argument("--in-flight", type=int, default=16)
+    args = parser.parse_args()
+
+    actions = np.random.RandomState(0).uniform(-1, 1,
+                                               (args.steps, ACTION_SIZE))
+    with tempfile.TemporaryDirectory() as directory:
+        addresses = {
+            "tcp": "tcp://127.0.0.1:0",
+            "unix": "unix://" + os.path.join(directory, "deepbots.sock"),
+        }
+        print("{:>8} {:>8} {:>16} {:>16}".format("size", "socket",
+                                                 "blocking steps/s",
+                                                 "pipelined steps/s"))
+        for size in args.sizes:
+            for name, address in addresses.items():
+                process, address = start_server(address, size)
+                try:
+                    check_remote(address, size, actions[:3 * EPISODE_LENGTH])
+                    blocking, pipelined = benchmark(address, actions,
+                                                    args.in_flight)
+                finally:
+                    process.terminate()
+                    process.join()
+                print("{:>8} {:>8} {:>16.0f} {:>16.0f}".format(
+                    size, name, blocking, pipelined))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Check and scaling benchmark of ReplicatedArenaSupervisorEnv, from 1 to 64
+copies of an arena holding one robot that moves by its action every
+timestep. Episodes of copy i last i + 2 steps, so that copies are done and
+reset at different steps.
+
+Before timing, the environment is checked to import the N copies from the
+template, return stacked observations, rewards and dones, reset only the
+done copies, providing their last observation as
+info["terminal_observation"], and return copies of its preallocated arrays
+unless copy=False, in which case they alias each other across steps.
+
+Time per step and per copy is reported for step(), i.e. action
+application, one simulation tick and the collection of the results of all
+copies. The stand-in controller module of benchmarks/fake_controller is
+used, with no tick cost, so that only the Python overhead of deepbots is
+measured.
+
+Usage, from the repository root:
+    PYTHONPATH=. python benchmarks/bench_replicated_arena.py [--steps N]
+        [--arenas 1 8 64]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("DEEPBOTS_FAKE_TICK_COST", "0")
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                    "fake_controller"))
+
+import numpy as np  # noqa: E402
+from gym.spaces import Box  # noqa: E402
+
+from deepbots.supervisor.controllers.replicated_arena_supervisor_env import \
+    ReplicatedArenaSupervisorEnv  # noqa: E402
+
+TEMPLATE = """DEF ARENA_$index Pose {
+  translation $x $y $z
+  children [ DEF ROBOT_$index Robot { } ]
+}"""
+
+
+class MovingRobotArenas(ReplicatedArenaSupervisorEnv):
+    """
+    Copies of an arena whose robot is moved by its action, the observation
+    of a copy being the position of its robot.
+    """
+    def __init__(self, n_arenas, copy=True):
+        super().__init__(n_arenas,
+                         TEMPLATE, ["ROBOT_$index"],
+                         spacing=10.0,
+                         copy=copy)
+        self.observation_space = Box(-np.inf, np.inf, (3, ))
+        self.action_space = Box(-1.0, 1.0, (3, ))
+        self.translations = [
+            self.getFromDef("ROBOT_{}".format(index)).getField("translation")
+            for index in range(n_arenas)
+        ]
+
+    def apply_arena_action(self, index, action):
+        translation = self.translations[index]
+        translation.setSFVec3f(
+            [value + delta for value, delta in zip(
+                translation.getSFVec3f(), action)])
+
+    def get_arena_observations(self, index):
+        return self.translations[index].getSFVec3f()
+
+    def get_arena_default_observation(self, index):
+        return self.get_arena_observations(index)
+
+    def get_arena_reward(self, index, action):
+        return float(index)
+
+    def is_arena_done(self, index):
+        return self.arena_steps[index] >= index + 2
+
+    def get_arena_info(self, index):
+        return {"index": index}
+
+
+def check(n_arenas=3):
+    env = MovingRobotArenas(n_arenas)
+    children = env.getRoot().getField("children")
+    assert children.getCount() == n_arenas
+    assert [children.getMFNode(index).getDef()
+            for index in range(n_arenas)] == [
+                "ARENA_{}".format(index) for index in range(n_arenas)
+            ]
+    assert env.arena_def_names == [["ROBOT_{}".format(index)]
+                                   for index in range(n_arenas)]
+    assert len(np.unique(env.arena_positions, axis=0)) == n_arenas
+
+    observations = env.reset()
+    assert observations.shape == (n_arenas, 3)
+    assert not observations.any()
+
+    actions = np.ones((n_arenas, 3))
+    for step in range(1, 3):
+        observations, rewards, dones, infos = env.step(actions)
+        assert observations.shape == (n_arenas, 3)
+        assert rewards.tolist() == list(map(float, range(n_arenas)))
+        assert dones.dtype == bool and dones.shape == (n_arenas, )
+        assert [info["index"] for info in infos] == list(range(n_arenas))
+    # Copy 0 is done on the second step and reset, the others keep going
+    assert dones.tolist() == [True] + [False] * (n_arenas - 1)
+    assert infos[0]["terminal_observation"].tolist() == [2.0] * 3
+    assert not observations[0].any()
+    assert env.arena_steps[0] == 0
+    for index in range(1, n_arenas):
+        assert "terminal_observation" not in infos[index]
+        assert observations[index].tolist() == [2.0] * 3
+        assert env.arena_steps[index] == 2
+
+    # The arrays returned are copies, unless copy=False
+    previous = env.step(actions)
+    current = env.step(actions)
+    for before, after in zip(previous[:3], current[:3]):
+        assert before is not after
+    assert not np.array_equal(previous[0], current[0])
+
+    env = MovingRobotArenas(n_arenas, copy=False)
+    env.reset()
+    previous = env.step(actions)
+    current = env.step(actions)
+    for before, after in zip(previous[:3], current[:3]):
+        assert before is after
+
+
+def benchmark(env, steps):
+    actions = np.random.RandomState(0).uniform(
+        -1, 1, (steps, env.n_arenas) + env.action_space.shape)
+    env.reset()
+    start = time.perf_counter()
+    for action in actions:
+        env.step(action)
+    return (time.perf_counter() - start) / steps * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--arenas",
+                        type=int,
+                        nargs="+",
+                        default=[1, 2, 4, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    check()
+    print("{:>8} {:>14} {:>14} {:>16}".format("arenas", "copy us/step",
+                                              "view us/step",
+                                              "copy us/arena"))
+    for n_arenas in args.arenas:
+        copied = benchmark(MovingRobotArenas(n_arenas), args.steps)
+        viewed = benchmark(MovingRobotArenas(n_arenas, copy=False),
+                           args.steps)
+        print("{:>8} {:>14.1f} {:>14.1f} {:>16.2f}".format(
+            n_arenas, copied, viewed, copied / n_arenas))
+
+
+if __name__ == "__main__":
+    main()
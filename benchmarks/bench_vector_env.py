@@ -0,0 +1,159 @@
+"""
+Check and benchmark of DeepbotsVectorEnv, running RobotSupervisorEnvs in
+worker processes with the stand-in controller module of
+benchmarks/fake_controller, with no tick cost.
+
+Before measuring, the vector environment is checked to reset the
+environments that are done, with their last observation in
+info["terminal_observation"] even though the environments reuse their
+observation array, and to raise a RuntimeError when a worker exits in the
+middle of a step, after reading the replies of the other workers.
+
+Steps per second of the whole vector environment are then reported for
+several numbers of workers.
+
+Usage, from the repository root:
+    PYTHONPATH=. python benchmarks/bench_vector_env.py [--steps N]
+        [--envs 1 2 4]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("DEEPBOTS_FAKE_TICK_COST", "0")
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                    "fake_controller"))
+
+import numpy as np  # noqa: E402
+from gym.spaces import Box  # noqa: E402
+
+from deepbots.supervisor.controllers.robot_supervisor_env import \
+    RobotSupervisorEnv  # noqa: E402
+from deepbots.vector.subproc_vector_env import \
+    DeepbotsVectorEnv  # noqa: E402
+
+EPISODE_LENGTH = 3
+OBSERVATION_SIZE = 4
+# Actions above this value make CrashingSupervisor exit
+CRASH_ACTION = 0.5
+
+
+class CountingSupervisor(RobotSupervisorEnv):
+    """
+    Observes the number of steps of the episode, in an array that is reused
+    by every step and reset.
+    """
+    def __init__(self):
+        super().__init__()
+        self.observation_space = Box(-np.inf, np.inf, (OBSERVATION_SIZE, ))
+        self.action_space = Box(-1.0, 1.0, (1, ))
+        self.observation = np.zeros(OBSERVATION_SIZE)
+        self.steps = 0
+
+    def reset(self):
+        self.steps = 0
+        return super().reset()
+
+    def apply_action(self, action):
+        self.steps += 1
+
+    def get_observations(self):
+        self.observation[...] = self.steps
+        return self.observation
+
+    def get_default_observation(self):
+        return self.get_observations()
+
+    def get_reward(self, action):
+        return 1.0
+
+    def is_done(self):
+        return self.steps >= EPISODE_LENGTH
+
+    def get_info(self):
+        return {}
+
+
+class CrashingSupervisor(CountingSupervisor):
+    def apply_action(self, action):
+        if action[0] > CRASH_ACTION:
+            os._exit(1)
+        super().apply_action(action)
+
+
+def check_auto_reset():
+    env = DeepbotsVectorEnv([CountingSupervisor, CountingSupervisor])
+    try:
+        observations = env.reset()
+        assert observations.shape == (2, OBSERVATION_SIZE)
+        assert not observations.any()
+        actions = np.zeros((2, 1))
+        for step in range(1, EPISODE_LENGTH + 1):
+            observations, rewards, dones, infos = env.step(actions)
+            assert rewards.tolist() == [1.0, 1.0]
+        assert dones.tolist() == [True, True]
+        # The new episode is observed, the last one is in the infos
+        assert not observations.any()
+        for info in infos:
+            assert info["terminal_observation"].tolist() == [
+                float(EPISODE_LENGTH)
+            ] * OBSERVATION_SIZE
+        observations, _, dones, infos = env.step(actions)
+        assert not dones.any() and "terminal_observation" not in infos[0]
+        assert (observations == 1.0).all()
+    finally:
+        env.close()
+
+
+def check_worker_crash():
+    env = DeepbotsVectorEnv(
+        [CountingSupervisor, CrashingSupervisor, CountingSupervisor])
+    try:
+        env.reset()
+        try:
+            env.step([[0.0], [1.0], [0.0]])
+        except RuntimeError as error:
+            assert "Worker 1" in str(error) and "exited" in str(error)
+        else:
+            raise AssertionError("The crash of worker 1 was not reported")
+        # The replies of the other workers were read
+        assert env._pending is None
+        for index in (0, 2):
+            assert not env.parent_pipes[index].poll()
+    finally:
+        env.close(terminate=True)
+
+
+def benchmark(n_envs, steps):
+    env = DeepbotsVectorEnv([CountingSupervisor] * n_envs)
+    try:
+        actions = np.zeros((n_envs, 1))
+        env.reset()
+        start = time.perf_counter()
+        for _ in range(steps):
+            env.step(actions)
+        return steps / (time.perf_counter() - start)
+    finally:
+        env.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--envs", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    check_auto_reset()
+    check_worker_crash()
+    print("{:>6} {:>14} {:>18}".format("envs", "steps/s",
+                                       "env steps/s"))
+    for n_envs in args.envs:
+        steps_per_second = benchmark(n_envs, args.steps)
+        print("{:>6} {:>14.0f} {:>18.0f}".format(
+            n_envs, steps_per_second, steps_per_second * n_envs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Check of WebotsPool without Webots: a fake "webots" executable is put first
+on PATH, it records its command line, listens on the port it is given and
+then sleeps until it is terminated.
+
+The pool is checked to allocate distinct free ports, skipping ports that
+are in use, to launch one process per instance with its port and the
+world, to leave instances that never reported a step alone, to restart an
+instance that stopped reporting steps through its heartbeat file, or whose
+process exited, on the same port, and to stop every process and remove the
+heartbeat files on close(). The time the monitor thread took to restart
+the stalled instance is reported.
+
+Usage, from the repository root:
+    PYTHONPATH=. python benchmarks/bench_webots_pool.py
+        [--stall-timeout SECONDS]
+"""
+import argparse
+import os
+import shutil
+import socket
+import stat
+import sys
+import tempfile
+import time
+
+from deepbots.launcher.heartbeat import Heartbeat
+from deepbots.launcher.webots_pool import WebotsPool
+
+FAKE_WEBOTS = """#!{python}
+import os
+import socket
+import sys
+import time
+
+port = int([arg for arg in sys.argv if arg.startswith("--port=")][0][7:])
+listener = socket.socket()
+listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+listener.bind(("localhost", port))
+listener.listen(1)
+with open(os.environ["FAKE_WEBOTS_LOG"], "a") as log:
+    log.write("{{}} {{}}\\n".format(os.getpid(), " ".join(sys.argv[1:])))
+while True:
+    time.sleep(1)
+"""
+
+
+def wait_for(condition, timeout=10.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            raise AssertionError("Timed out waiting for the pool")
+        time.sleep(0.02)
+
+
+def read_log(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as log:
+        return [line.split(" ", 1) for line in log.read().splitlines()]
+
+
+def check(directory, stall_timeout):
+    webots = os.path.join(directory, "webots")
+    with open(webots, "w") as webots_file:
+        webots_file.write(FAKE_WEBOTS.format(python=sys.executable))
+    os.chmod(webots, os.stat(webots).st_mode | stat.S_IEXEC)
+    os.environ["PATH"] = directory + os.pathsep + os.environ["PATH"]
+    log = os.path.join(directory, "webots.log")
+
+    # The first port tried is taken, it must be skipped
+    taken = socket.socket()
+    taken.bind(("", 0))
+    base_port = taken.getsockname()[1]
+
+    pool = WebotsPool("world.wbt",
+                      3,
+                      base_port=base_port,
+                      stall_timeout=stall_timeout,
+                      check_interval=stall_timeout / 10,
+                      env={"FAKE_WEBOTS_LOG": log})
+    try:
+        ports = [instance.port for instance in pool.instances]
+        assert len(set(ports)) == 3 and base_port not in ports
+        assert all(port > base_port for port in ports)
+        assert pool.controller_urls == [
+            "tcp://localhost:{}/supervisor".format(port) for port in ports
+        ]
+
+        pool.start()
+        wait_for(lambda: len(read_log(log)) == 3)
+        for instance in pool.instances:
+            assert instance.alive
+            assert "--port={} world.wbt".format(
+                instance.port) in dict(read_log(log))[str(
+                    instance.process.pid)]
+
+        # Instances that never stepped are not considered stalled
+        time.sleep(stall_timeout * 2)
+        assert [instance.restarts for instance in pool.instances] == [0] * 3
+
+        # Instance 0 steps, as a controller would, then stalls
+        heartbeat = Heartbeat(pool.heartbeat_files[0])
+        heartbeat.beat(10)
+        wait_for(lambda: pool.instances[0].total_steps == 10)
+        pid = pool.instances[0].process.pid
+        stalled_at = time.monotonic()
+        wait_for(lambda: pool.instances[0].restarts == 1)
+        restart_delay = time.monotonic() - stalled_at
+        assert pool.instances[0].process.pid != pid
+        assert pool.instances[0].port == ports[0]
+        assert heartbeat.read() == 0
+        heartbeat.close()
+        wait_for(lambda: len(read_log(log)) == 4)
+
+        # A process that exits is restarted
+        pool.instances[2].process.kill()
+        wait_for(lambda: pool.instances[2].restarts == 1)
+        assert pool.instances[1].restarts == 0
+        processes = [instance.process for instance in pool.instances]
+    finally:
+        pool.close()
+        taken.close()
+
+    assert all(process.poll() is not None for process in processes)
+    assert not os.path.exists(os.path.dirname(pool.heartbeat_files[0]))
+    return restart_delay
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stall-timeout", type=float, default=0.5)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="deepbots_fake_webots_")
+    try:
+        restart_delay = check(directory, args.stall_timeout)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("stalled instance restarted after {:.2f} s, stall_timeout "
+          "{:.2f} s".format(restart_delay, args.stall_timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+A pure-Python stand-in for the Webots `controller` module, implementing
+the subset of its API used by deepbots so that deepbots environments can be
+benchmarked and exercised without the simulator.
+
+Put this directory first on sys.path (or PYTHONPATH) before importing
+deepbots. Every Robot/Supervisor.step() call advances the simulation time of
+that controller. Supervisor.step() also busy-waits TICK_COST seconds to
+emulate the cost of the physics step, which robot controllers stepped in
+lockstep with it share. It is configurable through the
+DEEPBOTS_FAKE_TICK_COST environment variable or by setting
+controller.TICK_COST. Supervisors start in the fast simulation mode, in the
+real-time mode steps are paced to the wall clock.
+
+Emitters deliver packets immediately to every enabled receiver on the same
+channel, except the ones of the sending robot. Supervisor nodes are created
+on demand by getFromDef(), or by importing node strings into MF fields, in
+which case only the DEF names of the string are parsed.
+"""
+import os
+import re
+import time
+import weakref
+from collections import deque
+
+TICK_COST = float(os.environ.get("DEEPBOTS_FAKE_TICK_COST", "0.0"))
+BASIC_TIME_STEP = 32
+
+_receivers = weakref.WeakSet()
+
+
+def _busy_wait(seconds):
+    if seconds <= 0:
+        return
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class Device:
+    def __init__(self, name, robot):
+        self.name = name
+        self.robot = robot
+        self.sampling_period = 0
+
+    def getName(self):
+        return self.name
+
+    def enable(self, sampling_period):
+        self.sampling_period = sampling_period
+
+    def disable(self):
+        self.sampling_period = 0
+
+    def getSamplingPeriod(self):
+        return self.sampling_period
+
+
+class Emitter(Device):
+    CHANNEL_BROADCAST = -1
+
+    def __init__(self, name, robot):
+        super().__init__(name, robot)
+        self.channel = 0
+
+    def send(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        data = bytes(data)
+        for receiver in _receivers:
+            if (receiver.robot is not self.robot
+                    and receiver.sampling_period > 0
+                    and (self.channel == self.CHANNEL_BROADCAST
+                         or receiver.channel in (self.channel, -1))):
+                receiver.queue.append(data)
+        return 1
+
+    def getChannel(self):
+        return self.channel
+
+    def setChannel(self, channel):
+        self.channel = channel
+
+
+class Receiver(Device):
+    CHANNEL_BROADCAST = -1
+
+    def __init__(self, name, robot):
+        super().__init__(name, robot)
+        self.channel = 0
+        self.queue = deque()
+        _receivers.add(self)
+
+    def getQueueLength(self):
+        return len(self.queue)
+
+    def getBytes(self):
+        return self.queue[0]
+
+    getData = getBytes
+
+    def getString(self):
+        return self.queue[0].decode("utf-8")
+
+    def nextPacket(self):
+        self.queue.popleft()
+
+    def getChannel(self):
+        return self.channel
+
+    def setChannel(self, channel):
+        self.channel = channel
+
+
+class Keyboard:
+    SHIFT = 1 << 16
+    CONTROL = 1 << 17
+    ALT = 1 << 18
+
+    def __init__(self, sampling_period=None):
+        self.sampling_period = sampling_period or 0
+
+    def enable(self, sampling_period):
+        self.sampling_period = sampling_period
+
+    def disable(self):
+        self.sampling_period = 0
+
+    def getKey(self):
+        return -1
+
+
+class Motor(Device):
+    def __init__(self, name, robot):
+        super().__init__(name, robot)
+        self.position = 0.0
+        self.velocity = 0.0
+        self.torque = 0.0
+
+    def setPosition(self, position):
+        self.position = position
+
+    def setVelocity(self, velocity):
+        self.velocity = velocity
+
+    def setTorque(self, torque):
+        self.torque = torque
+
+    def getTargetPosition(self):
+        return self.position
+
+    def getVelocity(self):
+        return self.velocity
+
+
+class DistanceSensor(Device):
+    def getValue(self):
+        return 0.0
+
+
+class PositionSensor(Device):
+    def getValue(self):
+        return 0.0
+
+
+class Camera(Device):
+    def __init__(self, name, robot, width=64, height=64):
+        super().__init__(name, robot)
+        self.width = width
+        self.height = height
+        self.image = bytes(width * height * 4)
+
+    def getWidth(self):
+        return self.width
+
+    def getHeight(self):
+        return self.height
+
+    def getImage(self):
+        return self.image
+
+
+_DEVICE_CLASSES = {
+    "emitter": Emitter,
+    "receiver": Receiver,
+    "motor": Motor,
+    "camera": Camera,
+    "distance sensor": DistanceSensor,
+    "position sensor": PositionSensor,
+}
+
+
+class Robot:
+    def __init__(self):
+        self.time = 0.0
+        self.devices = {}
+
+    def step(self, duration=None):
+        if duration is None:
+            duration = BASIC_TIME_STEP
+        # deepbots calls Robot.step() on supervisors, bypassing overrides
+        if isinstance(self, Supervisor):
+            _busy_wait(TICK_COST)
+            if self.mode == Supervisor.SIMULATION_MODE_REAL_TIME:
+                time.sleep(duration / 1000.0)
+        self.time += duration / 1000.0
+        return 0
+
+    def getTime(self):
+        return self.time
+
+    def getBasicTimeStep(self):
+        return float(BASIC_TIME_STEP)
+
+    def getName(self):
+        return "robot"
+
+    def getDevice(self, name):
+        """
+        Creates devices on demand, the device type is guessed from the name,
+        e.g. "emitter", "left motor", "camera", defaulting to a
+        DistanceSensor.
+        """
+        if name not in self.devices:
+            device_class = DistanceSensor
+            for key, candidate in _DEVICE_CLASSES.items():
+                if key in name.lower():
+                    device_class = candidate
+                    break
+            self.devices[name] = device_class(name, self)
+        return self.devices[name]
+
+
+class Field:
+    def __init__(self, type_name, value):
+        self.type_name = type_name
+        self.value = value
+
+    def getTypeName(self):
+        return self.type_name
+
+    def __getattr__(self, name):
+        # getSFVec3f, setSFRotation, etc.
+        if name.startswith("getSF"):
+            return lambda: self.value
+        if name.startswith("setSF"):
+            return lambda value: setattr(self, "value", value)
+        raise AttributeError(name)
+
+
+class MFNodeField(Field):
+    def __init__(self, supervisor):
+        super().__init__("MFNode", [])
+        self.supervisor = supervisor
+
+    def getCount(self):
+        return len(self.value)
+
+    def getMFNode(self, index):
+        return self.value[index]
+
+    def importMFNodeFromString(self, position, node_string):
+        nodes = [
+            self.supervisor.getFromDef(def_name)
+            for def_name in re.findall(r"\bDEF\s+(\S+)", node_string)
+        ]
+        node = nodes[0] if nodes else Node()
+        if position < 0:
+            self.value.append(node)
+        else:
+            self.value.insert(position, node)
+
+    def removeMF(self, index):
+        del self.value[index]
+
+
+class Node:
+    def __init__(self, def_name=""):
+        self.def_name = def_name
+        self.fields = {
+            "translation": Field("SFVec3f", [0.0, 0.0, 0.0]),
+            "rotation": Field("SFRotation", [0.0, 0.0, 1.0, 0.0]),
+        }
+        self.velocity = [0.0] * 6
+
+    def getDef(self):
+        return self.def_name
+
+    def getField(self, name):
+        return self.fields.get(name)
+
+    def getPosition(self):
+        return list(self.fields["translation"].value)
+
+    def getOrientation(self):
+        return [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0]
+
+    def getVelocity(self):
+        return list(self.velocity)
+
+    def setVelocity(self, velocity):
+        self.velocity = list(velocity)
+
+    def getCenterOfMass(self):
+        return self.getPosition()
+
+    def resetPhysics(self):
+        self.velocity = [0.0] * 6
+
+
+class Supervisor(Robot):
+    SIMULATION_MODE_PAUSE = 0
+    SIMULATION_MODE_REAL_TIME = 1
+    SIMULATION_MODE_FAST = 2
+
+    def __init__(self):
+        super().__init__()
+        self.nodes = {}
+        self.mode = self.SIMULATION_MODE_FAST
+
+    def getFromDef(self, def_name):
+        if def_name not in self.nodes:
+            self.nodes[def_name] = Node(def_name)
+        return self.nodes[def_name]
+
+    def getRoot(self):
+        if "ROOT" not in self.nodes:
+            root = Node("ROOT")
+            root.fields = {"children": MFNodeField(self)}
+            self.nodes["ROOT"] = root
+        return self.nodes["ROOT"]
+
+    def getSelf(self):
+        return self.getFromDef("SELF")
+
+    def simulationReset(self):
+        self.time = 0.0
+        for node in self.nodes.values():
+            node.resetPhysics()
+
+    def simulationResetPhysics(self):
+        for node in self.nodes.values():
+            node.resetPhysics()
+
+    def simulationGetMode(self):
+        return self.mode
+
+    def simulationSetMode(self, mode):
+        self.mode = mode
@@ -0,0 +1,277 @@
+"""
+Offline benchmark suite of the deepbots environments, measuring steps per
+second and per-step latency without Webots.
+
+The stand-in controller module in benchmarks/fake_controller is put on
+sys.path before deepbots is imported, its step() busy-waits --tick-cost
+seconds to emulate the physics step, so that the overhead of deepbots itself
+is measured with --tick-cost 0 and realistic ratios with a larger one.
+
+The benchmarks run are:
+    robot_supervisor: RobotSupervisorEnv
+    csv: CSVSupervisorEnv with a CSVRobot stepped in lockstep in the same
+        process
+    keyboard_printer: KeyboardPrinter wrapping RobotSupervisorEnv
+    tensorboard_logger: TensorboardLogger wrapping RobotSupervisorEnv,
+        skipped if tensorboardX is not installed
+    trajectory_recorder: TrajectoryRecorder wrapping RobotSupervisorEnv
+
+Each one is run for every observation size, results are printed as JSON,
+or written to --output, so that they can be compared across commits.
+
+Usage, from the repository root:
+    PYTHONPATH=. python benchmarks/run_benchmarks.py [--steps N]
+        [--sizes 4 64 1024] [--tick-cost SECONDS] [--output results.json]
+        [--benchmarks csv ...]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                    "fake_controller"))
+
+import controller  # noqa: E402
+
+from deepbots.robots.controllers.csv_robot import CSVRobot  # noqa: E402
+from deepbots.supervisor.controllers.csv_supervisor_env import \
+    CSVSupervisorEnv  # noqa: E402
+from deepbots.supervisor.controllers.robot_supervisor_env import \
+    RobotSupervisorEnv  # noqa: E402
+
+EPISODE_LENGTH = 200
+ACTION_SIZE = 2
+
+
+class BenchRobotSupervisor(RobotSupervisorEnv):
+    def __init__(self, observation_size):
+        super().__init__()
+        self.observation = np.zeros(observation_size)
+        self.motor = self.getDevice("motor")
+        self.steps = 0
+
+    def apply_action(self, action):
+        self.motor.setVelocity(action[0])
+
+    def get_observations(self):
+        self.observation[0] = self.getTime()
+        return self.observation
+
+    def get_default_observation(self):
+        self.steps = 0
+        return self.observation
+
+    def get_reward(self, action):
+        return 1.0
+
+    def is_done(self):
+        self.steps += 1
+        return self.steps >= EPISODE_LENGTH
+
+    def get_info(self):
+        return {}
+
+
+class BenchCSVRobot(CSVRobot):
+    def __init__(self, observation_size):
+        super().__init__()
+        self.message = [0.0] * observation_size
+        self.motor = self.getDevice("motor")
+
+    def create_message(self):
+        self.message[0] = self.getTime()
+        return self.message
+
+    def use_message_data(self, message):
+        self.motor.setVelocity(float(message[0]))
+
+
+class BenchCSVSupervisor(CSVSupervisorEnv):
+    def __init__(self, observation_size):
+        super().__init__()
+        self.robot = BenchCSVRobot(observation_size)
+        self.observation = [0.0] * observation_size
+        self.steps = 0
+
+    def _simulation_step(self, timestep):
+        # The robot controller runs in lockstep, as it does in Webots
+        super()._simulation_step(timestep)
+        self.robot.step(self.robot.timestep)
+        self.robot.handle_receiver()
+        self.robot.handle_emitter()
+
+    def get_observations(self):
+        message = self.handle_receiver()
+        if message is not None:
+            self.observation = [float(value) for value in message]
+        return self.observation
+
+    def get_default_observation(self):
+        self.steps = 0
+        return self.observation
+
+    def get_reward(self, action):
+        return 1.0
+
+    def is_done(self):
+        self.steps += 1
+        return self.steps >= EPISODE_LENGTH
+
+    def get_info(self):
+        return {}
+
+
+def make_robot_supervisor(observation_size):
+    return BenchRobotSupervisor(observation_size), None
+
+
+def make_csv(observation_size):
+    return BenchCSVSupervisor(observation_size), None
+
+
+def make_keyboard_printer(observation_size):
+    from deepbots.supervisor.wrappers.keyboard_printer import \
+        KeyboardPrinter
+    return KeyboardPrinter(BenchRobotSupervisor(observation_size)), None
+
+
+def make_tensorboard_logger(observation_size):
+    from deepbots.supervisor.wrappers.tensorboard_wrapper import \
+        TensorboardLogger
+    log_dir = tempfile.mkdtemp(prefix="deepbots_bench_")
+    env = TensorboardLogger(BenchRobotSupervisor(observation_size),
+                            log_dir=log_dir,
+                            v_action=2,
+                            v_observation=1,
+                            v_reward=2)
+
+    def cleanup():
+        env.close()
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    return env, cleanup
+
+
+def make_trajectory_recorder(observation_size):
+    from deepbots.supervisor.wrappers.trajectory_recorder import \
+        TrajectoryRecorder
+    path = tempfile.mkdtemp(prefix="deepbots_bench_")
+    env = TrajectoryRecorder(BenchRobotSupervisor(observation_size),
+                             os.path.join(path, "recording"))
+
+    def cleanup():
+        env.close()
+        shutil.rmtree(path, ignore_errors=True)
+
+    return env, cleanup
+
+
+BENCHMARKS = {
+    "robot_supervisor": make_robot_supervisor,
+    "csv": make_csv,
+    "keyboard_printer": make_keyboard_printer,
+    "tensorboard_logger": make_tensorboard_logger,
+    "trajectory_recorder": make_trajectory_recorder,
+}
+
+
+def run_benchmark(env, steps):
+    """
+    Steps the environment steps times, resetting it when episodes end, and
+    times every step() call, resets are not included.
+
+    :return: dict of the step rate and latency statistics in microseconds
+    """
+    action = np.ones(ACTION_SIZE)
+    latencies = np.empty(steps)
+    env.reset()
+    for i in range(steps):
+        start = time.perf_counter()
+        _, _, done, _ = env.step(action)
+        latencies[i] = time.perf_counter() - start
+        if done:
+            env.reset()
+
+    latencies *= 1e6
+    return {
+        "steps": steps,
+        "steps_per_second": steps / (latencies.sum() / 1e6),
+        "latency_us": {
+            "mean": float(latencies.mean()),
+            "p50": float(np.percentile(latencies, 50)),
+            "p90": float(np.percentile(latencies, 90)),
+            "p99": float(np.percentile(latencies, 99)),
+            "max": float(latencies.max()),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=5000)
+    parser.add_argument("--sizes",
+                        type=int,
+                        nargs="+",
+                        default=[4, 64, 1024])
+    parser.add_argument("--tick-cost",
+                        type=float,
+                        default=controller.TICK_COST,
+                        help="Seconds busy-waited per simulation step")
+    parser.add_argument("--benchmarks",
+                        nargs="+",
+                        choices=list(BENCHMARKS),
+                        default=list(BENCHMARKS))
+    parser.add_argument("--output", help="Path of the JSON results file")
+    args = parser.parse_args()
+
+    controller.TICK_COST = args.tick_cost
+
+    results = []
+    for name in args.benchmarks:
+        for size in args.sizes:
+            try:
+                env, cleanup = BENCHMARKS[name](size)
+            except ImportError as error:
+                print("Skipping {}: {}".format(name, error), file=sys.stderr)
+                break
+            try:
+                # Wrappers such as KeyboardPrinter print on every reset
+                with open(os.devnull, "w") as devnull, \
+                        contextlib.redirect_stdout(devnull):
+                    result = run_benchmark(env, args.steps)
+            finally:
+                if cleanup is not None:
+                    cleanup()
+            result.update(benchmark=name, observation_size=size)
+            results.append(result)
+            print("{:>20} {:>6} {:>12.0f} steps/s {:>10.1f} us p99".format(
+                name, size, result["steps_per_second"],
+                result["latency_us"]["p99"]),
+                  file=sys.stderr)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "tick_cost": args.tick_cost,
+        "results": results,
+    }
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
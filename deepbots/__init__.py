@@ -1 +1,9 @@
+from deepbots._lazy import lazy_attributes
+
 __version__ = "1.0.0"
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    name: "deepbots." + name
+    for name in ("comms", "launcher", "observations", "remote", "robots",
+                 "supervisor", "trajectories", "vector")
+})
@@ -0,0 +1,36 @@
+import importlib
+import sys
+
+
+def lazy_attributes(package_name, attributes):
+    """
+    Creates the module-level __getattr__ and __dir__ functions (PEP 562) of
+    a package, so that the modules defining its public attributes are only
+    imported on first access. This keeps importing deepbots packages cheap,
+    e.g. for robot controllers that never use gym or tensorboardX.
+
+    :param package_name: The __name__ of the package
+    :param attributes: dict mapping attribute names to the absolute names of
+        the modules defining them, or of the subpackages they name
+    :return: tuple, (__getattr__, __dir__, __all__) of the package, __all__
+        being the sorted attribute names, so that star imports import them
+    """
+    def __getattr__(name):
+        module_name = attributes.get(name)
+        if module_name is None:
+            raise AttributeError("module {!r} has no attribute {!r}".format(
+                package_name, name))
+        module = importlib.import_module(module_name)
+        if module_name == "{}.{}".format(package_name, name):
+            # The attribute is a subpackage
+            value = module
+        else:
+            value = getattr(module, name)
+        # Cached so that __getattr__ is only called once per attribute
+        setattr(sys.modules[package_name], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package_name])) | set(attributes))
+
+    return __getattr__, __dir__, sorted(attributes)
@@ -0,0 +1,16 @@
+from deepbots._lazy import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    "MessageDecoder": "deepbots.comms.message_encoding",
+    "MessageEncoder": "deepbots.comms.message_encoding",
+    "MessageEncoding": "deepbots.comms.message_encoding",
+    "AggregateAllPolicy": "deepbots.comms.receive_policy",
+    "FIFOPolicy": "deepbots.comms.receive_policy",
+    "LatestOnlyPolicy": "deepbots.comms.receive_policy",
+    "ReceivePolicy": "deepbots.comms.receive_policy",
+    "ReceiveStats": "deepbots.comms.receive_policy",
+    "SharedMemoryEmitter": "deepbots.comms.shared_memory_transport",
+    "SharedMemoryReceiver": "deepbots.comms.shared_memory_transport",
+    "SharedMemoryTransport": "deepbots.comms.shared_memory_transport",
+    "SpaceCodec": "deepbots.comms.space_codec",
+})
@@ -0,0 +1,241 @@
+import struct
+import zlib
+
+import numpy as np
+
+# Message header: flags, sequence number and number of values
+_HEADER = struct.Struct("<BII")
+_KEYFRAME = 1
+_COMPRESSED = 2
+
+COMPRESSIONS = (None, "zlib", "lz4")
+
+
+class MessageEncoding:
+    """
+    An encoding of fixed-size numeric messages, e.g. the observations sent
+    by a BinaryRobot or the actions sent by a BinarySupervisorEnv, that
+    combines three optional stages:
+
+    - quantization: values are multiplied by scale, rounded and stored as
+      quantized_dtype integers, saturating at its range. scale can be a
+      single value or one value per field of the message.
+    - delta encoding: only the values that changed since the previous
+      message are sent, along with a bitmask of the changed fields. A
+      keyframe with all values is sent every keyframe_interval messages, or
+      whenever it is smaller than the delta.
+    - compression: payloads of at least compress_threshold bytes are
+      compressed with zlib, or lz4 which requires the lz4 package, when that
+      makes them smaller.
+
+    Every message carries a sequence number. The Webots radio delivers
+    packets in order, so deltas refer to the previous message. A decoder
+    that missed a message, e.g. because a receive policy dropped it,
+    discards deltas until the next keyframe. BinaryRobot and
+    BinarySupervisorEnv therefore decode the packets their receive policy
+    drops, e.g. on the intermediate timesteps of action_repeat, through
+    ReceivePolicy.on_drop.
+
+    Both sides must use the same encoding, each creates the stateful
+    MessageEncoder or MessageDecoder of its direction through encoder() and
+    decoder().
+    """
+    def __init__(self,
+                 scale=None,
+                 quantized_dtype="<i2",
+                 delta=False,
+                 keyframe_interval=100,
+                 compression=None,
+                 compress_threshold=256,
+                 compression_level=1):
+        """
+        :param scale: The quantization scale, a value or an array-like with
+            one value per field, defaults to None, i.e. no quantization
+        :param quantized_dtype: The integer dtype of quantized values,
+            defaults to "<i2"
+        :param delta: Whether delta encoding is used, defaults to False
+        :param keyframe_interval: Send a keyframe every that many messages
+            when delta encoding, defaults to 100
+        :param compression: None, "zlib" or "lz4", defaults to None
+        :param compress_threshold: The minimum payload size in bytes that is
+            compressed, defaults to 256
+        :param compression_level: The zlib compression level, defaults to 1
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError("Unknown compression {}, expected one of "
+                             "{}".format(compression, COMPRESSIONS))
+        if int(keyframe_interval) < 1:
+            raise ValueError("keyframe_interval must be a positive integer, "
+                             "got {}".format(keyframe_interval))
+        self.scale = None if scale is None else np.asarray(scale,
+                                                           dtype=np.float64)
+        self.quantized_dtype = np.dtype(quantized_dtype)
+        if self.scale is not None and self.quantized_dtype.kind not in "iu":
+            raise ValueError("quantized_dtype must be an integer dtype, got "
+                             "{}".format(self.quantized_dtype))
+        self.delta = delta
+        self.keyframe_interval = int(keyframe_interval)
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self.compression_level = compression_level
+
+        self._compress, self._decompress = _compressor(compression,
+                                                       compression_level)
+
+    def encoder(self, dtype):
+        """
+        :param dtype: The dtype of the values encoded, a numeric dtype
+        :return: MessageEncoder
+        """
+        return MessageEncoder(self, dtype)
+
+    def decoder(self, dtype):
+        """
+        :param dtype: The dtype of the decoded values, a numeric dtype
+        :return: MessageDecoder
+        """
+        return MessageDecoder(self, dtype)
+
+    def wire_dtype(self, dtype):
+        """
+        :param dtype: The dtype of the values encoded
+        :return: The dtype of the values on the wire
+        """
+        dtype = np.dtype(dtype)
+        if dtype.kind not in "biuf" or dtype.shape or dtype.names:
+            raise ValueError("Only plain numeric dtypes can be encoded, got "
+                             "{}".format(dtype))
+        if self.scale is not None:
+            return self.quantized_dtype.newbyteorder("<")
+        return dtype.newbyteorder("<")
+
+
+class MessageEncoder:
+    """
+    Encodes the messages of one direction, see MessageEncoding.
+    """
+    def __init__(self, encoding, dtype):
+        self.encoding = encoding
+        self.dtype = np.dtype(dtype)
+        self.wire_dtype = encoding.wire_dtype(self.dtype)
+        self.sequence = 0
+        self.keyframes_sent = 0
+        self._state = None
+        self._keyframe_requested = False
+        if encoding.scale is not None:
+            info = np.iinfo(self.wire_dtype)
+            self._bounds = (info.min, info.max)
+
+    def request_keyframe(self):
+        """
+        Makes the next message a keyframe.
+        """
+        self._keyframe_requested = True
+
+    def encode(self, values):
+        """
+        :param values: array-like of the message values, flattened
+        :return: bytes, the encoded message
+        """
+        encoding = self.encoding
+        values = np.asarray(values, dtype=self.dtype).reshape(-1)
+        if encoding.scale is not None:
+            wire = np.multiply(values, encoding.scale)
+            np.rint(wire, out=wire)
+            np.clip(wire, *self._bounds, out=wire)
+            wire = wire.astype(self.wire_dtype)
+        else:
+            wire = values.astype(self.wire_dtype)
+
+        flags = _KEYFRAME
+        payload = None
+        if encoding.delta:
+            if (self._state is not None and len(self._state) == len(wire)
+                    and not self._keyframe_requested
+                    and self.sequence % encoding.keyframe_interval != 0):
+                changed = wire != self._state
+                payload = (np.packbits(changed).tobytes() +
+                           wire[changed].tobytes())
+                if len(payload) < wire.nbytes:
+                    flags = 0
+                else:
+                    payload = None
+            self._state = wire
+            self._keyframe_requested = False
+        if payload is None:
+            payload = wire.tobytes()
+            self.keyframes_sent += 1
+
+        if (encoding.compression is not None
+                and len(payload) >= encoding.compress_threshold):
+            compressed = encoding._compress(payload)
+            if len(compressed) < len(payload):
+                payload = compressed
+                flags |= _COMPRESSED
+
+        message = _HEADER.pack(flags, self.sequence, len(wire)) + payload
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        return message
+
+
+class MessageDecoder:
+    """
+    Decodes the messages of one direction, see MessageEncoding.
+    """
+    def __init__(self, encoding, dtype):
+        self.encoding = encoding
+        self.dtype = np.dtype(dtype)
+        self.wire_dtype = encoding.wire_dtype(self.dtype)
+        self.messages_discarded = 0
+        self._state = None
+        self._last_sequence = None
+
+    def decode(self, message):
+        """
+        :param message: bytes-like, an encoded message
+        :return: np.ndarray of the decoded values, None if the message is a
+            delta that cannot be applied since a message was missed
+        """
+        flags, sequence, size = _HEADER.unpack_from(message)
+        payload = memoryview(message)[_HEADER.size:]
+        if flags & _COMPRESSED:
+            payload = self.encoding._decompress(payload)
+
+        if flags & _KEYFRAME:
+            wire = np.frombuffer(payload, dtype=self.wire_dtype, count=size)
+            if self.encoding.delta:
+                self._state = wire.copy()
+        else:
+            if (self._state is None or len(self._state) != size
+                    or sequence != (self._last_sequence + 1) & 0xFFFFFFFF):
+                self._state = None
+                self.messages_discarded += 1
+                return None
+            mask_size = (size + 7) // 8
+            changed = np.unpackbits(np.frombuffer(payload,
+                                                  dtype=np.uint8,
+                                                  count=mask_size),
+                                    count=size).view(bool)
+            self._state[changed] = np.frombuffer(payload,
+                                                 dtype=self.wire_dtype,
+                                                 offset=mask_size)
+            wire = self._state
+        self._last_sequence = sequence
+
+        if self.encoding.scale is not None:
+            return np.divide(wire, self.encoding.scale).astype(self.dtype,
+                                                              copy=False)
+        return wire.astype(self.dtype)
+
+
+def _compressor(compression, level):
+    if compression == "lz4":
+        try:
+            import lz4.frame
+        except ImportError:
+            raise ImportError(
+                "lz4 compression requires the lz4 package, install it with "
+                "pip install lz4") from None
+        return (lambda data: lz4.frame.compress(data),
+                lambda data: lz4.frame.decompress(data))
+    return (lambda data: zlib.compress(data, level), zlib.decompress)
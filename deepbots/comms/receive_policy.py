@@ -0,0 +1,194 @@
+from collections import deque
+
+
+class ReceiveStats:
+    """
+    Counters describing how the receiver queue was handled on the last
+    receive call, used to detect stale observations and size timesteps.
+
+    queue_length: Number of packets in the queue before receiving
+    packets_read: Number of packets returned to the controller
+    packets_dropped: Number of packets discarded without being used
+    total_packets_dropped: Number of packets discarded since the start
+    observation_age: Simulation time in seconds since the newest packet
+        used so far arrived, None if no packet has been used yet. Arrival
+        times are recorded when a packet is first seen in the queue, so
+        they are accurate to one receive call.
+    """
+    def __init__(self):
+        self.queue_length = 0
+        self.packets_read = 0
+        self.packets_dropped = 0
+        self.total_packets_dropped = 0
+        self.observation_age = None
+
+    def as_dict(self):
+        """
+        :return: dict, the counters keyed by name, e.g. to be added to the
+            info returned by get_info()
+        """
+        return {
+            "queue_length": self.queue_length,
+            "packets_read": self.packets_read,
+            "packets_dropped": self.packets_dropped,
+            "total_packets_dropped": self.total_packets_dropped,
+            "observation_age": self.observation_age,
+        }
+
+
+class ReceivePolicy:
+    """
+    Base class of the policies that decide which packets of a Webots
+    receiver queue are used on each step.
+
+    Subclasses implement _select() using the _read() and _drop() helpers.
+    Policies with aggregate set to True return all packets read, the rest
+    return at most one.
+
+    If on_drop is set, it is called with every packet dropped, by receive()
+    or skip(), before it is discarded, e.g. to keep a delta decoder in sync
+    with the sender, see deepbots.comms.message_encoding.
+    """
+    aggregate = False
+
+    def __init__(self):
+        self.stats = ReceiveStats()
+        self.on_drop = None
+        self._arrival_times = deque()
+        self._observation_arrival = None
+        self._skipped_packets = 0
+
+    def receive(self, receiver, time):
+        """
+        Reads packets from the receiver according to the policy and updates
+        the stats.
+
+        :param receiver: The Webots receiver device
+        :param time: The current simulation time in seconds
+        :return: list of bytes, the packets to be used, oldest first
+        """
+        queue_length = self._track_arrivals(receiver, time)
+
+        stats = self.stats
+        stats.queue_length = queue_length
+        # Packets dropped by skip() since the last call are counted too
+        stats.packets_dropped = self._skipped_packets
+        self._skipped_packets = 0
+        messages = self._select(receiver, queue_length)
+        stats.packets_read = len(messages)
+        stats.total_packets_dropped += stats.packets_dropped
+        if self._observation_arrival is not None:
+            stats.observation_age = time - self._observation_arrival
+        return messages
+
+    def skip(self, receiver, time):
+        """
+        Called on timesteps whose observations are not used, e.g. the
+        intermediate timesteps of action_repeat, so that packets do not pile
+        up in the queue. Drops all packets but the newest one, which is kept
+        for the next receive() call, passing them to on_drop if it is set.
+
+        :param receiver: The Webots receiver device
+        :param time: The current simulation time in seconds
+        """
+        queue_length = self._track_arrivals(receiver, time)
+        for _ in range(queue_length - 1):
+            self._discard(receiver)
+            self._skipped_packets += 1
+
+    def _track_arrivals(self, receiver, time):
+        """
+        Records the arrival time of the packets that are new in the queue.
+
+        :return: int, the queue length
+        """
+        queue_length = receiver.getQueueLength()
+        new_packets = queue_length - len(self._arrival_times)
+        if new_packets < 0:
+            # Packets were consumed outside of the policy
+            self._arrival_times.clear()
+            new_packets = queue_length
+        self._arrival_times.extend([time] * new_packets)
+        return queue_length
+
+    def _select(self, receiver, queue_length):
+        """
+        :param receiver: The Webots receiver device
+        :param queue_length: The number of packets in the queue
+        :return: list of bytes, the packets to be used, oldest first
+        """
+        raise NotImplementedError
+
+    def _read(self, receiver):
+        message = _get_bytes(receiver)
+        receiver.nextPacket()
+        self._observation_arrival = self._arrival_times.popleft()
+        return message
+
+    def _drop(self, receiver):
+        self._discard(receiver)
+        self.stats.packets_dropped += 1
+
+    def _discard(self, receiver):
+        if self.on_drop is not None:
+            self.on_drop(_get_bytes(receiver))
+        receiver.nextPacket()
+        self._arrival_times.popleft()
+
+
+class FIFOPolicy(ReceivePolicy):
+    """
+    Uses the oldest packet in the queue on every step. If max_depth is set,
+    the oldest packets beyond max_depth are dropped first so that the
+    observations used are never older than max_depth steps.
+
+    With max_depth set to None this is the original deepbots behavior.
+    """
+    def __init__(self, max_depth=None):
+        """
+        :param max_depth: The maximum number of packets kept in the queue,
+            defaults to None, i.e. unbounded
+        """
+        super().__init__()
+        self.max_depth = max_depth
+
+    def _select(self, receiver, queue_length):
+        if queue_length == 0:
+            return []
+        if self.max_depth is not None:
+            for _ in range(queue_length - self.max_depth):
+                self._drop(receiver)
+        return [self._read(receiver)]
+
+
+class LatestOnlyPolicy(ReceivePolicy):
+    """
+    Drains the queue on every step and uses only the newest packet.
+    """
+    def _select(self, receiver, queue_length):
+        if queue_length == 0:
+            return []
+        for _ in range(queue_length - 1):
+            self._drop(receiver)
+        return [self._read(receiver)]
+
+
+class AggregateAllPolicy(ReceivePolicy):
+    """
+    Drains the queue on every step and uses all packets, oldest first.
+    """
+    aggregate = True
+
+    def skip(self, receiver, time):
+        # All packets are used by the next receive() call
+        pass
+
+    def _select(self, receiver, queue_length):
+        return [self._read(receiver) for _ in range(queue_length)]
+
+
+def _get_bytes(receiver):
+    try:
+        return receiver.getBytes()
+    except AttributeError:
+        return receiver.getData()
@@ -0,0 +1,337 @@
+import struct
+import time
+import warnings
+from collections import deque
+
+# Ring header: sequence number of the next packet to be written
+_HEADER = struct.Struct("<Q")
+# Slot header: sequence number, sender simulation time and payload length
+_SLOT_HEADER = struct.Struct("<QdI4x")
+
+
+class SharedMemoryTransport:
+    """
+    A transport that replaces the Webots emitter/receiver devices with
+    shared memory ring buffers, for controllers that run as extern
+    controllers on the same host, e.g. a robot sending large sensor arrays
+    to an EmitterReceiverSupervisorEnv.
+
+    It is passed as the transport argument of EmitterReceiverSupervisorEnv
+    or EmitterReceiverRobot (and their subclasses), which then use the
+    SharedMemoryEmitter and SharedMemoryReceiver it creates instead of the
+    Webots devices. These follow the Webots Emitter/Receiver API, so
+    handle_emitter() and handle_receiver() are unchanged.
+
+    Both controllers must use a transport with the same name and sizes.
+    Each direction is a single producer, single consumer ring of capacity
+    slots. Every packet carries a sequence number and the simulation time it
+    was sent at; with sync_timeout set, receivers wait until the packet of
+    the current simulation tick has been written, which keeps both
+    controllers in lockstep.
+
+    Requires Python 3.8+ for multiprocessing.shared_memory.
+    """
+    def __init__(self,
+                 name,
+                 slot_size=65536,
+                 capacity=8,
+                 zero_copy=True,
+                 sync_timeout=None,
+                 sync_lag=0.0):
+        """
+        :param name: The name of the shared memory blocks, shared by both
+            controllers
+        :param slot_size: The maximum packet size in bytes, defaults to 65536
+        :param capacity: The number of packets each ring can hold, older
+            unread packets are overwritten, defaults to 8
+        :param zero_copy: Whether received packets are returned as
+            memoryviews on the shared memory instead of bytes copies,
+            defaults to True. Such views are valid until the sender wraps
+            around the ring.
+        :param sync_timeout: Seconds receivers wait for the packet of the
+            current simulation tick before reporting the queue, defaults to
+            None, i.e. never wait
+        :param sync_lag: Seconds of simulation time the awaited packet may
+            lag behind the receiver, e.g. one sender timestep when the sender
+            runs at a lower rate, defaults to 0.0
+        """
+        self.name = name
+        self.slot_size = slot_size
+        self.capacity = capacity
+        self.zero_copy = zero_copy
+        self.sync_timeout = sync_timeout
+        self.sync_lag = sync_lag
+        self._rings = []
+
+    def open(self, role, clock=None):
+        """
+        Opens, creating them if needed, the two rings of the transport.
+
+        :param role: "supervisor" or "robot", which decides the direction of
+            each ring
+        :param clock: Function returning the simulation time of the
+            controller in seconds, e.g. robot.getTime, defaults to None
+        :return: (emitter, receiver) tuple
+        """
+        if role not in ("supervisor", "robot"):
+            raise ValueError(
+                "role must be supervisor or robot, got {}".format(role))
+        actions = self._open_ring("actions")
+        observations = self._open_ring("observations")
+        if role == "supervisor":
+            outgoing, incoming = actions, observations
+        else:
+            outgoing, incoming = observations, actions
+        return (SharedMemoryEmitter(outgoing, clock),
+                SharedMemoryReceiver(incoming, clock, self.zero_copy,
+                                     self.sync_timeout, self.sync_lag))
+
+    def close(self):
+        """
+        Closes the rings, unlinking the ones created by this process.
+        """
+        for ring in self._rings:
+            ring.close()
+        self._rings = []
+
+    def _open_ring(self, direction):
+        ring = SharedMemoryRing("{}_{}".format(self.name, direction),
+                                self.slot_size, self.capacity)
+        self._rings.append(ring)
+        return ring
+
+
+class SharedMemoryRing:
+    """
+    A single producer, single consumer ring buffer of packets in a shared
+    memory block, which is created by whichever process opens it first.
+    """
+    def __init__(self, name, slot_size, capacity, attach_timeout=10.0):
+        try:
+            from multiprocessing import shared_memory
+        except ImportError:
+            raise ImportError("SharedMemoryTransport requires Python 3.8+")
+
+        self.slot_size = slot_size
+        self.capacity = capacity
+        self.slot_stride = _SLOT_HEADER.size + slot_size
+        size = _HEADER.size + capacity * self.slot_stride
+
+        try:
+            self.memory = shared_memory.SharedMemory(name=name,
+                                                     create=True,
+                                                     size=size)
+            self.owner = True
+        except FileExistsError:
+            self.owner = False
+            deadline = time.monotonic() + attach_timeout
+            while True:
+                # The creator may not have sized the block yet
+                self.memory = _attach(shared_memory, name)
+                if self.memory.size >= size:
+                    break
+                self.memory.close()
+                if time.monotonic() > deadline:
+                    raise ValueError(
+                        "Shared memory block {} is smaller than the {} "
+                        "bytes expected, check that both controllers use "
+                        "the same sizes".format(name, size))
+                time.sleep(0.01)
+        self.buffer = self.memory.buf
+        # Zero-copy views returned by read() that may still be in use, they
+        # are released by close()
+        self._views = deque(maxlen=capacity)
+
+    @property
+    def write_sequence(self):
+        """
+        :return: int, the sequence number of the next packet to be written
+        """
+        return _HEADER.unpack_from(self.buffer, 0)[0]
+
+    def write(self, data, timestamp):
+        length = len(data)
+        if length > self.slot_size:
+            raise ValueError("Packet of {} bytes exceeds the slot size of {} "
+                             "bytes".format(length, self.slot_size))
+        sequence = self.write_sequence
+        offset = self._offset(sequence)
+        _SLOT_HEADER.pack_into(self.buffer, offset, sequence, timestamp,
+                               length)
+        start = offset + _SLOT_HEADER.size
+        self.buffer[start:start + length] = data
+        # Publishing the packet last makes it visible only once complete
+        _HEADER.pack_into(self.buffer, 0, sequence + 1)
+
+    def read(self, sequence):
+        """
+        :return: (timestamp, memoryview) of the packet with the sequence
+            number provided
+        """
+        offset = self._offset(sequence)
+        _, timestamp, length = _SLOT_HEADER.unpack_from(self.buffer, offset)
+        start = offset + _SLOT_HEADER.size
+        view = self.buffer[start:start + length]
+        self._views.append(view)
+        return timestamp, view
+
+    def timestamp(self, sequence):
+        return _SLOT_HEADER.unpack_from(self.buffer,
+                                        self._offset(sequence))[1]
+
+    def close(self):
+        """
+        Releases the views returned by read(), unmaps the block and unlinks
+        it if this process created it. If a view is still exported, e.g. by
+        a NumPy array created from it, the block stays mapped until that
+        array is garbage collected, but it is unlinked all the same.
+        """
+        if self.buffer is None:
+            return
+        for view in self._views:
+            try:
+                view.release()
+            except BufferError:
+                pass
+        self._views.clear()
+        self.buffer = None
+        try:
+            self.memory.close()
+        except BufferError:
+            warnings.warn(
+                "Shared memory block {} is still in use by a zero-copy "
+                "packet, it is unmapped once the packet is garbage "
+                "collected".format(self.memory.name), ResourceWarning)
+        if self.owner:
+            self.memory.unlink()
+
+    def _offset(self, sequence):
+        return _HEADER.size + (sequence % self.capacity) * self.slot_stride
+
+
+class SharedMemoryEmitter:
+    """
+    Emitter that writes packets to a SharedMemoryRing, following the API of
+    the Webots Emitter device.
+    """
+    def __init__(self, ring, clock=None):
+        self.ring = ring
+        self.clock = clock
+
+    def send(self, data):
+        """
+        :param data: bytes-like or str, the packet to send
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.ring.write(data,
+                        self.clock() if self.clock is not None else 0.0)
+
+    def getChannel(self):
+        return 0
+
+    def setChannel(self, channel):
+        # A ring connects exactly two controllers, channels do not apply
+        pass
+
+
+class SharedMemoryReceiver:
+    """
+    Receiver that reads packets from a SharedMemoryRing, following the API
+    of the Webots Receiver device.
+
+    Packets that were overwritten before being read are skipped and counted
+    in packets_lost.
+    """
+    def __init__(self,
+                 ring,
+                 clock=None,
+                 zero_copy=True,
+                 sync_timeout=None,
+                 sync_lag=0.0):
+        self.ring = ring
+        self.clock = clock
+        self.zero_copy = zero_copy
+        self.sync_timeout = sync_timeout
+        self.sync_lag = sync_lag
+        self.read_sequence = ring.write_sequence
+        self.packets_lost = 0
+
+    def enable(self, sampling_period):
+        pass
+
+    def disable(self):
+        pass
+
+    def getQueueLength(self):
+        """
+        :return: int, the number of unread packets
+        """
+        write_sequence = self.ring.write_sequence
+        if self.sync_timeout is not None and self.clock is not None:
+            write_sequence = self._wait_for_tick(write_sequence)
+
+        if write_sequence - self.read_sequence > self.ring.capacity:
+            lost = write_sequence - self.read_sequence - self.ring.capacity
+            self.packets_lost += lost
+            self.read_sequence += lost
+        return write_sequence - self.read_sequence
+
+    def getBytes(self):
+        """
+        :return: memoryview or bytes, the oldest unread packet
+        """
+        message = self.ring.read(self.read_sequence)[1]
+        return message if self.zero_copy else message.tobytes()
+
+    getData = getBytes
+
+    def getString(self):
+        return str(self.ring.read(self.read_sequence)[1], "utf-8")
+
+    def getTimestamp(self):
+        """
+        :return: float, the simulation time the oldest unread packet was
+            sent at
+        """
+        return self.ring.timestamp(self.read_sequence)
+
+    def nextPacket(self):
+        self.read_sequence += 1
+
+    def getChannel(self):
+        return 0
+
+    def setChannel(self, channel):
+        pass
+
+    def _wait_for_tick(self, write_sequence):
+        """
+        Waits until the newest packet was sent at the current simulation
+        tick, minus sync_lag, or until sync_timeout expires.
+        """
+        target = self.clock() - self.sync_lag - 1e-9
+        deadline = time.monotonic() + self.sync_timeout
+        while (write_sequence == 0 or
+               self.ring.timestamp(write_sequence - 1) < target):
+            if time.monotonic() > deadline:
+                break
+            time.sleep(0)
+            write_sequence = self.ring.write_sequence
+        return write_sequence
+
+
+def _attach(shared_memory, name):
+    """
+    Attaches to an existing shared memory block without letting the
+    resource tracker of this process unlink it on exit, which is the job of
+    the process that created it.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13
+        memory = shared_memory.SharedMemory(name=name)
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(memory._name, "shared_memory")
+        return memory
@@ -0,0 +1,154 @@
+from collections import OrderedDict
+
+import numpy as np
+from gym import spaces
+
+
+class SpaceCodec:
+    """
+    A message codec that is compiled once from a gym.spaces definition.
+
+    The space is translated to a fixed binary layout, i.e. a little-endian
+    NumPy structured dtype, and every message is packed into/unpacked from
+    that layout without any per-message parsing or type validation. The
+    layout is validated only once, when the codec is created, by
+    round-tripping a sample of the space.
+
+    Supported spaces are Box, Discrete, MultiDiscrete, MultiBinary and any
+    nesting of them in Dict and Tuple spaces.
+
+    Decoded values have the structure of the space, i.e. np.ndarray for
+    Box/MultiDiscrete/MultiBinary, int for Discrete, OrderedDict for Dict and
+    tuple for Tuple. Arrays are read-only views on the received message.
+    """
+    def __init__(self, space):
+        """
+        Compiles the binary layout of the space provided.
+
+        :param space: The gym space the messages belong to
+        :raises TypeError: If the space, or one of its subspaces, is not
+            supported
+        """
+        self.space = space
+        self.dtype = np.dtype([("value", _space_dtype(space))])
+        self.size = self.dtype.itemsize
+
+        # Preallocated buffer that is packed in place on every encode call,
+        # along with the views of its leaf fields
+        self._buffer = np.zeros((), dtype=self.dtype)
+        self._setters = _compile_setters(space, self._buffer["value"])
+        self._decoder = _compile_decoder(space)
+
+        self._check_layout()
+
+    def encode(self, value):
+        """
+        Packs a value of the space into a binary message.
+
+        :param value: A value that belongs to the space
+        :return: bytes, the packed message
+        """
+        for setter in self._setters:
+            setter(value)
+        return self._buffer.tobytes()
+
+    def decode(self, message):
+        """
+        Unpacks a binary message into a value of the space.
+
+        :param message: bytes-like, a message packed by encode()
+        :return: The unpacked value, with the structure of the space
+        """
+        return self._decoder(
+            np.frombuffer(message, dtype=self.dtype,
+                          count=1).reshape(())["value"])
+
+    def _check_layout(self):
+        sample = self.space.sample()
+        message = self.encode(sample)
+        if len(message) != self.size:
+            raise ValueError(
+                "Packed message size {} does not match the layout size "
+                "{}".format(len(message), self.size))
+        if not self.space.contains(self.decode(message)):
+            raise ValueError(
+                "Space {} does not survive a pack/unpack round trip".format(
+                    self.space))
+
+
+def _space_dtype(space):
+    """
+    Returns the little-endian NumPy dtype that holds a value of the space.
+    """
+    if isinstance(space, spaces.Box):
+        return np.dtype((np.dtype(space.dtype).newbyteorder("<"),
+                         space.shape))
+    elif isinstance(space, spaces.Discrete):
+        return np.dtype("<i8")
+    elif isinstance(space, spaces.MultiDiscrete):
+        return np.dtype(("<i8", space.shape))
+    elif isinstance(space, spaces.MultiBinary):
+        return np.dtype(("<i1", space.shape))
+    elif isinstance(space, spaces.Dict):
+        return np.dtype([(key, _space_dtype(subspace))
+                         for key, subspace in space.spaces.items()])
+    elif isinstance(space, spaces.Tuple):
+        return np.dtype([("f{}".format(i), _space_dtype(subspace))
+                         for i, subspace in enumerate(space.spaces)])
+    raise TypeError("Unsupported space for SpaceCodec: {}".format(space))
+
+
+def _compile_setters(space, view, getter=None):
+    """
+    Returns a flat list of functions, one per leaf space, that each copy the
+    corresponding part of a value into its (preallocated) view.
+    """
+    if getter is None:
+        getter = _identity
+    if isinstance(space, spaces.Dict):
+        setters = []
+        for key, subspace in space.spaces.items():
+            setters.extend(
+                _compile_setters(subspace, view[key],
+                                 _item_getter(getter, key)))
+        return setters
+    elif isinstance(space, spaces.Tuple):
+        setters = []
+        for i, subspace in enumerate(space.spaces):
+            setters.extend(
+                _compile_setters(subspace, view["f{}".format(i)],
+                                 _item_getter(getter, i)))
+        return setters
+
+    def setter(value):
+        view[...] = getter(value)
+
+    return [setter]
+
+
+def _compile_decoder(space):
+    """
+    Returns a function that converts the unpacked structured value to the
+    structure of the space.
+    """
+    if isinstance(space, spaces.Dict):
+        decoders = [(key, _compile_decoder(subspace))
+                    for key, subspace in space.spaces.items()]
+        return lambda value: OrderedDict(
+            (key, decoder(value[key])) for key, decoder in decoders)
+    elif isinstance(space, spaces.Tuple):
+        decoders = [("f{}".format(i), _compile_decoder(subspace))
+                    for i, subspace in enumerate(space.spaces)]
+        return lambda value: tuple(
+            decoder(value[name]) for name, decoder in decoders)
+    elif isinstance(space, spaces.Discrete):
+        return int
+    return _identity
+
+
+def _item_getter(getter, key):
+    return lambda value: getter(value)[key]
+
+
+def _identity(value):
+    return value
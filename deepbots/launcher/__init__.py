@@ -0,0 +1,7 @@
+from deepbots._lazy import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    "Heartbeat": "deepbots.launcher.heartbeat",
+    "WebotsInstance": "deepbots.launcher.webots_pool",
+    "WebotsPool": "deepbots.launcher.webots_pool",
+})
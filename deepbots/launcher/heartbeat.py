@@ -0,0 +1,68 @@
+import mmap
+import os
+import struct
+
+# Environment variable naming the heartbeat file of a controller process
+HEARTBEAT_FILE_VARIABLE = "DEEPBOTS_HEARTBEAT_FILE"
+
+_COUNTER = struct.Struct("<Q")
+
+
+class Heartbeat:
+    """
+    A step counter shared between processes through a memory-mapped file,
+    used by the controllers of a WebotsPool instance to report progress to
+    the pool. The controller increments the counter on every timestep,
+    which is a single memory write, and the pool reads it periodically.
+
+    DeepbotsSupervisorEnv opens the file named by the
+    DEEPBOTS_HEARTBEAT_FILE environment variable, if it is set, see
+    from_environment().
+    """
+    def __init__(self, path, create=False):
+        """
+        :param path: Path to the heartbeat file
+        :param create: Whether the file is created, or truncated, with a
+            zero counter, defaults to False
+        """
+        self.path = path
+        if create:
+            with open(path, "wb") as heartbeat_file:
+                heartbeat_file.write(_COUNTER.pack(0))
+        with open(path, "r+b") as heartbeat_file:
+            self._map = mmap.mmap(heartbeat_file.fileno(), _COUNTER.size)
+
+    @classmethod
+    def from_environment(cls):
+        """
+        :return: Heartbeat of the file named by DEEPBOTS_HEARTBEAT_FILE, or
+            None if the variable is not set
+        """
+        path = os.environ.get(HEARTBEAT_FILE_VARIABLE)
+        if not path:
+            return None
+        return cls(path)
+
+    def beat(self, steps=1):
+        """
+        Adds steps to the counter.
+
+        :param steps: The number of steps completed, defaults to 1
+        """
+        _COUNTER.pack_into(self._map, 0,
+                           _COUNTER.unpack_from(self._map)[0] + steps)
+
+    def read(self):
+        """
+        :return: int, the number of steps counted
+        """
+        return _COUNTER.unpack_from(self._map)[0]
+
+    def reset(self):
+        """
+        Sets the counter back to zero.
+        """
+        _COUNTER.pack_into(self._map, 0, 0)
+
+    def close(self):
+        self._map.close()
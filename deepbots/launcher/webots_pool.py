@@ -0,0 +1,333 @@
+import logging
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+
+from deepbots.launcher.heartbeat import Heartbeat
+
+logger = logging.getLogger(__name__)
+
+
+class WebotsInstance:
+    """
+    The state of a simulator process managed by a WebotsPool.
+    """
+    def __init__(self, index, port, controller_url, heartbeat_file):
+        self.index = index
+        self.port = port
+        self.controller_url = controller_url
+        self.heartbeat_file = heartbeat_file
+        self.heartbeat = Heartbeat(heartbeat_file, create=True)
+        self.heartbeat_count = 0
+        self.process = None
+        self.started_at = None
+        self.last_step_at = None
+        self.steps = 0
+        self.total_steps = 0
+        self.restarts = 0
+
+    @property
+    def alive(self):
+        """
+        :return: bool, whether the simulator process is running
+        """
+        return self.process is not None and self.process.poll() is None
+
+    @property
+    def steps_per_second(self):
+        """
+        :return: float, the steps per second reported through heartbeats
+            since the instance was last (re)started
+        """
+        if self.started_at is None or self.last_step_at is None:
+            return 0.0
+        elapsed = self.last_step_at - self.started_at
+        return self.steps / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self):
+        """
+        :return: dict, a summary of the instance
+        """
+        return {
+            "index": self.index,
+            "port": self.port,
+            "controller_url": self.controller_url,
+            "heartbeat_file": self.heartbeat_file,
+            "pid": self.process.pid if self.process is not None else None,
+            "alive": self.alive,
+            "steps": self.total_steps,
+            "steps_per_second": self.steps_per_second,
+            "restarts": self.restarts,
+        }
+
+
+class WebotsPool:
+    """
+    Owns a pool of Webots simulator processes that run the same world, each
+    one on its own port so that an extern supervisor controller can connect
+    to it through its controller URL, see DeepbotsVectorEnv.
+
+    Controllers report progress through a heartbeat file per instance, see
+    heartbeat_files: a DeepbotsSupervisorEnv whose process has the
+    DEEPBOTS_HEARTBEAT_FILE environment variable set to the file of its
+    instance counts every timestep in it, DeepbotsVectorEnv sets the
+    variable for its workers. A monitor thread reads the counters, restarts
+    instances whose process exited and, once an instance reported a step,
+    restarts it if it did not report another one for stall_timeout seconds.
+    Restarted instances keep their port, controller URL and heartbeat file,
+    so their controllers can reconnect transparently.
+
+    The simulator command is webots_binary followed by webots_args, the
+    "--port" argument and the world file, so a fake executable can be used
+    as webots_binary for testing.
+    """
+    def __init__(self,
+                 world,
+                 size,
+                 webots_binary="webots",
+                 webots_args=("--batch", "--mode=fast", "--no-rendering",
+                              "--stdout", "--stderr"),
+                 robot_name="supervisor",
+                 host="localhost",
+                 base_port=1234,
+                 stall_timeout=60.0,
+                 check_interval=1.0,
+                 env=None):
+        """
+        :param world: Path to the world (.wbt) file
+        :param size: The number of simulator instances
+        :param webots_binary: The simulator executable, defaults to "webots"
+        :param webots_args: The simulator arguments, the defaults run
+            without rendering as fast as possible
+        :param robot_name: The name of the robot that runs the extern
+            controller, used in the controller URLs, defaults to "supervisor"
+        :param host: The host used in the controller URLs, defaults to
+            "localhost"
+        :param base_port: The first port tried when allocating ports,
+            defaults to 1234 which is the Webots default
+        :param stall_timeout: Seconds without a heartbeat after which an
+            instance is considered hung and is restarted, defaults to 60.0,
+            None disables stall detection
+        :param check_interval: Seconds between health checks, defaults to 1.0
+        :param env: dict of extra environment variables for the simulator
+            processes, defaults to None
+        """
+        self.world = world
+        self.webots_binary = webots_binary
+        self.webots_args = list(webots_args)
+        self.stall_timeout = stall_timeout
+        self.check_interval = check_interval
+        self.env = env
+
+        self._heartbeat_directory = tempfile.mkdtemp(
+            prefix="deepbots_heartbeats_")
+        self.instances = []
+        port = base_port
+        for index in range(size):
+            port = _find_free_port(port)
+            controller_url = "tcp://{}:{}/{}".format(host, port, robot_name)
+            heartbeat_file = os.path.join(self._heartbeat_directory,
+                                          "instance_{}".format(index))
+            self.instances.append(
+                WebotsInstance(index, port, controller_url, heartbeat_file))
+            port += 1
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._monitor = None
+
+    @property
+    def controller_urls(self):
+        """
+        :return: list of the extern controller URLs, one per instance, to be
+            used as WEBOTS_CONTROLLER_URL
+        """
+        return [instance.controller_url for instance in self.instances]
+
+    @property
+    def heartbeat_files(self):
+        """
+        :return: list of the heartbeat files, one per instance, to be used
+            as DEEPBOTS_HEARTBEAT_FILE by the controllers, e.g. through the
+            heartbeat_files argument of DeepbotsVectorEnv
+        """
+        return [instance.heartbeat_file for instance in self.instances]
+
+    def start(self):
+        """
+        Launches all simulator processes and the monitor thread.
+
+        :return: self
+        """
+        for instance in self.instances:
+            self._launch(instance)
+        self._stop_event.clear()
+        self._monitor = threading.Thread(target=self._monitor_loop,
+                                         name="WebotsPoolMonitor",
+                                         daemon=True)
+        self._monitor.start()
+        return self
+
+    def close(self):
+        """
+        Stops the monitor thread and all simulator processes and removes
+        the heartbeat files.
+        """
+        self._stop_event.set()
+        if self._monitor is not None:
+            self._monitor.join()
+            self._monitor = None
+        with self._lock:
+            for instance in self.instances:
+                _kill(instance.process)
+                instance.process = None
+                instance.heartbeat.close()
+        shutil.rmtree(self._heartbeat_directory, ignore_errors=True)
+
+    def heartbeat(self, index, steps=1):
+        """
+        Reports steps of the controller of an instance. It is called by the
+        monitor thread with the steps counted in the heartbeat file, it can
+        also be called directly by controllers running in this process.
+
+        :param index: The index of the instance
+        :param steps: The number of steps completed since the last
+            heartbeat, defaults to 1
+        """
+        instance = self.instances[index]
+        instance.last_step_at = time.monotonic()
+        instance.steps += steps
+        instance.total_steps += steps
+
+    def restart(self, index):
+        """
+        Kills and relaunches the simulator process of an instance.
+
+        :param index: The index of the instance
+        """
+        with self._lock:
+            instance = self.instances[index]
+            _kill(instance.process)
+            instance.restarts += 1
+            self._launch(instance)
+
+    def read_heartbeats(self):
+        """
+        Reads the heartbeat files and reports the steps counted since the
+        last read through heartbeat().
+        """
+        for instance in self.instances:
+            count = instance.heartbeat.read()
+            # The counter restarts from zero when the instance is restarted
+            steps = count - instance.heartbeat_count
+            if steps < 0:
+                steps = count
+            instance.heartbeat_count = count
+            if steps > 0:
+                self.heartbeat(instance.index, steps)
+
+    def check_health(self):
+        """
+        Reads the heartbeat files and restarts the instances whose process
+        exited or that stalled. Instances that never reported a step since
+        they were (re)started are not considered stalled.
+
+        :return: list of the indices of the restarted instances
+        """
+        self.read_heartbeats()
+        now = time.monotonic()
+        restarted = []
+        for instance in self.instances:
+            if instance.process is None:
+                continue
+            if not instance.alive:
+                logger.warning(
+                    "Webots instance %d exited with code %s, restarting",
+                    instance.index, instance.process.returncode)
+            elif (self.stall_timeout is not None
+                  and instance.last_step_at is not None
+                  and now - instance.last_step_at > self.stall_timeout):
+                logger.warning(
+                    "Webots instance %d did not step for %.1f seconds, "
+                    "restarting", instance.index, self.stall_timeout)
+            else:
+                continue
+            self.restart(instance.index)
+            restarted.append(instance.index)
+        return restarted
+
+    def stats(self):
+        """
+        :return: list of dicts, a summary of every instance, including its
+            steps per second
+        """
+        return [instance.as_dict() for instance in self.instances]
+
+    def _launch(self, instance):
+        command = [self.webots_binary] + self.webots_args + [
+            "--port={}".format(instance.port), self.world
+        ]
+        env = dict(os.environ)
+        if self.env is not None:
+            env.update(self.env)
+        instance.process = subprocess.Popen(command,
+                                            env=env,
+                                            stdin=subprocess.DEVNULL,
+                                            start_new_session=True)
+        instance.started_at = time.monotonic()
+        instance.last_step_at = None
+        instance.steps = 0
+        instance.heartbeat.reset()
+        instance.heartbeat_count = 0
+
+    def _monitor_loop(self):
+        while not self._stop_event.wait(self.check_interval):
+            self.check_health()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _find_free_port(port):
+    """
+    Returns the first port, starting from the one provided, that can be
+    bound on this host.
+    """
+    while True:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            try:
+                sock.bind(("", port))
+                return port
+            except OSError:
+                port += 1
+
+
+def _kill(process, timeout=5.0):
+    """
+    Terminates a simulator process and its children, killing them if they
+    do not exit within timeout seconds.
+    """
+    if process is None or process.poll() is not None:
+        return
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGTERM)
+        else:
+            process.terminate()
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+        process.wait()
+    except ProcessLookupError:
+        pass
@@ -0,0 +1,175 @@
+import numpy as np
+
+# ITU-R BT.601 luma weights of the B, G, R channels, scaled to [0, 1]
+GRAYSCALE_WEIGHTS = (0.114 / 255.0, 0.587 / 255.0, 0.299 / 255.0)
+
+
+class ImageObservation:
+    """
+    Helper that turns the image of a Camera, RangeFinder or Lidar device
+    into a NumPy observation without per-step allocations, e.g. for
+    RobotSupervisorEnv.get_observations().
+
+    The device buffer is wrapped with np.frombuffer(), optionally downsampled
+    by slicing and, for cameras, converted to grayscale, writing directly
+    into a preallocated frame. The last frame_stack frames are kept in a ring
+    buffer that is stored twice in a row, so the stacked frames, oldest
+    first, are always a contiguous view and only the newest frame is
+    mirrored on each update.
+
+    Observations are:
+    - Camera: uint8 (height, width, 3) RGB frames, or float32
+      (height, width) frames in [0, 1] with grayscale
+    - RangeFinder: float32 (height, width) depth frames
+    - Lidar: float32 (layers, horizontal_resolution) range frames
+    with frame_stack > 1 they have an extra leading frame_stack dimension.
+
+    The returned arrays are views on internal buffers that are overwritten
+    on the next update(), they should be copied if they need to be kept.
+    """
+    def __init__(self, device, grayscale=False, downsample=1, frame_stack=1):
+        """
+        :param device: The enabled Webots Camera, RangeFinder or Lidar
+        :param grayscale: Whether camera images are converted to grayscale,
+            defaults to False, ignored for range devices
+        :param downsample: Integer factor the image is downsampled by in
+            both dimensions, defaults to 1
+        :param frame_stack: The number of most recent frames observed,
+            defaults to 1
+        """
+        if int(downsample) < 1 or int(frame_stack) < 1:
+            raise ValueError("downsample and frame_stack must be positive "
+                             "integers")
+        self.device = device
+        self.downsample = int(downsample)
+        self.frame_stack = int(frame_stack)
+
+        if hasattr(device, "getImage"):
+            self.kind = "camera"
+            self._raw_shape = (device.getHeight(), device.getWidth(), 4)
+        elif hasattr(device, "getNumberOfLayers"):
+            self.kind = "lidar"
+            self._raw_shape = (device.getNumberOfLayers(),
+                               device.getHorizontalResolution())
+        elif hasattr(device, "getRangeImage"):
+            self.kind = "range_finder"
+            self._raw_shape = (device.getHeight(), device.getWidth())
+        else:
+            raise TypeError("Unsupported device {}, expected a Camera, "
+                            "RangeFinder or Lidar".format(device))
+        self.grayscale = grayscale and self.kind == "camera"
+
+        height = -(-self._raw_shape[0] // self.downsample)
+        width = -(-self._raw_shape[1] // self.downsample)
+        if self.kind != "camera" or self.grayscale:
+            frame_shape, self.dtype = (height, width), np.dtype(np.float32)
+        else:
+            frame_shape, self.dtype = (height, width, 3), np.dtype(np.uint8)
+        self.frame_shape = frame_shape
+
+        self._frames = np.zeros((2 * self.frame_stack, ) + frame_shape,
+                                dtype=self.dtype)
+        self._scratch = np.zeros(frame_shape, dtype=self.dtype)
+        self._index = 0
+
+    @property
+    def shape(self):
+        """
+        :return: tuple, the shape of the observations
+        """
+        if self.frame_stack == 1:
+            return self.frame_shape
+        return (self.frame_stack, ) + self.frame_shape
+
+    def observation_space(self, low=0.0, high=None):
+        """
+        Creates a gym Box space matching the observations.
+
+        :param low: The lower bound of the values, defaults to 0.0
+        :param high: The upper bound of the values, defaults to None, i.e.
+            255 for RGB, 1.0 for grayscale and infinity for range images
+        :return: gym.spaces.Box
+        """
+        from gym.spaces import Box
+
+        if high is None:
+            if self.dtype == np.uint8:
+                high = 255
+            elif self.grayscale:
+                high = 1.0
+            else:
+                high = np.inf
+        return Box(low=low, high=high, shape=self.shape, dtype=self.dtype)
+
+    @property
+    def observation(self):
+        """
+        :return: np.ndarray, the latest observation, oldest frame first
+        """
+        start = self._index + 1
+        if self.frame_stack == 1:
+            return self._frames[self._index]
+        return self._frames[start:start + self.frame_stack]
+
+    def update(self):
+        """
+        Reads the device and pushes the new frame to the frame stack.
+
+        :return: np.ndarray, the latest observation
+        """
+        self._index = (self._index + 1) % self.frame_stack
+        frame = self._frames[self._index]
+        self._process(frame)
+        if self.frame_stack > 1:
+            self._frames[self._index + self.frame_stack] = frame
+        return self.observation
+
+    def reset(self):
+        """
+        Reads the device and fills the whole frame stack with the new frame,
+        e.g. at the beginning of an episode.
+
+        :return: np.ndarray, the latest observation
+        """
+        self._index = self.frame_stack - 1
+        self._process(self._frames[0])
+        self._frames[1:] = self._frames[0]
+        return self.observation
+
+    def _read(self):
+        """
+        :return: np.ndarray, a read-only view on the device buffer
+        """
+        if self.kind == "camera":
+            raw = np.frombuffer(self.device.getImage(), dtype=np.uint8)
+        else:
+            try:
+                raw = np.frombuffer(
+                    self.device.getRangeImage(data_type="buffer"),
+                    dtype=np.float32)
+            except TypeError:
+                # Older Webots versions only return lists of floats
+                raw = np.asarray(self.device.getRangeImage(),
+                                 dtype=np.float32)
+        raw = raw.reshape(self._raw_shape)
+        if self.downsample > 1:
+            raw = raw[::self.downsample, ::self.downsample]
+        return raw
+
+    def _process(self, frame):
+        raw = self._read()
+        if not self.grayscale:
+            if self.kind == "camera":
+                # BGRA to RGB
+                np.copyto(frame, raw[..., 2::-1])
+            else:
+                np.copyto(frame, raw)
+            return
+
+        scratch = self._scratch
+        np.multiply(raw[..., 0], GRAYSCALE_WEIGHTS[0], out=frame)
+        for channel in (1, 2):
+            np.multiply(raw[..., channel],
+                        GRAYSCALE_WEIGHTS[channel],
+                        out=scratch)
+            np.add(frame, scratch, out=frame)
@@ -0,0 +1,6 @@
+from deepbots._lazy import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    "EnvServer": "deepbots.remote.env_server",
+    "RemoteEnv": "deepbots.remote.remote_env",
+})
@@ -0,0 +1,167 @@
+import socket
+import traceback
+
+import numpy as np
+from gym import spaces
+
+from deepbots.remote.protocol import (CLOSE, ERROR, RESET, RESULT, SPACES,
+                                      STEP, FrameReader, configure_socket,
+                                      decode_value, encode_space, pack_frame,
+                                      parse_address, remove_socket_file)
+
+
+class EnvServer:
+    """
+    The EnvServer class serves the reset() and step() methods of an
+    environment, e.g. a DeepbotsSupervisorEnv running in its Webots
+    controller process, to a RemoteEnv over a TCP or Unix socket, so that
+    training can run on another process or host.
+
+    Requests and responses are binary frames, a header with the body length,
+    the request id and the request kind, followed by the encoded value, see
+    deepbots.remote.protocol. NumPy arrays are sent as their raw data.
+
+    Clients can pipeline requests, i.e. send several before reading the
+    responses. The server handles all the requests it has received at once
+    in order and sends their responses in a single write, so that a batch
+    of pipelined steps costs a single round-trip.
+
+    A single client is served at a time, clients are served one after the
+    other by serve().
+    """
+    def __init__(self, env, address, auto_reset=False, backlog=1):
+        """
+        Binds the listening socket.
+
+        :param env: The environment served
+        :param address: "tcp://host:port", "unix:///path/to/socket" or a
+            (host, port) tuple, use port 0 to bind to any free port
+        :param auto_reset: Whether the environment is reset when a step is
+            done, in which case the observation returned is the first one of
+            the new episode and the last one is stored in info under
+            "terminal_observation", defaults to False. This allows clients to
+            pipeline steps across episodes.
+        :param backlog: The number of pending connections, defaults to 1
+        """
+        self.env = env
+        self.auto_reset = auto_reset
+        self.requests_served = 0
+        self.batches_served = 0
+
+        self.family, address = parse_address(address)
+        remove_socket_file(self.family, address)
+        self.socket = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_INET:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind(address)
+        self.socket.listen(backlog)
+        # The actual address, e.g. with the port bound
+        self.address = self.socket.getsockname()
+
+        # Box observations, e.g. lists of floats, are sent as single arrays
+        observation_space = getattr(env, "observation_space", None)
+        self._observation_dtype = observation_space.dtype if isinstance(
+            observation_space, spaces.Box) else None
+
+        self._handlers = {
+            SPACES: self._spaces,
+            RESET: self._reset,
+            STEP: self._step,
+        }
+
+    def serve(self, max_clients=None):
+        """
+        Serves clients one after the other.
+
+        :param max_clients: The number of clients served before returning,
+            defaults to None, i.e. serve until the server is closed
+        """
+        served = 0
+        while max_clients is None or served < max_clients:
+            try:
+                self.serve_client()
+            except OSError:
+                if self.socket.fileno() == -1:
+                    # Closed by close()
+                    return
+                raise
+            served += 1
+
+    def serve_client(self):
+        """
+        Accepts a client and serves its requests until it sends a close
+        request or disconnects.
+        """
+        connection, _ = self.socket.accept()
+        configure_socket(connection)
+        reader = FrameReader(connection)
+        try:
+            while True:
+                try:
+                    frames = reader.read_frames()
+                except (EOFError, ConnectionError):
+                    return
+                responses = []
+                closing = False
+                for request_id, kind, body in frames:
+                    if kind == CLOSE:
+                        responses.append(pack_frame(request_id, RESULT, None))
+                        closing = True
+                        break
+                    responses.append(self._handle(request_id, kind, body))
+                try:
+                    connection.sendall(b"".join(responses))
+                except ConnectionError:
+                    return
+                self.requests_served += len(responses)
+                self.batches_served += 1
+                if closing:
+                    return
+        finally:
+            connection.close()
+
+    def close(self):
+        """
+        Closes the listening socket.
+        """
+        address = self.address
+        self.socket.close()
+        remove_socket_file(self.family, address)
+
+    def _handle(self, request_id, kind, body):
+        try:
+            handler = self._handlers.get(kind)
+            if handler is None:
+                raise ValueError(
+                    "Received unknown request kind {}".format(kind))
+            return pack_frame(request_id, RESULT, handler(decode_value(body)))
+        except Exception:
+            return pack_frame(request_id, ERROR, traceback.format_exc())
+
+    def _spaces(self, _):
+        return (encode_space(getattr(self.env, "observation_space", None)),
+                encode_space(getattr(self.env, "action_space", None)))
+
+    def _reset(self, _):
+        return self._observation(self.env.reset())
+
+    def _step(self, action):
+        observation, reward, done, info = self.env.step(action)
+        if done and self.auto_reset:
+            info = dict(info or {})
+            # The environment may return the same array from reset()
+            info["terminal_observation"] = self._observation(observation,
+                                                             copy=True)
+            observation = self.env.reset()
+        return self._observation(observation), reward, done, info
+
+    def _observation(self, observation, copy=False):
+        if self._observation_dtype is None:
+            if copy and isinstance(observation, np.ndarray):
+                return observation.copy()
+            return observation
+        if copy:
+            return np.array(observation,
+                            dtype=self._observation_dtype,
+                            copy=True)
+        return np.asarray(observation, dtype=self._observation_dtype)
@@ -0,0 +1,344 @@
+import os
+import socket
+import stat
+import struct
+from urllib.parse import urlparse
+
+import numpy as np
+
+# Frame header: body length, request id and kind
+FRAME_HEADER = struct.Struct("<IIB")
+
+# Request kinds
+SPACES = 1
+RESET = 2
+STEP = 3
+CLOSE = 4
+# Response kinds
+RESULT = 0
+ERROR = 255
+
+# Value tags
+_NONE = b"N"
+_TRUE = b"T"
+_FALSE = b"F"
+_INT = b"i"
+_FLOAT = b"d"
+_STR = b"s"
+_BYTES = b"b"
+_ARRAY = b"a"
+_LIST = b"l"
+_TUPLE = b"t"
+_DICT = b"m"
+
+_INT64 = struct.Struct("<q")
+_FLOAT64 = struct.Struct("<d")
+_LENGTH = struct.Struct("<I")
+_ARRAY_HEADER = struct.Struct("<BB")
+
+
+def pack_frame(request_id, kind, value):
+    """
+    :param request_id: The id of the request, echoed by its response
+    :param kind: The request or response kind
+    :param value: The value carried, see encode_value()
+    :return: bytes, the frame
+    """
+    body = encode_value(value)
+    return FRAME_HEADER.pack(len(body), request_id, kind) + body
+
+
+def encode_value(value):
+    """
+    Encodes a value made of None, bool, int, float, str, bytes, NumPy arrays
+    and scalars, lists, tuples and dicts of those. Arrays are sent as their
+    raw data, along with their dtype and shape.
+
+    :param value: The value to encode
+    :return: bytes
+    """
+    parts = []
+    _encode(value, parts)
+    return b"".join(parts)
+
+
+def decode_value(body):
+    """
+    Decodes a value encoded by encode_value(). Arrays are writable NumPy
+    arrays on the body, NumPy scalars are returned as such.
+
+    :param body: bytearray, the encoded value
+    :return: The decoded value
+    """
+    value, _ = _decode(body, 0)
+    return value
+
+
+def _encode(value, parts):
+    if value is None:
+        parts.append(_NONE)
+    elif value is True:
+        parts.append(_TRUE)
+    elif value is False:
+        parts.append(_FALSE)
+    elif isinstance(value, (np.ndarray, np.generic)):
+        array = np.asarray(value)
+        if array.dtype.hasobject:
+            raise TypeError("Arrays of objects cannot be encoded")
+        dtype = array.dtype.str.encode("ascii")
+        parts.append(_ARRAY +
+                     _ARRAY_HEADER.pack(len(dtype), array.ndim) + dtype +
+                     struct.pack("<{}Q".format(array.ndim), *array.shape))
+        parts.append(array.tobytes())
+    elif isinstance(value, int):
+        parts.append(_INT + _INT64.pack(value))
+    elif isinstance(value, float):
+        parts.append(_FLOAT + _FLOAT64.pack(value))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        parts.append(_STR + _LENGTH.pack(len(data)) + data)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        parts.append(_BYTES + _LENGTH.pack(len(data)) + data)
+    elif isinstance(value, (list, tuple)):
+        parts.append((_LIST if isinstance(value, list) else _TUPLE) +
+                     _LENGTH.pack(len(value)))
+        for item in value:
+            _encode(item, parts)
+    elif isinstance(value, dict):
+        parts.append(_DICT + _LENGTH.pack(len(value)))
+        for key, item in value.items():
+            _encode(key, parts)
+            _encode(item, parts)
+    else:
+        raise TypeError("Values of type {} cannot be encoded".format(
+            type(value).__name__))
+
+
+def _decode(body, offset):
+    tag = body[offset:offset + 1]
+    offset += 1
+    if tag == _ARRAY:
+        dtype_size, ndim = _ARRAY_HEADER.unpack_from(body, offset)
+        offset += _ARRAY_HEADER.size
+        dtype = np.dtype(body[offset:offset + dtype_size].decode("ascii"))
+        offset += dtype_size
+        shape = struct.unpack_from("<{}Q".format(ndim), body, offset)
+        offset += 8 * ndim
+        count = int(np.prod(shape))
+        array = np.frombuffer(body, dtype=dtype, count=count,
+                              offset=offset) if count else np.empty(0, dtype)
+        offset += count * dtype.itemsize
+        array = array.reshape(shape)
+        return (array[()] if ndim == 0 else array), offset
+    elif tag == _FLOAT:
+        return _FLOAT64.unpack_from(body, offset)[0], offset + 8
+    elif tag == _INT:
+        return _INT64.unpack_from(body, offset)[0], offset + 8
+    elif tag == _NONE:
+        return None, offset
+    elif tag == _TRUE:
+        return True, offset
+    elif tag == _FALSE:
+        return False, offset
+    elif tag in (_STR, _BYTES):
+        size = _LENGTH.unpack_from(body, offset)[0]
+        offset += _LENGTH.size
+        data = bytes(body[offset:offset + size])
+        return (data.decode("utf-8") if tag == _STR else data), offset + size
+    elif tag in (_LIST, _TUPLE):
+        size = _LENGTH.unpack_from(body, offset)[0]
+        offset += _LENGTH.size
+        items = []
+        for _ in range(size):
+            item, offset = _decode(body, offset)
+            items.append(item)
+        return (items if tag == _LIST else tuple(items)), offset
+    elif tag == _DICT:
+        size = _LENGTH.unpack_from(body, offset)[0]
+        offset += _LENGTH.size
+        value = {}
+        for _ in range(size):
+            key, offset = _decode(body, offset)
+            value[key], offset = _decode(body, offset)
+        return value, offset
+    raise ValueError("Unknown value tag {!r}".format(bytes(tag)))
+
+
+def encode_space(space):
+    """
+    :param space: A Box, Discrete, MultiDiscrete or MultiBinary gym space,
+        or a Dict or Tuple of those, or None
+    :return: The description of the space as a value encode_value() accepts
+    """
+    from gym import spaces
+
+    if space is None:
+        return None
+    elif isinstance(space, spaces.Box):
+        return {
+            "type": "Box",
+            "low": space.low,
+            "high": space.high,
+            "dtype": np.dtype(space.dtype).str
+        }
+    elif isinstance(space, spaces.Discrete):
+        return {"type": "Discrete", "n": int(space.n)}
+    elif isinstance(space, spaces.MultiDiscrete):
+        return {"type": "MultiDiscrete", "nvec": np.asarray(space.nvec)}
+    elif isinstance(space, spaces.MultiBinary):
+        return {"type": "MultiBinary", "n": np.asarray(space.n)}
+    elif isinstance(space, spaces.Dict):
+        return {
+            "type":
+            "Dict",
+            "spaces": [[key, encode_space(subspace)]
+                       for key, subspace in space.spaces.items()]
+        }
+    elif isinstance(space, spaces.Tuple):
+        return {
+            "type": "Tuple",
+            "spaces": [encode_space(subspace) for subspace in space.spaces]
+        }
+    raise TypeError("Unsupported space for EnvServer: {}".format(space))
+
+
+def decode_space(description):
+    """
+    :param description: A space description made by encode_space()
+    :return: The gym space, None if the description is None
+    """
+    from gym import spaces
+
+    if description is None:
+        return None
+    space_type = description["type"]
+    if space_type == "Box":
+        return spaces.Box(description["low"],
+                          description["high"],
+                          dtype=np.dtype(description["dtype"]))
+    elif space_type == "Discrete":
+        return spaces.Discrete(description["n"])
+    elif space_type == "MultiDiscrete":
+        return spaces.MultiDiscrete(description["nvec"])
+    elif space_type == "MultiBinary":
+        n = description["n"]
+        return spaces.MultiBinary(int(n) if n.ndim == 0 else n.tolist())
+    elif space_type == "Dict":
+        return spaces.Dict([(key, decode_space(subspace))
+                            for key, subspace in description["spaces"]])
+    elif space_type == "Tuple":
+        return spaces.Tuple(
+            [decode_space(subspace) for subspace in description["spaces"]])
+    raise ValueError("Unknown space type {}".format(space_type))
+
+
+def parse_address(address):
+    """
+    :param address: "tcp://host:port", "unix:///path/to/socket" or a
+        (host, port) tuple
+    :return: tuple, (socket family, socket address)
+    """
+    if isinstance(address, tuple):
+        return socket.AF_INET, address
+    url = urlparse(address)
+    if url.scheme == "tcp":
+        if url.port is None:
+            raise ValueError("TCP address {} has no port".format(address))
+        return socket.AF_INET, (url.hostname or "localhost", url.port)
+    elif url.scheme == "unix":
+        path = url.netloc + url.path
+        if not path:
+            raise ValueError("Unix address {} has no path".format(address))
+        return socket.AF_UNIX, path
+    raise ValueError("Unsupported address {}, expected tcp://host:port or "
+                     "unix:///path".format(address))
+
+
+def configure_socket(sock):
+    """
+    Disables Nagle's algorithm on TCP sockets, frames are small and sent as
+    soon as they are complete.
+    """
+    if sock.family == socket.AF_INET:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+def remove_socket_file(family, address):
+    """
+    Removes the file of a Unix socket address, e.g. left by a server that
+    was not closed. Other files at that path are left alone.
+    """
+    if family != socket.AF_UNIX:
+        return
+    try:
+        mode = os.stat(address).st_mode
+    except FileNotFoundError:
+        return
+    if stat.S_ISSOCK(mode):
+        os.unlink(address)
+
+
+class FrameReader:
+    """
+    Reads frames from a stream socket into a growing buffer.
+    """
+    def __init__(self, sock, chunk_size=65536):
+        """
+        :param sock: The connected socket
+        :param chunk_size: The minimum number of bytes received at once,
+            defaults to 65536
+        """
+        self.socket = sock
+        self.chunk_size = chunk_size
+        self._buffer = bytearray()
+
+    def read_frame(self):
+        """
+        Blocks until a frame is complete.
+
+        :return: tuple, (request id, kind, body)
+        :raises EOFError: If the peer closed the connection
+        """
+        while True:
+            frame = self._parse()
+            if frame is not None:
+                return frame
+            self._receive()
+
+    def read_frames(self):
+        """
+        Blocks until a frame is complete, then returns it along with all
+        other complete frames already received, without blocking.
+
+        :return: list of (request id, kind, body)
+        :raises EOFError: If the peer closed the connection
+        """
+        frames = [self.read_frame()]
+        frame = self._parse()
+        while frame is not None:
+            frames.append(frame)
+            frame = self._parse()
+        return frames
+
+    def _receive(self):
+        missing = FRAME_HEADER.size
+        if len(self._buffer) >= FRAME_HEADER.size:
+            missing += FRAME_HEADER.unpack_from(self._buffer)[0]
+        chunk = self.socket.recv(max(self.chunk_size,
+                                     missing - len(self._buffer)))
+        if not chunk:
+            raise EOFError("The connection was closed")
+        self._buffer += chunk
+
+    def _parse(self):
+        buffer = self._buffer
+        if len(buffer) < FRAME_HEADER.size:
+            return None
+        size, request_id, kind = FRAME_HEADER.unpack_from(buffer)
+        end = FRAME_HEADER.size + size
+        if len(buffer) < end:
+            return None
+        body = buffer[FRAME_HEADER.size:end]
+        del buffer[:end]
+        return request_id, kind, body
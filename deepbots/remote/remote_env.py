@@ -0,0 +1,209 @@
+import socket
+from collections import deque
+
+import gym
+from gym.error import AlreadyPendingCallError, NoAsyncCallError
+
+from deepbots.remote.protocol import (CLOSE, ERROR, RESET, SPACES, STEP,
+                                      FrameReader, configure_socket,
+                                      decode_space, decode_value, pack_frame,
+                                      parse_address)
+
+
+class RemoteEnv(gym.Env):
+    """
+    The RemoteEnv class is a gym environment that forwards reset() and
+    step() to the environment of an EnvServer, e.g. a DeepbotsSupervisorEnv
+    running in its Webots controller process on another host.
+
+    Besides the blocking gym methods, requests can be pipelined:
+    step_async() sends a step without waiting for its result, up to
+    max_in_flight steps can be pending and their results are returned by
+    step_wait() in order. step_many() sends a sequence of steps in batches
+    of max_in_flight, each batch costing a single round-trip. Steps that
+    are pipelined across the end of an episode require a server created
+    with auto_reset.
+    """
+    def __init__(self,
+                 address,
+                 observation_space=None,
+                 action_space=None,
+                 timeout=None,
+                 max_in_flight=16):
+        """
+        Connects to the server.
+
+        :param address: The address of the EnvServer, "tcp://host:port",
+            "unix:///path/to/socket" or a (host, port) tuple
+        :param observation_space: The observation space of the environment,
+            defaults to None, i.e. queried from the server
+        :param action_space: The action space of the environment, defaults
+            to None, i.e. queried from the server
+        :param timeout: Seconds socket operations wait, defaults to None,
+            i.e. wait indefinitely. A blocking call that times out raises
+            socket.timeout and its response is discarded once it arrives.
+        :param max_in_flight: The maximum number of pending requests,
+            defaults to 16
+        """
+        family, address = parse_address(address)
+        self.socket = socket.socket(family, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        self.socket.connect(address)
+        configure_socket(self.socket)
+        self.max_in_flight = max_in_flight
+
+        self._reader = FrameReader(self.socket)
+        self._next_id = 0
+        # Ids and kinds of the pending requests, in order
+        self._in_flight = deque()
+        # The number of pending requests, first in _in_flight, whose blocking
+        # call timed out, their responses are discarded
+        self._abandoned = 0
+
+        if observation_space is None or action_space is None:
+            spaces = self._call(SPACES, None)
+            if observation_space is None:
+                observation_space = decode_space(spaces[0])
+            if action_space is None:
+                action_space = decode_space(spaces[1])
+        self.observation_space = observation_space
+        self.action_space = action_space
+
+    def reset(self):
+        """
+        :return: The first observation of the new episode
+        """
+        return self._call(RESET, None)
+
+    def step(self, action):
+        """
+        :param action: The action to apply
+        :return: tuple, (observation, reward, done, info)
+        """
+        return self._call(STEP, action)
+
+    def step_async(self, action):
+        """
+        Sends a step without waiting for its result.
+
+        :param action: The action to apply
+        """
+        if len(self._in_flight) >= self.max_in_flight:
+            raise AlreadyPendingCallError(
+                "Calling step_async with {} pending steps, max_in_flight is "
+                "reached".format(len(self._in_flight)), "step")
+        self._send([(STEP, action)])
+
+    def step_wait(self):
+        """
+        Waits for the oldest pending step.
+
+        :return: tuple, (observation, reward, done, info)
+        """
+        if not self._in_flight or self._in_flight[0][1] != STEP:
+            raise NoAsyncCallError(
+                "Calling step_wait without any prior call to step_async",
+                "step")
+        return self._receive()
+
+    def step_many(self, actions):
+        """
+        Applies a sequence of actions, sending them in pipelined batches of
+        max_in_flight. If a step raises an exception on the server, the
+        responses of the rest of its batch are read before it is raised and
+        the following batches are not sent.
+
+        :param actions: Iterable of the actions to apply, in order
+        :return: list of the (observation, reward, done, info) of every step
+        """
+        self._assert_idle()
+        results = []
+        actions = list(actions)
+        for start in range(0, len(actions), self.max_in_flight):
+            batch = actions[start:start + self.max_in_flight]
+            self._send([(STEP, action) for action in batch])
+            error = None
+            for _ in batch:
+                kind, result = self._read_response()
+                if kind == ERROR:
+                    error = error or result
+                else:
+                    results.append(result)
+            if error is not None:
+                raise _server_error(error)
+        return results
+
+    def close(self):
+        """
+        Waits for the pending requests and closes the connection, the server
+        then accepts the next client.
+        """
+        if self.socket.fileno() == -1:
+            return
+        try:
+            while self._in_flight:
+                self._read_response()
+            self._abandoned = 0
+            self._call(CLOSE, None)
+        except (RuntimeError, OSError):
+            pass
+        finally:
+            self.socket.close()
+
+    def _call(self, kind, value):
+        self._assert_idle()
+        self._send([(kind, value)])
+        try:
+            return self._receive()
+        except socket.timeout:
+            # The late response is discarded by the next blocking call
+            self._abandoned = len(self._in_flight)
+            raise
+
+    def _assert_idle(self):
+        while self._abandoned:
+            self._read_response()
+            self._abandoned -= 1
+        if self._in_flight:
+            raise AlreadyPendingCallError(
+                "Calling a blocking method while {} steps are pending, call "
+                "step_wait first".format(len(self._in_flight)), "step")
+
+    def _send(self, requests):
+        frames = []
+        for kind, value in requests:
+            frames.append(pack_frame(self._next_id, kind, value))
+            self._in_flight.append((self._next_id, kind))
+            self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+        self.socket.sendall(b"".join(frames))
+
+    def _receive(self):
+        kind, result = self._read_response()
+        if kind == ERROR:
+            raise _server_error(result)
+        return result
+
+    def _read_response(self):
+        """
+        Reads the response to the oldest pending request, which stays
+        pending until the response is complete, e.g. if reading it times
+        out.
+
+        :return: tuple, (response kind, decoded value)
+        """
+        expected_id, _ = self._in_flight[0]
+        try:
+            request_id, kind, body = self._reader.read_frame()
+        except EOFError:
+            raise RuntimeError("EnvServer closed the connection, e.g. "
+                               "because its Webots instance was closed")
+        if request_id != expected_id:
+            raise RuntimeError(
+                "Received the response to request {}, expected {}".format(
+                    request_id, expected_id))
+        self._in_flight.popleft()
+        return kind, decode_value(body)
+
+
+def _server_error(traceback):
+    return RuntimeError("EnvServer raised an exception:\n{}".format(traceback))
@@ -1,3 +1,11 @@
-from deepbots.robots.controllers.csv_robot import CSVRobot
-from deepbots.robots.controllers.emitter_receiver_robot import \
-    EmitterReceiverRobot
+from deepbots._lazy import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    "BinaryRobot": "deepbots.robots.controllers.binary_robot",
+    "CSVRobot": "deepbots.robots.controllers.csv_robot",
+    "EmitterReceiverRobot":
+    "deepbots.robots.controllers.emitter_receiver_robot",
+    "MultiRobotBinaryRobot":
+    "deepbots.robots.controllers.multi_robot_binary_robot",
+    "SpaceCodecRobot": "deepbots.robots.controllers.space_codec_robot",
+})
@@ -0,0 +1,138 @@
+import numpy as np
+
+from deepbots.robots.controllers.emitter_receiver_robot import \
+    EmitterReceiverRobot
+
+
+class BinaryRobot(EmitterReceiverRobot):
+    """
+    Basic implementation of a robot that can emit and receive messages to/from
+    the supervisor as raw binary data that contain fixed-dtype NumPy arrays.
+
+    This is the robot counterpart of BinarySupervisorEnv, both sides must
+    agree on the dtypes used.
+    """
+    def __init__(self,
+                 emitter_name="emitter",
+                 receiver_name="receiver",
+                 timestep=None,
+                 observation_dtype=np.float32,
+                 action_dtype=np.float32,
+                 receive_policy=None,
+                 transport=None,
+                 send_period=1,
+                 receive_period=1,
+                 aggregation=None,
+                 observation_encoding=None,
+                 action_encoding=None):
+        """
+        The constructor stores the message dtypes and passes the rest of the
+        arguments provided to the parent class contructor.
+
+        :param emitter_name: The name of the emitter device on the
+            robot node, defaults to "emitter"
+        :param receiver_name: The name of the receiver device on the
+            robot node, defaults to "receiver"
+        :param timestep: The robot controller timestep, defaults to None
+        :param observation_dtype: NumPy dtype the messages sent to the
+            supervisor are packed with, defaults to np.float32
+        :param action_dtype: NumPy dtype the messages received from the
+            supervisor are decoded with, defaults to np.float32
+        :param receive_policy: The ReceivePolicy used by handle_receiver(),
+            defaults to None, i.e. FIFOPolicy()
+        :param transport: Transport replacing the Webots devices, defaults
+            to None
+        :param send_period: Send a message every that many steps, defaults
+            to 1
+        :param receive_period: Handle received messages every that many
+            steps, defaults to 1
+        :param aggregation: How sense() readings are aggregated between
+            sends, defaults to None, see EmitterReceiverRobot
+        :param observation_encoding: MessageEncoding of the messages sent to
+            the supervisor, defaults to None, i.e. raw observation_dtype
+            values
+        :param action_encoding: MessageEncoding of the actions received,
+            defaults to None, i.e. raw action_dtype values
+        """
+        self.observation_dtype = np.dtype(observation_dtype)
+        self.action_dtype = np.dtype(action_dtype)
+        self._observation_encoder = None
+        if observation_encoding is not None:
+            self._observation_encoder = observation_encoding.encoder(
+                self.observation_dtype)
+        self._action_decoder = None
+        if action_encoding is not None:
+            self._action_decoder = action_encoding.decoder(self.action_dtype)
+        super().__init__(emitter_name, receiver_name, timestep,
+                         receive_policy, transport, send_period,
+                         receive_period, aggregation)
+        if action_encoding is not None and action_encoding.delta:
+            # Deltas build on every message, including the dropped ones
+            self.receive_policy.on_drop = self._action_decoder.decode
+
+    def initialize_comms(self, emitter_name, receiver_name):
+        """
+        This method implements the basic emitter/receiver initialization that
+        assumes that an emitter and a receiver component are present on the
+        Webots robot with appropriate DEFs ("emitter"/"receiver").
+
+        :param emitter_name: The name of the emitter device on the
+            supervisor node
+        :param receiver_name: The name of the receiver device on the
+            supervisor node
+        :return: The initialized emitter and receiver references
+        """
+        emitter = self.getDevice(emitter_name)
+        receiver = self.getDevice(receiver_name)
+        receiver.enable(self.timestep)
+        return emitter, receiver
+
+    def handle_emitter(self):
+        """
+        This emitter uses the user-implemented create_message() method to get
+        whatever data the robot gathered, packs it as observation_dtype values
+        and sends the raw bytes to the supervisor.
+        """
+        data = self.create_message()
+        if self._observation_encoder is not None:
+            message = self._observation_encoder.encode(data)
+        else:
+            message = np.ascontiguousarray(
+                data, dtype=self.observation_dtype).tobytes()
+        self.emitter.send(message)
+
+    def handle_receiver(self):
+        """
+        This receiver decodes the binary messages received from the
+        supervisor into read-only NumPy arrays, without copying, and passes
+        them to the use_message_data() method. With an action encoding, the
+        arrays are copies and deltas that cannot be applied are skipped.
+        """
+        for message in self.receive_messages(self._decode):
+            if message is not None:
+                self.use_message_data(message)
+
+    def _decode(self, message):
+        if self._action_decoder is not None:
+            return self._action_decoder.decode(message)
+        return np.frombuffer(message, dtype=self.action_dtype)
+
+    def create_message(self):
+        """
+        This method should be implemented to convert whatever data the robot
+        has, eg. sensor data, into a message to be sent to the supervisor via
+        the emitter.
+
+        :return: array-like, convertible to an array of observation_dtype
+        """
+        raise NotImplementedError
+
+    def use_message_data(self, message):
+        """
+        This method should be implemented to apply whatever actions the
+        message (received from the supervisor) contains.
+
+        :param message: np.ndarray of action_dtype values received from the
+            supervisor
+        """
+        raise NotImplementedError
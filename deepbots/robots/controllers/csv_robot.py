@@ -13,7 +13,12 @@ class CSVRobot(EmitterReceiverRobot):
     def __init__(self,
                  emitter_name="emitter",
                  receiver_name="receiver",
-                 timestep=None):
+                 timestep=None,
+                 receive_policy=None,
+                 transport=None,
+                 send_period=1,
+                 receive_period=1,
+                 aggregation=None):
         """
         The constructor just passes the arguments provided to the parent
         class contructor.
@@ -23,8 +28,20 @@ class CSVRobot(EmitterReceiverRobot):
         :param receiver_name: The name of the receiver device on the
             robot node, defaults to "receiver"
         :param timestep: The robot controller timestep, defaults to None
+        :param receive_policy: The ReceivePolicy used by handle_receiver(),
+            defaults to None, i.e. FIFOPolicy()
+        :param transport: Transport replacing the Webots devices, defaults
+            to None
+        :param send_period: Send a message every that many steps, defaults
+            to 1
+        :param receive_period: Handle received messages every that many
+            steps, defaults to 1
+        :param aggregation: How sense() readings are aggregated between
+            sends, defaults to None, see EmitterReceiverRobot
         """
-        super().__init__(emitter_name, receiver_name, timestep)
+        super().__init__(emitter_name, receiver_name, timestep,
+                         receive_policy, transport, send_period,
+                         receive_period, aggregation)
 
     def initialize_comms(self, emitter_name, receiver_name):
         """
@@ -74,20 +91,15 @@ class CSVRobot(EmitterReceiverRobot):
         This receiver uses the basic Webots receiver-handling code. The
         use_message_data() method should be implemented to actually use the
         data received from the supervisor.
-        """
-        if self.receiver.getQueueLength() > 0:
-            # Receive and decode message from supervisor
-            try:
-                message = self.receiver.getString()
-            except AttributeError:
-                message = self.receiver.getData().decode("utf-8")
-            # Convert string message into a list
-            message = message.split(",")
 
+        The receive policy decides which messages are used, each one is
+        passed to use_message_data() in order.
+        """
+        # Decode messages from supervisor and convert them into lists
+        for message in self.receive_messages(
+                lambda message: str(message, "utf-8").split(",")):
             self.use_message_data(message)
 
-            self.receiver.nextPacket()
-
     def create_message(self):
         """
         This method should be implemented to convert whatever data the robot
@@ -2,6 +2,10 @@ from warnings import simplefilter, warn
 
 from controller import Robot
 
+from deepbots.comms.receive_policy import FIFOPolicy
+
+AGGREGATIONS = ("last", "mean", "max")
+
 
 class EmitterReceiverRobot(Robot):
     """
@@ -15,11 +19,24 @@ class EmitterReceiverRobot(Robot):
     simpler RobotController that implements the methods in a basic form
     inherit the CSVRobot subclass or other emitter-receiver
     subclasses.
+
+    Which packets of the receiver queue are used on each step is decided by
+    a receive policy, see deepbots.comms.receive_policy.
+
+    The run method can send and receive messages less often than it steps
+    the robot, see send_period and receive_period. Sensors can still be
+    read on every step by implementing sense(), with the readings
+    aggregated between sends into readings.
     """
     def __init__(self,
                  emitter_name="emitter",
                  receiver_name="receiver",
-                 timestep=None):
+                 timestep=None,
+                 receive_policy=None,
+                 transport=None,
+                 send_period=1,
+                 receive_period=1,
+                 aggregation=None):
         """
         The basic robot constructor.
 
@@ -35,16 +52,83 @@ class EmitterReceiverRobot(Robot):
         https://cyberbotics.com/doc/guide/controller-programming#the-step-and-wb_robot_step-functions
 
         :param timestep: int, positive or None
+        :param receive_policy: The ReceivePolicy used by handle_receiver(),
+            defaults to None, i.e. FIFOPolicy() that uses one packet per step
+        :param transport: Transport whose emitter and receiver replace the
+            Webots devices, e.g. a SharedMemoryTransport, defaults to None.
+            It is closed by close().
+        :param send_period: run() calls handle_emitter() every that many
+            steps, defaults to 1
+        :param receive_period: run() calls handle_receiver() every that many
+            steps, defaults to 1
+        :param aggregation: How the sense() readings of the steps between
+            sends are aggregated into readings, one of "last", "mean" and
+            "max", defaults to None, i.e. sense() is not called
         """
         super().__init__()
 
+        for name, period in (("send_period", send_period),
+                             ("receive_period", receive_period)):
+            if int(period) < 1:
+                raise ValueError(
+                    "{} must be a positive integer, got {}".format(
+                        name, period))
+        if aggregation is not None and aggregation not in AGGREGATIONS:
+            raise ValueError("Unknown aggregation {}, expected one of "
+                             "{}".format(aggregation, AGGREGATIONS))
+        self.send_period = int(send_period)
+        self.receive_period = int(receive_period)
+        self.aggregation = aggregation
+        self.readings = None
+        self._window = None
+        self._window_count = 0
+
         if timestep is None:
             self.timestep = int(self.getBasicTimeStep())
         else:
             self.timestep = timestep
 
-        self.emitter, self.receiver = self.initialize_comms(
-            emitter_name, receiver_name)
+        if receive_policy is None:
+            receive_policy = FIFOPolicy()
+        self.receive_policy = receive_policy
+
+        self.transport = transport
+        if transport is None:
+            self.emitter, self.receiver = self.initialize_comms(
+                emitter_name, receiver_name)
+        else:
+            self.emitter, self.receiver = transport.open(
+                "robot", self.getTime)
+
+    def close(self):
+        """
+        Closes the transport, if any. Called by run() when the simulation
+        ends.
+        """
+        if self.transport is not None:
+            self.transport.close()
+
+    def receive_messages(self, decode):
+        """
+        Reads the receiver queue according to the receive policy and decodes
+        the packets selected. To be used by handle_receiver().
+
+        :param decode: Function that converts a packet (bytes) to a message
+        :return: list of the decoded messages, oldest first
+        """
+        return [
+            decode(message) for message in self.receive_policy.receive(
+                self.receiver, self.getTime())
+        ]
+
+    @property
+    def receive_stats(self):
+        """
+        The receiver queue counters of the last step.
+
+        :return: ReceiveStats, see deepbots.comms.receive_policy
+        """
+        return self.receive_policy.stats
 
     def get_timestep(self):
         # The filter is required so as to not ignore the Deprecation warning
@@ -106,14 +190,79 @@ class EmitterReceiverRobot(Robot):
         """
         raise NotImplementedError
 
+    def sense(self):
+        """
+        This method can be implemented to read the robot's sensors on every
+        step when an aggregation is set. The readings of the steps between
+        two sends are aggregated and stored in readings right before
+        handle_emitter() is called, so that create_message() can use them.
+
+        :return: array-like of numeric sensor readings, of the same size on
+            every step
+        """
+        raise NotImplementedError
+
+    def _aggregate(self, reading):
+        # NumPy is only needed for aggregation and is imported here to keep
+        # the startup of robot controllers fast
+        import numpy as np
+
+        reading = np.asarray(reading, dtype=np.float64)
+        if self._window is None:
+            self._window = np.empty_like(reading)
+            self.readings = np.empty_like(reading)
+        if self._window_count == 0 or self.aggregation == "last":
+            self._window[...] = reading
+        elif self.aggregation == "mean":
+            self._window += reading
+        else:
+            np.maximum(self._window, reading, out=self._window)
+        self._window_count += 1
+
+    def _flush_window(self):
+        if self._window_count == 0:
+            return
+        if self.aggregation == "mean":
+            self.readings[...] = self._window
+            self.readings /= self._window_count
+        else:
+            self.readings[...] = self._window
+        self._window_count = 0
+
     def run(self):
         """
         This method is required by Webots to update the robot in the
         simulation. It steps the robot and in each step it runs the two
         handler methods to use the emitter and receiver components.
 
+        handle_receiver() is called every receive_period steps and
+        handle_emitter() every send_period steps. With an aggregation set,
+        sense() is called on every step in between.
+
         This method should be called by a robot manager to run the robot.
+        close() is called once the simulation ends.
         """
+        try:
+            self._run()
+        finally:
+            self.close()
+
+    def _run(self):
+        if (self.send_period == 1 and self.receive_period == 1
+                and self.aggregation is None):
+            while self.step(self.timestep) != -1:
+                self.handle_receiver()
+                self.handle_emitter()
+            return
+
+        steps = 0
         while self.step(self.timestep) != -1:
-            self.handle_receiver()
-            self.handle_emitter()
+            steps += 1
+            if steps % self.receive_period == 0:
+                self.handle_receiver()
+            if self.aggregation is not None:
+                self._aggregate(self.sense())
+            if steps % self.send_period == 0:
+                if self.aggregation is not None:
+                    self._flush_window()
+                self.handle_emitter()
@@ -0,0 +1,93 @@
+import numpy as np
+
+from deepbots.robots.controllers.binary_robot import BinaryRobot
+
+
+class MultiRobotBinaryRobot(BinaryRobot):
+    """
+    A BinaryRobot that is one of many robots controlled by a
+    MultiRobotBinarySupervisorEnv.
+
+    Messages sent to the supervisor are prefixed with the robot id, so that
+    they can be routed to the right robot. The actions received are either
+    the robot's own actions, when the supervisor addresses each robot on its
+    own channel, or the actions of all robots, when the supervisor
+    broadcasts them, in which case action_size must be provided so that the
+    robot can pick its own row.
+    """
+    def __init__(self,
+                 robot_id,
+                 action_size=None,
+                 emitter_name="emitter",
+                 receiver_name="receiver",
+                 timestep=None,
+                 observation_dtype=np.float32,
+                 action_dtype=np.float32,
+                 receive_policy=None,
+                 transport=None,
+                 send_period=1,
+                 receive_period=1,
+                 aggregation=None):
+        """
+        :param robot_id: The id of the robot, in [0, n_robots)
+        :param action_size: The number of action values per robot when the
+            supervisor broadcasts the actions of all robots, defaults to
+            None, i.e. every packet received contains only this robot's
+            actions
+        :param emitter_name: The name of the emitter device on the
+            robot node, defaults to "emitter"
+        :param receiver_name: The name of the receiver device on the
+            robot node, defaults to "receiver"
+        :param timestep: The robot controller timestep, defaults to None
+        :param observation_dtype: NumPy dtype the messages sent to the
+            supervisor are packed with, defaults to np.float32
+        :param action_dtype: NumPy dtype the messages received from the
+            supervisor are decoded with, defaults to np.float32
+        :param receive_policy: The ReceivePolicy used by handle_receiver(),
+            defaults to None, i.e. FIFOPolicy()
+        :param transport: Transport replacing the Webots devices, e.g. a
+            SharedMemoryTransport, defaults to None
+        :param send_period: Send a message every that many steps, defaults
+            to 1
+        :param receive_period: Handle received messages every that many
+            steps, defaults to 1
+        :param aggregation: How sense() readings are aggregated between
+            sends, defaults to None, see EmitterReceiverRobot
+        """
+        self.robot_id = robot_id
+        self.action_size = action_size
+        self._header = np.array(robot_id, dtype="<u2").tobytes()
+        super().__init__(emitter_name,
+                         receiver_name,
+                         timestep,
+                         observation_dtype,
+                         action_dtype,
+                         receive_policy,
+                         transport,
+                         send_period=send_period,
+                         receive_period=receive_period,
+                         aggregation=aggregation)
+
+    def handle_emitter(self):
+        """
+        This emitter packs the data returned by create_message() as
+        observation_dtype values, prefixed with the robot id, and sends them
+        to the supervisor.
+        """
+        data = self.create_message()
+        message = np.ascontiguousarray(data,
+                                       dtype=self.observation_dtype).tobytes()
+        self.emitter.send(self._header + message)
+
+    def _decode(self, message):
+        """
+        Decodes this robot's actions from the message received from the
+        supervisor, without copying.
+        """
+        if self.action_size is None:
+            return np.frombuffer(message, dtype=self.action_dtype)
+        return np.frombuffer(message,
+                             dtype=self.action_dtype,
+                             count=self.action_size,
+                             offset=self.robot_id * self.action_size *
+                             self.action_dtype.itemsize)
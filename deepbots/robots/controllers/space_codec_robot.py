@@ -0,0 +1,108 @@
+from deepbots.comms.space_codec import SpaceCodec
+from deepbots.robots.controllers.emitter_receiver_robot import \
+    EmitterReceiverRobot
+
+
+class SpaceCodecRobot(EmitterReceiverRobot):
+    """
+    Basic implementation of a robot that can emit and receive messages to/from
+    the supervisor in a fixed binary layout compiled from gym spaces, see
+    SpaceCodec.
+
+    This is the robot counterpart of SpaceCodecSupervisorEnv, both sides must
+    be given the same spaces.
+    """
+    def __init__(self,
+                 action_space,
+                 message_space,
+                 emitter_name="emitter",
+                 receiver_name="receiver",
+                 timestep=None,
+                 receive_policy=None,
+                 transport=None,
+                 send_period=1,
+                 receive_period=1,
+                 aggregation=None):
+        """
+        The constructor compiles the codecs of the spaces provided and passes
+        the rest of the arguments to the parent class contructor.
+
+        :param action_space: The gym space of the actions sent by the
+            supervisor
+        :param message_space: The gym space of the messages sent to the
+            supervisor
+        :param emitter_name: The name of the emitter device on the
+            robot node, defaults to "emitter"
+        :param receiver_name: The name of the receiver device on the
+            robot node, defaults to "receiver"
+        :param timestep: The robot controller timestep, defaults to None
+        :param receive_policy: The ReceivePolicy used by handle_receiver(),
+            defaults to None, i.e. FIFOPolicy()
+        :param transport: Transport replacing the Webots devices, defaults
+            to None
+        :param send_period: Send a message every that many steps, defaults
+            to 1
+        :param receive_period: Handle received messages every that many
+            steps, defaults to 1
+        :param aggregation: How sense() readings are aggregated between
+            sends, defaults to None, see EmitterReceiverRobot
+        """
+        self.action_codec = SpaceCodec(action_space)
+        self.message_codec = SpaceCodec(message_space)
+        super().__init__(emitter_name, receiver_name, timestep,
+                         receive_policy, transport, send_period,
+                         receive_period, aggregation)
+
+    def initialize_comms(self, emitter_name, receiver_name):
+        """
+        This method implements the basic emitter/receiver initialization that
+        assumes that an emitter and a receiver component are present on the
+        Webots robot with appropriate DEFs ("emitter"/"receiver").
+
+        :param emitter_name: The name of the emitter device on the
+            supervisor node
+        :param receiver_name: The name of the receiver device on the
+            supervisor node
+        :return: The initialized emitter and receiver references
+        """
+        emitter = self.getDevice(emitter_name)
+        receiver = self.getDevice(receiver_name)
+        receiver.enable(self.timestep)
+        return emitter, receiver
+
+    def handle_emitter(self):
+        """
+        This emitter packs the data returned by the user-implemented
+        create_message() method with the message space codec and sends it to
+        the supervisor.
+        """
+        self.emitter.send(self.message_codec.encode(self.create_message()))
+
+    def handle_receiver(self):
+        """
+        This receiver unpacks the messages received from the supervisor with
+        the action space codec and passes them to the use_message_data()
+        method.
+        """
+        for message in self.receive_messages(self.action_codec.decode):
+            self.use_message_data(message)
+
+    def create_message(self):
+        """
+        This method should be implemented to convert whatever data the robot
+        has, eg. sensor data, into a message to be sent to the supervisor via
+        the emitter.
+
+        :return: A value that belongs to the message space
+        """
+        raise NotImplementedError
+
+    def use_message_data(self, message):
+        """
+        This method should be implemented to apply whatever actions the
+        message (received from the supervisor) contains.
+
+        :param message: A value of the action space received from the
+            supervisor
+        """
+        raise NotImplementedError
@@ -1,7 +1,23 @@
-from deepbots.supervisor.controllers.csv_supervisor_env import CSVSupervisorEnv
-from deepbots.supervisor.controllers.deepbots_supervisor_env import \
-    DeepbotsSupervisorEnv
-from deepbots.supervisor.controllers.emitter_receiver_supervisor_env import \
-    EmitterReceiverSupervisorEnv
-from deepbots.supervisor.controllers.robot_supervisor_env import \
-    RobotSupervisorEnv
+from deepbots._lazy import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    "BinarySupervisorEnv":
+    "deepbots.supervisor.controllers.binary_supervisor_env",
+    "CSVSupervisorEnv": "deepbots.supervisor.controllers.csv_supervisor_env",
+    "DeepbotsSupervisorEnv":
+    "deepbots.supervisor.controllers.deepbots_supervisor_env",
+    "EmitterReceiverSupervisorEnv":
+    "deepbots.supervisor.controllers.emitter_receiver_supervisor_env",
+    "MultiRobotBinarySupervisorEnv":
+    "deepbots.supervisor.controllers.multi_robot_binary_supervisor_env",
+    "MultiRobotSupervisorEnv":
+    "deepbots.supervisor.controllers.multi_robot_supervisor_env",
+    "ReplaySupervisorEnv":
+    "deepbots.supervisor.controllers.replay_supervisor_env",
+    "ReplicatedArenaSupervisorEnv":
+    "deepbots.supervisor.controllers.replicated_arena_supervisor_env",
+    "RobotSupervisorEnv":
+    "deepbots.supervisor.controllers.robot_supervisor_env",
+    "SpaceCodecSupervisorEnv":
+    "deepbots.supervisor.controllers.space_codec_supervisor_env",
+})
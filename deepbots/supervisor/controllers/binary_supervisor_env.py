@@ -0,0 +1,110 @@
+import numpy as np
+
+from deepbots.supervisor.controllers.emitter_receiver_supervisor_env import \
+    EmitterReceiverSupervisorEnv
+
+
+class BinarySupervisorEnv(EmitterReceiverSupervisorEnv):
+    """
+    This class implements the emitter-receiver scheme using raw binary
+    messages that contain fixed-dtype NumPy arrays.
+
+    Compared to CSVSupervisorEnv no string conversion takes place, actions
+    are packed with a single tobytes() call and observations are decoded
+    with np.frombuffer() into ready-to-use arrays, without copying the
+    received data.
+
+    The robot counterpart of this class is BinaryRobot and both sides must
+    agree on the dtypes used. Messages can additionally be quantized, delta
+    encoded and compressed by passing the same MessageEncoding to both
+    sides, see deepbots.comms.message_encoding.
+    """
+    def __init__(self,
+                 emitter_name="emitter",
+                 receiver_name="receiver",
+                 timestep=None,
+                 action_dtype=np.float32,
+                 observation_dtype=np.float32,
+                 receive_policy=None,
+                 action_repeat=1,
+                 transport=None,
+                 action_encoding=None,
+                 observation_encoding=None):
+        """
+        The constructor stores the message dtypes and passes the rest of the
+        arguments provided to the parent class contructor.
+
+        :param emitter_name: The name of the emitter device on the
+            supervisor node
+        :param receiver_name: The name of the receiver device on the
+            supervisor node
+        :param timestep: The supervisor controller timestep
+        :param action_dtype: NumPy dtype the actions are packed with, a
+            structured dtype can be used for struct-like layouts, defaults
+            to np.float32
+        :param observation_dtype: NumPy dtype the messages received from the
+            robot are decoded with, defaults to np.float32
+        :param receive_policy: The ReceivePolicy used by handle_receiver(),
+            defaults to None, i.e. FIFOPolicy()
+        :param action_repeat: The number of timesteps each action is applied
+            for, defaults to 1
+        :param transport: Transport replacing the Webots devices, defaults
+            to None
+        :param action_encoding: MessageEncoding of the actions, defaults to
+            None, i.e. raw action_dtype values
+        :param observation_encoding: MessageEncoding of the messages
+            received from the robot, defaults to None, i.e. raw
+            observation_dtype values
+        """
+        self.action_dtype = np.dtype(action_dtype)
+        self.observation_dtype = np.dtype(observation_dtype)
+        self._action_encoder = None
+        if action_encoding is not None:
+            self._action_encoder = action_encoding.encoder(self.action_dtype)
+        self._observation_decoder = None
+        if observation_encoding is not None:
+            self._observation_decoder = observation_encoding.decoder(
+                self.observation_dtype)
+        super(BinarySupervisorEnv,
+              self).__init__(emitter_name, receiver_name, timestep,
+                             receive_policy, action_repeat, transport)
+        if observation_encoding is not None and observation_encoding.delta:
+            # Deltas build on every message, including the dropped ones
+            self.receive_policy.on_drop = self._observation_decoder.decode
+
+    def handle_emitter(self, action):
+        """
+        Implementation of the handle_emitter method that packs the action
+        into a binary message of action_dtype values.
+
+        :param action: Whatever the use-case uses as an action, e.g.
+            an integer representing discrete actions
+        :type action: array-like, convertible to an array of action_dtype
+        """
+        if self._action_encoder is not None:
+            message = self._action_encoder.encode(action)
+        else:
+            message = np.ascontiguousarray(action,
+                                           dtype=self.action_dtype).tobytes()
+        self.emitter.send(message)
+
+    def handle_receiver(self):
+        """
+        Implementation of the handle_receiver method that decodes the
+        binary message received from the robot.
+
+        The returned array is a read-only view on the received bytes, unless
+        an observation encoding is used. With delta encoding, None is
+        returned for deltas that cannot be applied.
+
+        :return: Returns the message received from the robot, returns None
+            if no message is received. A list of messages for aggregating
+            receive policies.
+        :rtype: np.ndarray of observation_dtype values
+        """
+        return self.receive_messages(self._decode)
+
+    def _decode(self, message):
+        if self._observation_decoder is not None:
+            return self._observation_decoder.decode(message)
+        return np.frombuffer(message, dtype=self.observation_dtype)
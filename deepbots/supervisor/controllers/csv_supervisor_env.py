@@ -12,7 +12,10 @@ class CSVSupervisorEnv(EmitterReceiverSupervisorEnv):
     def __init__(self,
                  emitter_name="emitter",
                  receiver_name="receiver",
-                 timestep=None):
+                 timestep=None,
+                 receive_policy=None,
+                 action_repeat=1,
+                 transport=None):
         """
         The constructor just passes the arguments provided to the parent
         class contructor.
@@ -22,9 +25,16 @@ class CSVSupervisorEnv(EmitterReceiverSupervisorEnv):
         :param receiver_name: The name of the receiver device on the
             supervisor node
         :param timestep: The supervisor controller timestep
+        :param receive_policy: The ReceivePolicy used by handle_receiver(),
+            defaults to None, i.e. FIFOPolicy()
+        :param action_repeat: The number of timesteps each action is applied
+            for, defaults to 1
+        :param transport: Transport replacing the Webots devices, defaults
+            to None
         """
         super(CSVSupervisorEnv, self).__init__(emitter_name, receiver_name,
-                                            timestep)
+                                               timestep, receive_policy,
+                                               action_repeat, transport)
 
     def handle_emitter(self, action):
         """
@@ -48,15 +58,9 @@ class CSVSupervisorEnv(EmitterReceiverSupervisorEnv):
         with Comma Separated Values (CSV).
 
         :return: Returns the message received from the robot, returns None
-            if no message is received
+            if no message is received. A list of messages for aggregating
+            receive policies.
         :rtype: List of string values
         """
-        if self.receiver.getQueueLength() > 0:
-            try:
-                string_message = self.receiver.getString()
-            except AttributeError:
-                string_message = self.receiver.getData().decode("utf-8")
-            self.receiver.nextPacket()
-            return string_message.split(",")
-        else:
-            return None
+        return self.receive_messages(
+            lambda message: str(message, "utf-8").split(","))
@@ -1,6 +1,36 @@
+import queue
+import threading
+import time
+from collections import deque
+from copy import deepcopy
+
 import gym
+import numpy as np
 from controller import Supervisor
 
+from deepbots.launcher.heartbeat import Heartbeat
+
+# Node quantities that can be cached, mapped to their Node getter and size
+NODE_QUANTITIES = {
+    "position": ("getPosition", 3),
+    "orientation": ("getOrientation", 9),
+    "velocity": ("getVelocity", 6),
+    "center_of_mass": ("getCenterOfMass", 3),
+}
+# Simulation modes of the simulation schedule, the Supervisor constants of
+# some of them are only defined by some Webots versions
+SIMULATION_MODES = ("pause", "real_time", "run", "fast")
+# Field types that can be cached, mapped to their size
+FIELD_SIZES = {
+    "SFBool": 1,
+    "SFInt32": 1,
+    "SFFloat": 1,
+    "SFVec2f": 2,
+    "SFVec3f": 3,
+    "SFRotation": 4,
+    "SFColor": 3,
+}
+
 
 class DeepbotsSupervisorEnv(Supervisor, gym.Env):
     """
@@ -21,7 +51,48 @@ class DeepbotsSupervisorEnv(Supervisor, gym.Env):
     inherited by your own class, such as the RobotSupervisorEnv class.
     Nevertheless, advanced users can inherit this class to create
     their own supervisor classes if they wish.
+
+    The reset method can optionally perform a faster "soft" reset that only
+    restores the state of selected nodes, see enable_soft_reset().
+
+    The state of selected nodes can also be cached, so that it is read from
+    the simulator only once per timestep and shared by get_observations(),
+    get_reward() and is_done(), see register_node_state().
+
+    step() can also run on a dedicated stepping thread, so that the agent
+    computes its next action while the simulator steps, see enable_async().
+
+    The simulation mode can be switched between training and evaluation
+    episodes, e.g. fast training with periodic real-time evaluation, see
+    set_simulation_schedule().
     """
+    def __init__(self, reset_history=100):
+        """
+        :param reset_history: The number of reset durations kept in
+            reset_durations, defaults to 100
+        """
+        super(DeepbotsSupervisorEnv, self).__init__()
+
+        # (kind, seconds) tuples, kind being "soft" or "full"
+        self.reset_durations = deque(maxlen=reset_history)
+        self._soft_reset_snapshot = None
+        self._full_reset_interval = None
+        self._full_reset_requested = False
+        self._resets_since_full = 0
+
+        self.node_states = None
+        self._node_state_specs = {}
+        self._node_state_readers = []
+
+        self._async_thread = None
+
+        self._simulation_schedule = None
+        self._simulation_mode = None
+        self._sampling_periods = {}
+        self.evaluating = False
+
+        # Reports the timesteps to a WebotsPool, see Heartbeat
+        self._heartbeat = Heartbeat.from_environment()
 
     def step(self, action):
         """
@@ -57,13 +128,559 @@ class DeepbotsSupervisorEnv(Supervisor, gym.Env):
         has previously implemented, so an old supervisor can be migrated
         easily to use this class.
 
+        If soft reset is enabled, see enable_soft_reset(), only the nodes
+        of the snapshot are restored, unless a full reset is due. The
+        duration of every reset is recorded in reset_durations.
+
+        If a simulation schedule is set, see set_simulation_schedule(), the
+        simulation mode of the new episode is set first.
+
         :return: default observation provided by get_default_observation()
         """
-        self.simulationReset()
-        self.simulationResetPhysics()
+        start = time.perf_counter()
+        if self._simulation_schedule is not None:
+            self._apply_simulation_schedule(start)
+        if self._soft_reset_snapshot is None or self._full_reset_due():
+            self.simulationReset()
+            self.simulationResetPhysics()
+            kind = "full"
+            self._resets_since_full = 0
+            self._full_reset_requested = False
+            if self._node_state_readers:
+                self._resolve_node_states()
+            if self._soft_reset_snapshot is not None:
+                self._soft_reset_snapshot = self._resolve_snapshot(
+                    self._soft_reset_snapshot)
+        else:
+            self._restore_snapshot(self._soft_reset_snapshot)
+            kind = "soft"
+            self._resets_since_full += 1
         super(Supervisor, self).step(int(self.getBasicTimeStep()))
+        if self._node_state_readers:
+            self.update_node_states()
+        self.reset_durations.append((kind, time.perf_counter() - start))
         return self.get_default_observation()
 
+    def close(self):
+        """
+        Stops the stepping thread, see enable_async(), and releases the
+        resources of the environment. Subclasses that hold resources, e.g. a
+        transport, release them here too.
+        """
+        self.disable_async()
+        # Wrappers do not call the constructor of this class
+        heartbeat = getattr(self, "_heartbeat", None)
+        if heartbeat is not None:
+            heartbeat.close()
+            self._heartbeat = None
+
+    def enable_soft_reset(self,
+                          def_names,
+                          fields=None,
+                          full_reset_interval=None):
+        """
+        Captures a snapshot of the current state of the nodes provided and
+        makes reset() restore only that snapshot instead of resetting the
+        whole simulation, which is much faster for large worlds. It should
+        be called while the world is in its initial state, e.g. at the end
+        of the constructor.
+
+        The translation and rotation fields, if present, and the velocity of
+        every node are captured, along with any additional single-value
+        (SF) fields given in fields. The physics of the nodes are reset on
+        every soft reset.
+
+        The full reset is kept as a fallback, performed every
+        full_reset_interval resets or once after request_full_reset(). The
+        node and field handles of the snapshot are resolved again after
+        every full reset, the captured values are kept.
+
+        :param def_names: Iterable of the DEF names of the nodes to restore
+        :param fields: dict mapping DEF names to lists of additional field
+            names to restore, defaults to None
+        :param full_reset_interval: Perform a full reset every that many
+            resets, defaults to None, i.e. never unless requested
+        """
+        self._soft_reset_snapshot = self._capture_snapshot(def_names, fields)
+        self._full_reset_interval = full_reset_interval
+        self._resets_since_full = 0
+
+    def _capture_snapshot(self, def_names, fields=None):
+        """
+        Captures the translation, rotation and velocity of the nodes
+        provided, along with the additional SF fields given, see
+        enable_soft_reset().
+
+        :return: The snapshot, to be restored by _restore_snapshot()
+        """
+        fields = {} if fields is None else fields
+        snapshot = []
+        def_names = list(def_names)
+        for def_name in def_names + [
+                def_name for def_name in fields if def_name not in def_names
+        ]:
+            node = self._get_node(def_name)
+
+            field_names = ["translation", "rotation"]
+            saved_fields = []
+            for field_name in field_names + list(fields.get(def_name, [])):
+                if field_name in field_names and node.getField(
+                        field_name) is None:
+                    continue
+                field = self._get_field(node, def_name, field_name)
+                type_name = field.getTypeName()
+                if not type_name.startswith("SF"):
+                    raise ValueError(
+                        "Field {} of node {} is a {} field, only SF fields "
+                        "are supported".format(field_name, def_name,
+                                               type_name))
+                setter = getattr(field, "set" + type_name)
+                value = getattr(field, "get" + type_name)()
+                saved_fields.append((field_name, setter, value))
+            snapshot.append((def_name, node, saved_fields, node.getVelocity()))
+        return snapshot
+
+    def _resolve_snapshot(self, snapshot):
+        """
+        Resolves the node and field handles of a snapshot again, keeping
+        the captured values, since a full reset invalidates them.
+
+        :return: The snapshot with the new handles
+        """
+        resolved = []
+        for def_name, _, saved_fields, velocity in snapshot:
+            node = self._get_node(def_name)
+            fields = []
+            for field_name, _, value in saved_fields:
+                field = self._get_field(node, def_name, field_name)
+                fields.append(
+                    (field_name, getattr(field,
+                                         "set" + field.getTypeName()), value))
+            resolved.append((def_name, node, fields, velocity))
+        return resolved
+
+    def disable_soft_reset(self):
+        """
+        Makes reset() perform full simulation resets again.
+        """
+        self._soft_reset_snapshot = None
+
+    def request_full_reset(self):
+        """
+        Makes the next reset() perform a full simulation reset even if soft
+        reset is enabled, e.g. when the episode changed the world in ways
+        the snapshot does not cover.
+        """
+        self._full_reset_requested = True
+
+    def set_simulation_schedule(self,
+                                training_mode="fast",
+                                evaluation_mode="real_time",
+                                evaluation_interval=None,
+                                training_disabled_devices=()):
+        """
+        Makes reset() switch the simulation mode between training and
+        evaluation episodes. Every evaluation_interval-th episode, or the
+        next one after evaluate_next_episode(), is an evaluation episode,
+        indicated by evaluating. Modes only change at resets.
+
+        The modes available depend on the Webots version: up to R2022b
+        "run" is fast with rendering and "fast" disables rendering, newer
+        versions only have "real_time" and "fast", with rendering disabled
+        through the --no-rendering command line option.
+
+        Devices such as cameras and range finders can be disabled during
+        training episodes and are enabled again, with their previous
+        sampling period, for evaluation episodes. They are enabled again
+        too when the schedule is replaced or cleared.
+
+        The number of simulation steps and the wall-clock time spent in each
+        mode are available through simulation_mode_stats.
+
+        :param training_mode: The mode of training episodes, one of "pause",
+            "real_time", "run" and "fast", defaults to "fast"
+        :param evaluation_mode: The mode of evaluation episodes, defaults to
+            "real_time"
+        :param evaluation_interval: Every that many episodes is an
+            evaluation episode, defaults to None, i.e. only when requested
+        :param training_disabled_devices: Iterable of the names of the
+            devices disabled in training episodes, defaults to ()
+        """
+        available = [
+            mode for mode in SIMULATION_MODES
+            if hasattr(self, "SIMULATION_MODE_" + mode.upper())
+        ]
+        modes = {}
+        for mode in (training_mode, evaluation_mode):
+            if mode not in available:
+                raise ValueError(
+                    "Simulation mode {} is not available, expected one of "
+                    "{}".format(mode, available))
+            modes[mode] = getattr(self, "SIMULATION_MODE_" + mode.upper())
+        devices = []
+        for name in training_disabled_devices:
+            device = self.getDevice(name)
+            if device is None or not hasattr(device, "disable"):
+                raise ValueError(
+                    "Device {} does not exist or cannot be disabled".format(
+                        name))
+            devices.append(device)
+
+        self._enable_scheduled_devices()
+        self._simulation_schedule = {
+            "training": training_mode,
+            "evaluation": evaluation_mode,
+            "values": modes,
+            "interval": evaluation_interval,
+            "devices": devices,
+        }
+        self._evaluation_requested = False
+        self._episodes_started = 0
+        self._simulation_mode = None
+        self._mode_stats = {}
+        self._mode_start = None
+
+    def clear_simulation_schedule(self):
+        """
+        Stops switching simulation modes, the current mode is kept. The
+        devices disabled by training episodes are enabled again with their
+        previous sampling period.
+        """
+        self._enable_scheduled_devices()
+        self._simulation_schedule = None
+        self._simulation_mode = None
+        self.evaluating = False
+
+    def evaluate_next_episode(self):
+        """
+        Makes the episode started by the next reset() an evaluation episode.
+        """
+        self._evaluation_requested = True
+
+    @property
+    def simulation_mode_stats(self):
+        """
+        :return: dict mapping each simulation mode used by the schedule to a
+            dict of its episodes, simulation steps, wall-clock seconds and
+            steps per second
+        """
+        stats = {}
+        for mode, (episodes, steps, seconds) in self._mode_stats.items():
+            if mode == self._simulation_mode:
+                seconds += time.perf_counter() - self._mode_start
+            stats[mode] = {
+                "episodes": episodes,
+                "steps": steps,
+                "seconds": seconds,
+                "steps_per_second": steps / seconds if seconds > 0 else None,
+            }
+        return stats
+
+    def _apply_simulation_schedule(self, now):
+        schedule = self._simulation_schedule
+        if self._simulation_mode is not None:
+            self._mode_stats[self._simulation_mode][2] += (now -
+                                                          self._mode_start)
+
+        self._episodes_started += 1
+        self.evaluating = self._evaluation_requested or (
+            schedule["interval"] is not None
+            and self._episodes_started % schedule["interval"] == 0)
+        self._evaluation_requested = False
+        mode = schedule["evaluation" if self.evaluating else "training"]
+
+        if mode != self._simulation_mode:
+            self.simulationSetMode(schedule["values"][mode])
+            self._simulation_mode = mode
+        for device in schedule["devices"]:
+            if self.evaluating:
+                period = self._sampling_periods.get(device)
+                if period is not None:
+                    device.enable(period)
+            else:
+                period = device.getSamplingPeriod()
+                if period > 0:
+                    self._sampling_periods[device] = period
+                device.disable()
+
+        self._mode_stats.setdefault(mode, [0, 0, 0.0])[0] += 1
+        self._mode_start = now
+
+    def _enable_scheduled_devices(self):
+        for device, period in self._sampling_periods.items():
+            if device.getSamplingPeriod() == 0:
+                device.enable(period)
+        self._sampling_periods = {}
+
+    def enable_async(self, delayed_actions=False):
+        """
+        Starts a stepping thread that runs step() for step_async() and
+        step_wait(), e.g. for extern controllers, where the agent can then
+        compute the next action while the simulator steps. The overlap
+        requires the simulator step and the agent's inference to release
+        the GIL, as the ctypes based Webots controller library and most
+        deep learning frameworks do.
+
+        Without delayed_actions, step_async() only returns immediately, so
+        the caller can do other work before step_wait(). With
+        delayed_actions, the next tick starts as soon as the results of the
+        previous one are ready, using the action chosen one step earlier,
+        i.e. the action chosen for observation t is applied on tick t + 2
+        and inference on observation t overlaps with the simulation of tick
+        t + 1. The first action of an episode is applied on its first two
+        ticks.
+
+        reset() must only be called once step_wait() returned done, or
+        before any step_async() call, and is run on the calling thread.
+
+        :param delayed_actions: Whether the one-tick-delayed action pipeline
+            is used, defaults to False
+        """
+        if getattr(self, "_async_thread", None) is not None:
+            self.disable_async()
+        self.delayed_actions = delayed_actions
+        self._async_actions = queue.Queue()
+        self._async_results = queue.Queue()
+        # The number of episodes done as counted by the stepping thread and
+        # by step_wait(), actions queued for a done episode are dropped
+        self._async_epoch = 0
+        self._async_wait_epoch = 0
+        self._async_primed_epoch = None
+        self._async_thread = threading.Thread(target=self._async_loop,
+                                              name="DeepbotsStepping",
+                                              daemon=True)
+        self._async_thread.start()
+
+    def disable_async(self):
+        """
+        Stops the stepping thread once the queued steps are done, their
+        results are discarded.
+        """
+        if getattr(self, "_async_thread", None) is None:
+            return
+        self._async_actions.put(None)
+        self._async_thread.join()
+        self._async_thread = None
+
+    def step_async(self, action):
+        """
+        Queues a step() with the action provided on the stepping thread and
+        returns immediately, see enable_async().
+
+        :param action: The agent's action
+        """
+        if getattr(self, "_async_thread", None) is None:
+            raise RuntimeError(
+                "enable_async() must be called before step_async()")
+        epoch = self._async_wait_epoch
+        if self.delayed_actions and self._async_primed_epoch != epoch:
+            self._async_primed_epoch = epoch
+            self._async_actions.put((epoch, action))
+        self._async_actions.put((epoch, action))
+
+    def step_wait(self):
+        """
+        Waits for the oldest queued step() to finish, see enable_async().
+
+        :return: tuple, (observation, reward, is_done, info) as returned by
+            step(), copied so that later steps do not modify them
+        """
+        if getattr(self, "_async_thread", None) is None:
+            raise RuntimeError(
+                "enable_async() must be called before step_wait()")
+        result, error = self._async_results.get()
+        if error is not None:
+            raise error
+        if result[2]:
+            self._async_wait_epoch += 1
+        return result
+
+    def _async_loop(self):
+        while True:
+            task = self._async_actions.get()
+            if task is None:
+                break
+            epoch, action = task
+            if epoch != self._async_epoch:
+                continue
+            try:
+                result = self.step(action)
+            except BaseException as error:
+                # e.g. SystemExit when Webots terminates the controller
+                self._async_results.put((None, error))
+                break
+            if result[2]:
+                self._async_epoch += 1
+            # The environment may reuse its arrays on the next step, which
+            # can run before step_wait() returns this result
+            self._async_results.put((deepcopy(result), None))
+
+    def register_node_state(self,
+                            name,
+                            def_name,
+                            quantities=("position", ),
+                            fields=()):
+        """
+        Declares node state to be cached in node_states, which is read once
+        per timestep by step() and reset(), so that get_observations(),
+        get_reward() and is_done() can share it instead of querying the
+        simulator again. Node handles are resolved here and again after
+        every full reset.
+
+        The cached values are available as float64 arrays through
+        node_states[name][quantity_or_field_name], e.g.
+        self.node_states["robot"]["position"], single values are 0-d
+        arrays.
+
+        :param name: The name of the entry in node_states
+        :param def_name: The DEF name of the node
+        :param quantities: Iterable of node quantities to cache, any of
+            "position", "orientation", "velocity" and "center_of_mass",
+            defaults to ("position",)
+        :param fields: Iterable of the names of additional numeric SF fields
+            to cache, e.g. "translation", defaults to ()
+        """
+        for quantity in quantities:
+            if quantity not in NODE_QUANTITIES:
+                raise ValueError("Unknown node quantity {}, expected one of "
+                                 "{}".format(quantity,
+                                             list(NODE_QUANTITIES)))
+        self._node_state_specs[name] = (def_name, tuple(quantities),
+                                        tuple(fields))
+
+        # The preallocated structure is rebuilt on every registration, which
+        # is expected to only happen during initialization
+        dtype = []
+        for entry, (def_name, quantities,
+                    fields) in self._node_state_specs.items():
+            node = self._get_node(def_name)
+            entry_dtype = [(quantity, "f8", (NODE_QUANTITIES[quantity][1], ))
+                           for quantity in quantities]
+            for field_name in fields:
+                size = FIELD_SIZES.get(
+                    self._get_field(node, def_name, field_name).getTypeName())
+                if size is None:
+                    raise ValueError(
+                        "Field {} of node {} is not a numeric SF field".format(
+                            field_name, def_name))
+                entry_dtype.append((field_name, "f8",
+                                    (size, ) if size > 1 else ()))
+            dtype.append((entry, entry_dtype))
+        self.node_states = np.zeros((), dtype=dtype)
+        self._resolve_node_states()
+        self.update_node_states()
+
+    def update_node_states(self):
+        """
+        Reads all the declared node state from the simulator into
+        node_states. Called by step() after every timestep and by reset().
+        """
+        for view, getter in self._node_state_readers:
+            view[...] = getter()
+
+    def _resolve_node_states(self):
+        readers = []
+        for entry, (def_name, quantities,
+                    fields) in self._node_state_specs.items():
+            node = self._get_node(def_name)
+            view = self.node_states[entry]
+            for quantity in quantities:
+                readers.append((view[quantity],
+                                getattr(node, NODE_QUANTITIES[quantity][0])))
+            for field_name in fields:
+                field = self._get_field(node, def_name, field_name)
+                readers.append((view[field_name],
+                                getattr(field, "get" + field.getTypeName())))
+        self._node_state_readers = readers
+
+    def _get_node(self, def_name):
+        node = self.getFromDef(def_name)
+        if node is None:
+            raise ValueError(
+                "No node with DEF name {} was found".format(def_name))
+        return node
+
+    def _get_field(self, node, def_name, field_name):
+        field = node.getField(field_name)
+        if field is None:
+            raise ValueError("Node {} has no field {}".format(
+                def_name, field_name))
+        return field
+
+    def _simulation_step(self, timestep):
+        """
+        Steps the simulation by timestep milliseconds, exiting if Webots
+        terminates the controller, and refreshes the node state cache.
+
+        :param timestep: The timestep in milliseconds
+        """
+        if super(Supervisor, self).step(timestep) == -1:
+            exit()
+        if self._simulation_mode is not None:
+            self._mode_stats[self._simulation_mode][1] += 1
+        if self._heartbeat is not None:
+            self._heartbeat.beat()
+        if self._node_state_readers:
+            self.update_node_states()
+
+    def _repeat_action(self, action):
+        """
+        Steps the controller action_repeat times for an action that was
+        already applied and returns the (observations, reward, done, info)
+        of the step, see RobotSupervisorEnv.step(). The rewards of all
+        timesteps are summed and the loop stops early when is_done()
+        returns True.
+
+        _intermediate_timestep() is called after every timestep but the
+        last one, _last_timestep() after the timestep the observations are
+        computed on. Subclasses must define timestep and action_repeat.
+
+        :param action: The agent's action, passed to get_reward()
+        :return: tuple, (observations, reward, done, info)
+        """
+        reward = 0
+        for _ in range(self.action_repeat - 1):
+            self._simulation_step(self.timestep)
+            self._intermediate_timestep()
+            reward += self.get_reward(action)
+            if self.is_done():
+                self._last_timestep()
+                return self.get_observations(), reward, True, self.get_info()
+
+        self._simulation_step(self.timestep)
+        self._last_timestep()
+
+        return (
+            self.get_observations(),
+            reward + self.get_reward(action),
+            self.is_done(),
+            self.get_info(),
+        )
+
+    def _intermediate_timestep(self):
+        """
+        Called by _repeat_action() after every timestep whose observations
+        are not used.
+        """
+
+    def _last_timestep(self):
+        """
+        Called by _repeat_action() after the timestep whose observations are
+        used.
+        """
+
+    def _full_reset_due(self):
+        return self._full_reset_requested or (
+            self._full_reset_interval is not None
+            and self._resets_since_full + 1 >= self._full_reset_interval)
+
+    def _restore_snapshot(self, snapshot):
+        for _, node, saved_fields, velocity in snapshot:
+            for _, setter, value in saved_fields:
+                setter(value)
+            node.resetPhysics()
+            node.setVelocity(velocity)
+
     def get_default_observation(self):
         """
         This method should be implemented to return a default/starting
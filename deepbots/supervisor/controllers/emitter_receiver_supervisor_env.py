@@ -1,7 +1,6 @@
 from warnings import simplefilter, warn
 
-from controller import Supervisor
-
+from deepbots.comms.receive_policy import FIFOPolicy
 from deepbots.supervisor.controllers.deepbots_supervisor_env import \
     DeepbotsSupervisorEnv
 
@@ -12,11 +11,21 @@ class EmitterReceiverSupervisorEnv(DeepbotsSupervisorEnv):
 
     Subclasses implement a variety of communication formats such as CSV
     messages.
+
+    Which packets of the receiver queue are used on each step is decided by
+    a receive policy, see deepbots.comms.receive_policy, which also keeps
+    queue length, dropped packets and observation age counters.
+
+    Each action can be repeated for several controller timesteps through
+    action_repeat, see step().
     """
     def __init__(self,
                  emitter_name="emitter",
                  receiver_name="receiver",
-                 timestep=None):
+                 timestep=None,
+                 receive_policy=None,
+                 action_repeat=1,
+                 transport=None):
         """
         The constructor sets up the timestep and calls the method that
         initializes the emitter and receiver devices with the names provided.
@@ -26,6 +35,13 @@ class EmitterReceiverSupervisorEnv(DeepbotsSupervisorEnv):
         :param receiver_name: The name of the receiver device on the
             supervisor node
         :param timestep: The supervisor controller timestep
+        :param receive_policy: The ReceivePolicy used by handle_receiver(),
+            defaults to None, i.e. FIFOPolicy() that uses one packet per step
+        :param action_repeat: The number of timesteps each action is applied
+            for, defaults to 1
+        :param transport: Transport whose emitter and receiver replace the
+            Webots devices, e.g. a SharedMemoryTransport, defaults to None.
+            It is closed by close().
         """
         super(EmitterReceiverSupervisorEnv, self).__init__()
 
@@ -33,9 +49,27 @@ class EmitterReceiverSupervisorEnv(DeepbotsSupervisorEnv):
             self.timestep = int(self.getBasicTimeStep())
         else:
             self.timestep = timestep
+        self.action_repeat = action_repeat
+
+        if receive_policy is None:
+            receive_policy = FIFOPolicy()
+        self.receive_policy = receive_policy
 
-        self.emitter, self.receiver = self.initialize_comms(
-            emitter_name, receiver_name)
+        self.transport = transport
+        if transport is None:
+            self.emitter, self.receiver = self.initialize_comms(
+                emitter_name, receiver_name)
+        else:
+            self.emitter, self.receiver = transport.open(
+                "supervisor", self.getTime)
+
+    def close(self):
+        """
+        Closes the transport, if any, after the base class cleanup.
+        """
+        super(EmitterReceiverSupervisorEnv, self).close()
+        if self.transport is not None:
+            self.transport.close()
 
     def initialize_comms(self, emitter_name, receiver_name):
         """
@@ -58,6 +92,17 @@ class EmitterReceiverSupervisorEnv(DeepbotsSupervisorEnv):
         calls the method that sends the action through the emitter
         and returns the (observations, reward, done, info) object.
 
+        If action_repeat is larger than 1, the action is sent once and the
+        controller is stepped action_repeat times. The rewards of all
+        timesteps are summed, the loop stops early when is_done() returns
+        True and the observations are only computed on the last timestep.
+        Note that on the intermediate timesteps get_reward() and is_done()
+        are called without a preceding get_observations() call. On these
+        timesteps, and before the observations are computed, the receive
+        policy discards the stale packets of the receiver queue, see
+        ReceivePolicy.skip(), so that the queue does not grow by
+        action_repeat - 1 packets per step and the newest packet is used.
+
         :param action: Whatever the use-case uses as an action, e.g.
             an integer representing discrete actions
         :type action: Defined by the implementation of handle_emitter
@@ -65,15 +110,17 @@ class EmitterReceiverSupervisorEnv(DeepbotsSupervisorEnv):
             corresponding methods as implemented for the use-case
         """
         self.handle_emitter(action)
-        if super(Supervisor, self).step(self.timestep) == -1:
-            exit()
+        return self._repeat_action(action)
 
-        return (
-            self.get_observations(),
-            self.get_reward(action),
-            self.is_done(),
-            self.get_info(),
-        )
+    def _intermediate_timestep(self):
+        # Robots keep sending on every timestep, the packets that are not
+        # used must not pile up in the queue
+        self.receive_policy.skip(self.receiver, self.getTime())
+
+    def _last_timestep(self):
+        if self.action_repeat > 1:
+            # Only the newest packet is left for handle_receiver()
+            self.receive_policy.skip(self.receiver, self.getTime())
 
     def handle_emitter(self, action):
         """
@@ -92,6 +139,31 @@ class EmitterReceiverSupervisorEnv(DeepbotsSupervisorEnv):
         """
         raise NotImplementedError
 
+    def receive_messages(self, decode):
+        """
+        Reads the receiver queue according to the receive policy and decodes
+        the packets selected. To be used by handle_receiver().
+
+        :param decode: Function that converts a packet (bytes) to a message
+        :return: The decoded message or None if no packet is used on this
+            step. For aggregating policies, a list of all decoded messages.
+        """
+        messages = self.receive_policy.receive(self.receiver, self.getTime())
+        if self.receive_policy.aggregate:
+            return [decode(message) for message in messages]
+        elif messages:
+            return decode(messages[0])
+        return None
+
+    @property
+    def receive_stats(self):
+        """
+        The receiver queue counters of the last step.
+
+        :return: ReceiveStats, see deepbots.comms.receive_policy
+        """
+        return self.receive_policy.stats
+
     def get_timestep(self):
         # The filter is required so as to not ignore the Deprecation warning
         simplefilter("once")
@@ -99,6 +171,30 @@ class EmitterReceiverSupervisorEnv(DeepbotsSupervisorEnv):
              DeprecationWarning)
         return self.timestep
 
+    @property
+    def action_repeat(self):
+        """
+        Getter of _action_repeat field, the number of controller timesteps
+        each action is applied for.
+
+        :return: The number of timesteps per step() call
+        """
+        return self._action_repeat
+
+    @action_repeat.setter
+    def action_repeat(self, value):
+        """
+        Setter of action_repeat field.
+
+        :param value: The new number of timesteps per step() call, a
+            positive integer
+        """
+        if int(value) < 1:
+            raise ValueError(
+                "action_repeat must be a positive integer, got {}".format(
+                    value))
+        self._action_repeat = int(value)
+
     @property
     def timestep(self):
         """
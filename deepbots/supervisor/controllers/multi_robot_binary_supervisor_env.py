@@ -0,0 +1,180 @@
+import numpy as np
+
+from deepbots.comms.receive_policy import AggregateAllPolicy
+from deepbots.supervisor.controllers.emitter_receiver_supervisor_env import \
+    EmitterReceiverSupervisorEnv
+
+
+class MultiRobotBinarySupervisorEnv(EmitterReceiverSupervisorEnv):
+    """
+    This class implements the emitter-receiver scheme for multiple robots
+    using binary messages, see also BinarySupervisorEnv.
+
+    Each robot prefixes its messages with its robot id, see
+    MultiRobotBinaryRobot. On every step the whole receiver queue is drained
+    and each packet is routed by its robot id to the corresponding row of a
+    preallocated (n_robots, observation_size) array, which always holds the
+    latest observation of every robot. This way the receiver queue cannot
+    grow when robots send faster than the supervisor reads. Packets of the
+    wrong size or with an unknown robot id are dropped and counted in
+    receive_stats.
+
+    The actions of all robots are given as one (n_robots, action_size)
+    array. By default they are broadcast in a single packet and each robot
+    picks its own row. If robot_channels is provided, each row is addressed
+    to the corresponding robot by switching the emitter channel instead.
+    """
+    def __init__(self,
+                 n_robots,
+                 observation_size,
+                 emitter_name="emitter",
+                 receiver_name="receiver",
+                 timestep=None,
+                 observation_dtype=np.float32,
+                 action_dtype=np.float32,
+                 robot_channels=None,
+                 action_repeat=1,
+                 transport=None,
+                 copy=True):
+        """
+        The constructor preallocates the observation array and passes the
+        rest of the arguments provided to the parent class contructor.
+
+        :param n_robots: The number of robots, robot ids are expected to be
+            in [0, n_robots)
+        :param observation_size: The number of values in each robot message
+        :param emitter_name: The name of the emitter device on the
+            supervisor node
+        :param receiver_name: The name of the receiver device on the
+            supervisor node
+        :param timestep: The supervisor controller timestep
+        :param observation_dtype: NumPy dtype of the values in the robot
+            messages, defaults to np.float32
+        :param action_dtype: NumPy dtype the actions are packed with,
+            defaults to np.float32
+        :param robot_channels: list of emitter channels, one per robot, to
+            address each robot's actions to, defaults to None, i.e. actions
+            are broadcast in a single packet
+        :param action_repeat: The number of timesteps each action is applied
+            for, defaults to 1
+        :param transport: Transport replacing the Webots devices, e.g. a
+            SharedMemoryTransport, defaults to None. With robot_channels,
+            the transport must deliver the packets of every channel.
+        :param copy: Whether handle_receiver() and get_observations()
+            return copies of the observations array, defaults to True
+        """
+        if robot_channels is not None and len(robot_channels) != n_robots:
+            raise ValueError("robot_channels must contain one channel per "
+                             "robot, got {} for {} robots".format(
+                                 len(robot_channels), n_robots))
+
+        self.n_robots = n_robots
+        self.observation_dtype = np.dtype(observation_dtype)
+        self.action_dtype = np.dtype(action_dtype)
+        self.robot_channels = robot_channels
+        self.copy = copy
+
+        self.message_dtype = np.dtype([
+            ("robot_id", "<u2"),
+            ("data", self.observation_dtype, (observation_size, )),
+        ])
+        self.observations = np.zeros((n_robots, observation_size),
+                                     dtype=self.observation_dtype)
+        # Simulation time of the latest message of each robot, -1 for none
+        self.observation_times = np.full(n_robots, -1.0)
+        self.packets_received = 0
+
+        super(MultiRobotBinarySupervisorEnv,
+              self).__init__(emitter_name, receiver_name, timestep,
+                             AggregateAllPolicy(), action_repeat, transport)
+
+    def step(self, action):
+        """
+        The step method that sends the actions of all robots, steps the
+        controller, drains the receiver queue and returns the
+        (observations, reward, done, info) object.
+
+        action_repeat is handled as in EmitterReceiverSupervisorEnv.step(),
+        the receiver queue is drained once, on the last timestep.
+
+        :param action: (n_robots, action_size) array-like with one row of
+            actions per robot
+        :return: (observations, reward, done, info) as provided by the
+            corresponding methods as implemented for the use-case
+        """
+        self.handle_emitter(action)
+        return self._repeat_action(action)
+
+    def _last_timestep(self):
+        self.handle_receiver()
+
+    def handle_emitter(self, action):
+        """
+        Sends the actions of all robots, either in a single broadcast packet
+        or one packet per robot on its own channel.
+
+        :param action: (n_robots, action_size) array-like with one row of
+            actions per robot
+        """
+        actions = np.ascontiguousarray(action, dtype=self.action_dtype)
+        if self.robot_channels is None:
+            self.emitter.send(actions.tobytes())
+            return
+
+        channel = self.emitter.getChannel()
+        for robot_channel, robot_action in zip(self.robot_channels, actions):
+            self.emitter.setChannel(robot_channel)
+            self.emitter.send(robot_action.tobytes())
+        self.emitter.setChannel(channel)
+
+    def handle_receiver(self):
+        """
+        Drains the receiver queue, storing the latest message of each robot
+        in the corresponding row of the observations array.
+
+        :return: The (n_robots, observation_size) observations array, rows
+            of robots that have not sent any message yet are zero, copied
+            unless copy is False
+        """
+        time = self.getTime()
+        packets = self.receive_messages(self._decode)
+        received = 0
+        for packet in packets:
+            if packet is None:
+                continue
+            robot_id = packet["robot_id"]
+            self.observations[robot_id] = packet["data"]
+            self.observation_times[robot_id] = time
+            received += 1
+
+        invalid = len(packets) - received
+        if invalid:
+            stats = self.receive_policy.stats
+            stats.packets_read -= invalid
+            stats.packets_dropped += invalid
+            stats.total_packets_dropped += invalid
+        self.packets_received = received
+        return self._output(self.observations)
+
+    def _decode(self, message):
+        # Packets that do not come from a known robot are dropped
+        if len(message) != self.message_dtype.itemsize:
+            return None
+        packet = np.frombuffer(message, dtype=self.message_dtype)[0]
+        if not 0 <= packet["robot_id"] < self.n_robots:
+            return None
+        return packet
+
+    def _output(self, array):
+        return array.copy() if self.copy else array
+
+    def get_observations(self):
+        """
+        Returns the latest observation of every robot, as received by the
+        last step. This method can be overridden to extend the observations
+        with supervisor data.
+
+        :return: The (n_robots, observation_size) observations array,
+            copied unless copy is False
+        """
+        return self._output(self.observations)
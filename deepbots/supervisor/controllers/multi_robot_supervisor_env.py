@@ -0,0 +1,208 @@
+from itertools import chain
+
+import numpy as np
+
+from deepbots.supervisor.controllers.robot_supervisor_env import \
+    RobotSupervisorEnv
+
+
+class MultiRobotSupervisorEnv(RobotSupervisorEnv):
+    """
+    The MultiRobotSupervisorEnv class is a RobotSupervisorEnv that controls
+    several robots, or robot parts, from a single controller, e.g. a swarm.
+
+    The actuators and sensors of every robot are registered once with
+    register_robot(). Actions are then arrays of shape
+    (n_robots, action_size), applied by apply_action() in a single loop over
+    the bound actuator setters, and get_observations() reads all the
+    registered sensors into a preallocated array of shape
+    (n_robots, observation_size). The array is reused on every call.
+
+    get_reward() should return the rewards of all robots, e.g. an array of
+    shape (n_robots,), computed with NumPy from observations; rewards is a
+    preallocated array that can be used for that. is_done() returns whether
+    the episode of the whole group is done.
+
+    step() and reset() return copies of the observations and of array
+    rewards, unless copy is False, in which case the observations returned
+    are the preallocated array itself, overwritten by the next step.
+    """
+    def __init__(self, timestep=None, action_repeat=1, copy=True):
+        """
+        :param timestep: The controller timestep, defaults to None, i.e. the
+            basic timestep of the world
+        :param action_repeat: The number of timesteps each action is applied
+            for, defaults to 1
+        :param copy: Whether step() and reset() return copies of the
+            observation and reward arrays, defaults to True
+        """
+        super(MultiRobotSupervisorEnv, self).__init__(timestep, action_repeat)
+        self.copy = copy
+
+        self.n_robots = 0
+        self.action_size = None
+        self.observation_size = None
+        self.observations = np.zeros((0, 0))
+        self.rewards = np.zeros(0)
+        self._setters = []
+        self._robot_getters = []
+        self._read_sensors = None
+
+    def register_robot(self,
+                       actuators,
+                       sensors=(),
+                       actuator_method="setVelocity",
+                       sensor_method="getValue"):
+        """
+        Registers the actuators and sensors of a robot. All robots must
+        have the same number of actuators and sensor values. It is expected
+        to be called during initialization only.
+
+        Actuators and sensors are given as device names, devices or
+        callables. For devices, the bound actuator_method or sensor_method
+        is used, e.g. motor.setVelocity, sensors are enabled with the
+        controller timestep. Callables, e.g. a lambda setting a node field,
+        are used as they are. Sensors may return single values or sequences
+        of values, e.g. the getValues of a GPS, of a fixed size.
+
+        :param actuators: Iterable of the actuators, one per action column
+        :param sensors: Iterable of the sensors, defaults to ()
+        :param actuator_method: The name of the setter of actuator devices,
+            defaults to "setVelocity"
+        :param sensor_method: The name of the getter of sensor devices,
+            defaults to "getValue"
+        :return: int, the index of the robot
+        """
+        setters = [
+            self._bind(actuator, actuator_method)
+            for actuator in actuators
+        ]
+        getters = [
+            self._bind(sensor, sensor_method, enable=True)
+            for sensor in sensors
+        ]
+        if self.action_size is not None and len(setters) != self.action_size:
+            raise ValueError(
+                "Robots must have the same number of actuators, expected {} "
+                "got {}".format(self.action_size, len(setters)))
+
+        # Getters of sequences are flattened, their size is fixed from now
+        sizes = []
+        for getter in getters:
+            value = getter()
+            sizes.append(len(value) if hasattr(value, "__len__") else None)
+        observation_size = sum(1 if size is None else size for size in sizes)
+        if (self.observation_size is not None
+                and observation_size != self.observation_size):
+            raise ValueError(
+                "Robots must have the same number of sensor values, expected "
+                "{} got {}".format(self.observation_size, observation_size))
+
+        self.action_size = len(setters)
+        self.observation_size = observation_size
+        self._setters.extend(setters)
+        self._robot_getters.append((getters, sizes))
+        self.n_robots += 1
+
+        self.observations = np.zeros((self.n_robots, self.observation_size))
+        self.rewards = np.zeros(self.n_robots)
+        self._compile_sensor_reader()
+        return self.n_robots - 1
+
+    def step(self, action):
+        """
+        Applies the actions of all robots and steps the controller, see
+        RobotSupervisorEnv.step().
+
+        :param action: array-like of shape (n_robots, action_size)
+        :return: tuple, (observations, reward, done, info), observations
+            and array rewards are copied unless copy is False
+        """
+        observations, reward, done, info = super(MultiRobotSupervisorEnv,
+                                                 self).step(action)
+        return self._output(observations), self._output(reward), done, info
+
+    def reset(self):
+        """
+        :return: The default observations, copied unless copy is False
+        """
+        return self._output(super(MultiRobotSupervisorEnv, self).reset())
+
+    def apply_action(self, action):
+        """
+        Applies the actions of all robots.
+
+        :param action: array-like of shape (n_robots, action_size)
+        """
+        self._check_registered()
+        values = np.asarray(action, dtype=np.float64)
+        if values.shape != (self.n_robots, self.action_size):
+            raise ValueError(
+                "Expected actions of shape {}, got {}".format(
+                    (self.n_robots, self.action_size), values.shape))
+        # A single conversion to Python floats, Webots setters require them
+        for setter, value in zip(self._setters, values.ravel().tolist()):
+            setter(value)
+
+    def get_observations(self):
+        """
+        Reads all the registered sensors.
+
+        :return: np.ndarray of shape (n_robots, observation_size), reused on
+            every call
+        """
+        self._check_registered()
+        self._read_sensors(self.observations.reshape(-1))
+        return self.observations
+
+    def get_default_observation(self):
+        return self.get_observations()
+
+    def _check_registered(self):
+        if not self.n_robots:
+            raise RuntimeError(
+                "No robot is registered, register_robot() must be called "
+                "first")
+
+    def _output(self, value):
+        if self.copy and isinstance(value, np.ndarray):
+            return value.copy()
+        return value
+
+    def _bind(self, item, method, enable=False):
+        if callable(item):
+            return item
+        device = self.getDevice(item) if isinstance(item, str) else item
+        if device is None:
+            raise ValueError("Device {} was not found".format(item))
+        if enable and hasattr(device, "enable"):
+            device.enable(self.timestep)
+        return getattr(device, method)
+
+    def _compile_sensor_reader(self):
+        getters = []
+        flat = True
+        for robot_getters, sizes in self._robot_getters:
+            for getter, size in zip(robot_getters, sizes):
+                if size is None:
+                    getters.append(getter)
+                else:
+                    flat = False
+        if flat:
+
+            def read_sensors(out):
+                out[:] = [getter() for getter in getters]
+        else:
+            # Single values are wrapped so that all readings can be chained
+            getters = [
+                getter if size is not None else
+                (lambda getter=getter: (getter(), ))
+                for robot_getters, sizes in self._robot_getters
+                for getter, size in zip(robot_getters, sizes)
+            ]
+
+            def read_sensors(out):
+                out[:] = list(
+                    chain.from_iterable(getter() for getter in getters))
+
+        self._read_sensors = read_sensors
@@ -0,0 +1,160 @@
+import gym
+import numpy as np
+from gym.spaces import Box
+
+from deepbots.trajectories.trajectory_reader import TrajectoryReader
+
+
+def _box(dtype):
+    """
+    :param dtype: The dtype of a recorded field, possibly a subarray dtype
+    :return: Box space of the values of the field
+    """
+    shape = dtype.shape
+    dtype = dtype.base
+    if dtype.kind == "f":
+        return Box(-np.inf, np.inf, shape, dtype)
+    elif dtype.kind == "b":
+        return Box(0, 1, shape, dtype)
+    elif dtype.kind in "iu":
+        info = np.iinfo(dtype)
+        return Box(info.min, info.max, shape, dtype)
+    raise TypeError("Recorded values of dtype {} have no Box space".format(
+        dtype))
+
+
+class ReplaySupervisorEnv(gym.Env):
+    """
+    Environment that plays back a recording made with the
+    TrajectoryRecorder wrapper through the step()/reset() API, without a
+    running simulation, e.g. to test training loops, wrappers and loggers
+    quickly.
+
+    Every reset() moves on to the next recorded episode and every step()
+    returns the next recorded transition. The action passed to step() does
+    not affect the transition, the recorded one is available through
+    recorded_action. Episodes are read lazily from the memory-mapped
+    chunks.
+
+    This class is a plain gym.Env, it neither imports the Webots controller
+    module nor inherits the Supervisor, so it can be used outside of
+    Webots. It provides the get_*() methods of DeepbotsSupervisorEnv, and
+    getTime() and getBasicTimeStep(), which return the replayed simulation
+    time and the timestep.
+    """
+    def __init__(self, path, loop=True, shuffle=False, seed=None,
+                 timestep=32):
+        """
+        :param path: The directory of the recording
+        :param loop: Whether reset() starts over from the first episode
+            after the last one, otherwise it raises StopIteration, defaults
+            to True
+        :param shuffle: Whether episodes are played in random order instead
+            of the recorded one, defaults to False
+        :param seed: The seed of the episode order when shuffling, defaults
+            to None
+        :param timestep: The timestep in milliseconds used by getTime(),
+            defaults to 32
+        """
+        self.reader = TrajectoryReader(path)
+        # Episodes without steps, e.g. the reset before the recording was
+        # closed, are skipped
+        self._episodes = list(np.flatnonzero(self.reader.episode_lengths))
+        if not self._episodes:
+            raise ValueError("{} contains no episodes".format(path))
+        self.loop = loop
+        self.shuffle = shuffle
+        self.timestep = timestep
+        self._random = np.random.RandomState(seed)
+
+        self.observation_space = _box(self.reader.dtype["observation"])
+        self.action_space = _box(self.reader.dtype["action"])
+
+        self.episode = None
+        self.step_index = 0
+        self.episodes_played = 0
+        self._order = []
+        self._info_keys = ()
+        if "info" in self.reader.dtype.names:
+            self._info_keys = self.reader.dtype["info"].names
+
+    def reset(self):
+        """
+        Loads the next episode.
+
+        :return: The recorded reset observation
+        """
+        if not self._order:
+            if self.episodes_played and not self.loop:
+                raise StopIteration("All recorded episodes were replayed")
+            self._order = list(self._episodes)
+            if self.shuffle:
+                self._random.shuffle(self._order)
+            self._order.reverse()
+        self.episode = self.reader[self._order.pop()]
+        self.episodes_played += 1
+
+        # Plain ndarray views index faster than np.memmap ones
+        self.step_index = 0
+        self._observations = np.asarray(self.episode.observations)
+        self._actions = np.asarray(self.episode.actions)
+        self._rewards = np.asarray(self.episode.rewards)
+        self._dones = np.asarray(self.episode.dones)
+        self._infos = self.episode.infos
+        if self._infos is not None:
+            self._infos = np.asarray(self._infos)
+        return self._observations[0]
+
+    def step(self, action):
+        """
+        Returns the next recorded transition. The last transition of an
+        episode is always done, even if the recording was interrupted.
+
+        :param action: Ignored, see recorded_action
+        :return: tuple, (observations, reward, done, info) as recorded
+        """
+        if self.episode is None or self.step_index >= len(self.episode):
+            raise RuntimeError(
+                "The episode is over, reset() must be called first")
+        self.step_index += 1
+        return (self.get_observations(), self.get_reward(action),
+                self.is_done(), self.get_info())
+
+    @property
+    def recorded_action(self):
+        """
+        :return: The recorded action of the next step, None at the end of
+            the episode
+        """
+        if self.step_index >= len(self.episode):
+            return None
+        return self._actions[self.step_index]
+
+    def get_default_observation(self):
+        return self._observations[0]
+
+    def get_observations(self):
+        return self._observations[self.step_index]
+
+    def get_reward(self, action):
+        if self.step_index == 0:
+            return 0.0
+        return float(self._rewards[self.step_index - 1])
+
+    def is_done(self):
+        if self.step_index == 0:
+            return False
+        return bool(self._dones[self.step_index - 1]
+                    or self.step_index == len(self.episode))
+
+    def get_info(self):
+        if self.step_index == 0 or self._infos is None:
+            return {}
+        info = self._infos[self.step_index - 1]
+        return {key: info[key] for key in self._info_keys}
+
+    def getTime(self):
+        return self.step_index * self.timestep / 1000.0
+
+    def getBasicTimeStep(self):
+        return float(self.timestep)
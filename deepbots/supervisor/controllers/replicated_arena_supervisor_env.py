@@ -0,0 +1,287 @@
+import math
+from string import Template
+
+import numpy as np
+
+from deepbots.supervisor.controllers.robot_supervisor_env import \
+    RobotSupervisorEnv
+
+
+class ReplicatedArenaSupervisorEnv(RobotSupervisorEnv):
+    """
+    The ReplicatedArenaSupervisorEnv class runs n_arenas independent copies
+    of the same task in a single world, so that the per-timestep overhead of
+    the simulator is shared by all of them, and exposes them as a batched
+    environment.
+
+    The copies are imported into the world from a template node string by
+    the constructor and are laid out on a grid, spacing meters apart, in the
+    x-y plane. In the template, $index is replaced by the index of the copy
+    and $x, $y, $z by its position, e.g.:
+
+    DEF ARENA_$index Pose {
+      translation $x $y $z
+      children [ DEF ROBOT_$index MyRobot { } DEF BOX_$index WoodenBox { } ]
+    }
+
+    The nodes listed in arena_def_names, e.g. ["ROBOT_$index", "BOX_$index"],
+    are snapshotted after the import. Resetting a copy restores only the
+    snapshot of its nodes, see reset_arena(), the other copies keep running.
+
+    The use-case is implemented per copy through apply_arena_action(),
+    get_arena_observations(), get_arena_reward(), is_arena_done(),
+    get_arena_info() and get_arena_default_observation(), where index is the
+    copy's index. step() takes the actions of all copies, e.g. an array of
+    shape (n_arenas, action_size), steps the simulation once and returns
+    the stacked observations, the rewards and the dones of all copies. Done
+    copies are reset automatically, their last observation is then provided
+    as info["terminal_observation"].
+
+    observation_space and action_space describe a single copy.
+    """
+    def __init__(self,
+                 n_arenas,
+                 template,
+                 arena_def_names,
+                 fields=None,
+                 spacing=5.0,
+                 positions=None,
+                 timestep=None,
+                 action_repeat=1,
+                 copy=True):
+        """
+        :param n_arenas: The number of copies of the arena
+        :param template: The node string the copies are imported from, see
+            the class documentation
+        :param arena_def_names: Iterable of the DEF name templates of the
+            nodes of a copy restored by reset_arena()
+        :param fields: dict mapping DEF name templates to lists of additional
+            SF field names to restore, see enable_soft_reset(), defaults to
+            None
+        :param spacing: The distance between neighbouring copies in meters,
+            defaults to 5.0
+        :param positions: Iterable of the (x, y, z) position of every copy,
+            overrides the grid layout, defaults to None
+        :param timestep: The controller timestep, defaults to None, i.e. the
+            basic timestep of the world
+        :param action_repeat: The number of timesteps each action is applied
+            for, defaults to 1
+        :param copy: Whether step() and reset() return copies of the
+            preallocated observation, reward and done arrays, defaults to
+            True
+        """
+        super(ReplicatedArenaSupervisorEnv,
+              self).__init__(timestep, action_repeat)
+        self.n_arenas = self.num_envs = n_arenas
+        self.copy = copy
+
+        if positions is None:
+            columns = int(math.ceil(math.sqrt(n_arenas)))
+            positions = [((index % columns) * spacing,
+                          (index // columns) * spacing, 0.0)
+                         for index in range(n_arenas)]
+        self.arena_positions = np.array(positions, dtype=np.float64)
+        if self.arena_positions.shape != (n_arenas, 3):
+            raise ValueError(
+                "positions must hold one (x, y, z) position per arena")
+
+        children = self.getRoot().getField("children")
+        template = Template(template)
+        for index, (x, y, z) in enumerate(self.arena_positions):
+            children.importMFNodeFromString(
+                -1, template.substitute(index=index, x=x, y=y, z=z))
+
+        fields = {} if fields is None else fields
+        self.arena_def_names = []
+        self._arena_snapshots = []
+        for index in range(n_arenas):
+            def_names = [
+                Template(def_name).substitute(index=index)
+                for def_name in arena_def_names
+            ]
+            arena_fields = {
+                Template(def_name).substitute(index=index): field_names
+                for def_name, field_names in fields.items()
+            }
+            self.arena_def_names.append(def_names)
+            self._arena_snapshots.append(
+                self._capture_snapshot(def_names, arena_fields))
+
+        self.arena_steps = np.zeros(n_arenas, dtype=np.int64)
+        self._observations = None
+        self._rewards = np.zeros(n_arenas)
+        self._dones = np.zeros(n_arenas, dtype=bool)
+
+    def step(self, actions):
+        """
+        Applies the action of every copy, steps the simulation and collects
+        the results of all copies. Done copies are reset.
+
+        If action_repeat is larger than 1, the rewards of every timestep are
+        summed, a copy that is done on an intermediate timestep stops
+        accumulating rewards and is reset at the end of the step.
+
+        :param actions: Indexable of the actions of every copy, e.g. an
+            array of shape (n_arenas, action_size)
+        :return: tuple, (observations, rewards, dones, infos), the stacked
+            observations, np.ndarray of rewards and dones and list of the
+            info dicts of every copy
+        """
+        self.apply_action(actions)
+
+        rewards = self._rewards
+        dones = self._dones
+        rewards[...] = 0.0
+        dones[...] = False
+        for _ in range(self.action_repeat - 1):
+            self._simulation_step(self.timestep)
+            for index in range(self.n_arenas):
+                if not dones[index]:
+                    rewards[index] += self.get_arena_reward(
+                        index, actions[index])
+                    dones[index] = self.is_arena_done(index)
+
+        self._simulation_step(self.timestep)
+        self.arena_steps += 1
+
+        infos = []
+        for index in range(self.n_arenas):
+            observation = self.get_arena_observations(index)
+            if not dones[index]:
+                rewards[index] += self.get_arena_reward(index, actions[index])
+                dones[index] = self.is_arena_done(index)
+            info = self.get_arena_info(index)
+            if dones[index]:
+                info = dict(info)
+                info["terminal_observation"] = np.array(observation)
+                observation = self.reset_arena(index)
+            self._store_observation(index, observation)
+            infos.append(info)
+
+        return (self._output(self._observations), self._output(rewards),
+                self._output(dones), infos)
+
+    def reset(self):
+        """
+        Resets all copies by restoring their snapshots and steps the
+        simulation once.
+
+        :return: The stacked default observations of all copies
+        """
+        for index in range(self.n_arenas):
+            self._restore_snapshot(self._arena_snapshots[index])
+        self.arena_steps[...] = 0
+        self._simulation_step(self.timestep)
+        return self.get_default_observation()
+
+    def reset_arena(self, index):
+        """
+        Resets a single copy by restoring the snapshot of its nodes, without
+        stepping the simulation. It can be overridden to randomize the
+        initial state of the copy, after calling this implementation.
+
+        :param index: The index of the copy
+        :return: The default observation of the copy
+        """
+        self._restore_snapshot(self._arena_snapshots[index])
+        self.arena_steps[index] = 0
+        return self.get_arena_default_observation(index)
+
+    def apply_action(self, actions):
+        for index in range(self.n_arenas):
+            self.apply_arena_action(index, actions[index])
+
+    def get_default_observation(self):
+        for index in range(self.n_arenas):
+            self._store_observation(index,
+                                    self.get_arena_default_observation(index))
+        return self._output(self._observations)
+
+    def get_observations(self):
+        for index in range(self.n_arenas):
+            self._store_observation(index, self.get_arena_observations(index))
+        return self._output(self._observations)
+
+    def get_reward(self, actions):
+        return np.array([
+            self.get_arena_reward(index, actions[index])
+            for index in range(self.n_arenas)
+        ])
+
+    def is_done(self):
+        return np.array(
+            [self.is_arena_done(index) for index in range(self.n_arenas)])
+
+    def get_info(self):
+        return [self.get_arena_info(index) for index in range(self.n_arenas)]
+
+    def _store_observation(self, index, observation):
+        if self._observations is None:
+            observation = np.asarray(observation)
+            self._observations = np.zeros(
+                (self.n_arenas, ) + observation.shape, dtype=observation.dtype)
+        self._observations[index] = observation
+
+    def _output(self, array):
+        return array.copy() if self.copy else array
+
+    def apply_arena_action(self, index, action):
+        """
+        This method should be implemented to apply the action of a copy on
+        its robot, see RobotSupervisorEnv.apply_action().
+
+        :param index: The index of the copy
+        :param action: The action of the copy
+        """
+        raise NotImplementedError
+
+    def get_arena_observations(self, index):
+        """
+        This method should be implemented to return the observations of a
+        copy, as array-likes of the same shape for all copies.
+
+        :param index: The index of the copy
+        :return: The observations of the copy
+        """
+        raise NotImplementedError
+
+    def get_arena_default_observation(self, index):
+        """
+        This method should be implemented to return the default/starting
+        observation of a copy.
+
+        :param index: The index of the copy
+        :return: The default observation of the copy
+        """
+        raise NotImplementedError
+
+    def get_arena_reward(self, index, action):
+        """
+        This method should be implemented to return the reward of a copy for
+        this timestep.
+
+        :param index: The index of the copy
+        :param action: The action of the copy
+        :return: The reward of the copy
+        """
+        raise NotImplementedError
+
+    def is_arena_done(self, index):
+        """
+        This method should be implemented to return whether the episode of a
+        copy is done.
+
+        :param index: The index of the copy
+        :return: bool, True if the episode of the copy is done
+        """
+        raise NotImplementedError
+
+    def get_arena_info(self, index):
+        """
+        This method can be implemented to return diagnostic information of a
+        copy on each step.
+
+        :param index: The index of the copy
+        :return: dict
+        """
+        return {}
@@ -1,7 +1,5 @@
 from warnings import simplefilter, warn
 
-from controller import Supervisor
-
 from deepbots.supervisor.controllers.deepbots_supervisor_env import \
     DeepbotsSupervisorEnv
 
@@ -29,14 +27,24 @@ class RobotSupervisorEnv(DeepbotsSupervisorEnv):
     This method takes an action argument and translates it to a robot
     action, e.g. motor speeds.
     Note that apply_action() is called during step().
+
+    Each action can be repeated for several controller timesteps through
+    action_repeat, see step().
     """
-    def __init__(self, timestep=None):
+    def __init__(self, timestep=None, action_repeat=1):
+        """
+        :param timestep: The controller timestep, defaults to None, i.e. the
+            basic timestep of the world
+        :param action_repeat: The number of timesteps each action is applied
+            for, defaults to 1
+        """
         super(RobotSupervisorEnv, self).__init__()
 
         if timestep is None:
             self.timestep = int(self.getBasicTimeStep())
         else:
             self.timestep = timestep
+        self.action_repeat = action_repeat
 
     def get_timestep(self):
         # The filter is required so as to not ignore the Deprecation warning
@@ -64,12 +72,43 @@ class RobotSupervisorEnv(DeepbotsSupervisorEnv):
         """
         self._timestep = int(value)
 
+    @property
+    def action_repeat(self):
+        """
+        Getter of _action_repeat field, the number of controller timesteps
+        each action is applied for.
+
+        :return: The number of timesteps per step() call
+        """
+        return self._action_repeat
+
+    @action_repeat.setter
+    def action_repeat(self, value):
+        """
+        Setter of action_repeat field.
+
+        :param value: The new number of timesteps per step() call, a
+            positive integer
+        """
+        if int(value) < 1:
+            raise ValueError(
+                "action_repeat must be a positive integer, got {}".format(
+                    value))
+        self._action_repeat = int(value)
+
     def step(self, action):
         """
         The basic step method that steps the controller,
         calls the method that applies the action on the robot
         and returns the (observations, reward, done, info) object.
 
+        If action_repeat is larger than 1, the action is applied once and the
+        controller is stepped action_repeat times. The rewards of all
+        timesteps are summed, the loop stops early when is_done() returns
+        True and the observations are only computed on the last timestep.
+        Note that on the intermediate timesteps get_reward() and is_done()
+        are called without a preceding get_observations() call.
+
         :param action: Whatever the use-case uses as an action, e.g.
             an integer representing discrete actions
         :type action: Defined by the implementation of handle_emitter
@@ -77,15 +116,7 @@ class RobotSupervisorEnv(DeepbotsSupervisorEnv):
             corresponding methods as implemented for the use-case
         """
         self.apply_action(action)
-        if super(Supervisor, self).step(self.timestep) == -1:
-            exit()
-
-        return (
-            self.get_observations(),
-            self.get_reward(action),
-            self.is_done(),
-            self.get_info(),
-        )
+        return self._repeat_action(action)
 
     def apply_action(self, action):
         """
@@ -0,0 +1,80 @@
+from deepbots.comms.space_codec import SpaceCodec
+from deepbots.supervisor.controllers.emitter_receiver_supervisor_env import \
+    EmitterReceiverSupervisorEnv
+
+
+class SpaceCodecSupervisorEnv(EmitterReceiverSupervisorEnv):
+    """
+    This class implements the emitter-receiver scheme using binary messages
+    with a fixed layout that is compiled from gym spaces, see SpaceCodec.
+
+    Actions are packed according to the action space and messages received
+    from the robot are unpacked according to the message space. Both
+    layouts are compiled and validated by round-tripping a sample in the
+    constructor, so that a space the layout cannot represent is reported at
+    startup and get_observations() receives typed values without any
+    per-step parsing.
+
+    The robot counterpart of this class is SpaceCodecRobot, which must be
+    given the same spaces.
+    """
+    def __init__(self,
+                 action_space,
+                 message_space,
+                 emitter_name="emitter",
+                 receiver_name="receiver",
+                 timestep=None,
+                 receive_policy=None,
+                 action_repeat=1,
+                 transport=None):
+        """
+        The constructor compiles the codecs of the spaces provided and passes
+        the rest of the arguments to the parent class contructor.
+
+        :param action_space: The gym space of the actions sent to the robot,
+            also set as the action_space of the environment
+        :param message_space: The gym space of the messages sent by the
+            robot, e.g. the observation_space of the environment
+        :param emitter_name: The name of the emitter device on the
+            supervisor node
+        :param receiver_name: The name of the receiver device on the
+            supervisor node
+        :param timestep: The supervisor controller timestep
+        :param receive_policy: The ReceivePolicy used by handle_receiver(),
+            defaults to None, i.e. FIFOPolicy()
+        :param action_repeat: The number of timesteps each action is applied
+            for, defaults to 1
+        :param transport: Transport replacing the Webots devices, defaults
+            to None
+        :raises TypeError: If a space is not supported by SpaceCodec
+        :raises ValueError: If a space does not survive a pack/unpack round
+            trip
+        """
+        self.action_codec = SpaceCodec(action_space)
+        self.message_codec = SpaceCodec(message_space)
+        super(SpaceCodecSupervisorEnv,
+              self).__init__(emitter_name, receiver_name, timestep,
+                             receive_policy, action_repeat, transport)
+        self.action_space = action_space
+        self.message_space = message_space
+
+    def handle_emitter(self, action):
+        """
+        Implementation of the handle_emitter method that packs the action
+        with the action_space codec.
+
+        :param action: A value that belongs to the action_space
+        """
+        self.emitter.send(self.action_codec.encode(action))
+
+    def handle_receiver(self):
+        """
+        Implementation of the handle_receiver method that unpacks the
+        message received from the robot with the message space codec.
+
+        :return: Returns the message received from the robot, returns None
+            if no message is received. A list of messages for aggregating
+            receive policies.
+        :rtype: A value of the message space
+        """
+        return self.receive_messages(self.message_codec.decode)
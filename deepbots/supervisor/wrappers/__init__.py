@@ -1,2 +1,8 @@
-from deepbots.supervisor.wrappers.keyboard_printer import KeyboardPrinter
-from deepbots.supervisor.wrappers.tensorboard_wrapper import TensorboardLogger
+from deepbots._lazy import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    "KeyboardPrinter": "deepbots.supervisor.wrappers.keyboard_printer",
+    "StepProfiler": "deepbots.supervisor.wrappers.step_profiler",
+    "TensorboardLogger": "deepbots.supervisor.wrappers.tensorboard_wrapper",
+    "TrajectoryRecorder": "deepbots.supervisor.wrappers.trajectory_recorder",
+})
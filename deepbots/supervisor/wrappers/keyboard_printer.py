@@ -45,3 +45,8 @@ class KeyboardPrinter(DeepbotsSupervisorEnv):
         print("RESET")
         observations = self.controller.reset()
         return observations
+
+    def close(self):
+        self.disable_async()
+        self.keyboard.disable()
+        self.controller.close()
@@ -0,0 +1,121 @@
+from collections import deque
+from math import sqrt
+
+import numpy as np
+
+
+class RollingWindowStats:
+    """
+    Incremental statistics over the last values of a stream for several
+    window sizes at once, with constant cost per value and memory bounded by
+    the largest window.
+
+    Values are kept in a ring buffer sized to the largest window and a
+    running sum and sum of squares is kept per window, which are recomputed
+    from the ring buffer once per wrap-around to avoid floating point drift.
+    Minima and maxima are kept with monotonic queues, if enabled.
+    """
+    def __init__(self, windows, track_extrema=False):
+        """
+        :param windows: Iterable of positive window sizes
+        :param track_extrema: Whether min() and max() are available,
+            defaults to False
+        """
+        self.windows = sorted(set(int(window) for window in windows))
+        if not self.windows or self.windows[0] < 1:
+            raise ValueError("windows must contain positive sizes")
+        self.size = self.windows[-1]
+        self.track_extrema = track_extrema
+        self.count = 0
+
+        self._values = np.zeros(self.size)
+        self._sums = dict.fromkeys(self.windows, 0.0)
+        self._squares = dict.fromkeys(self.windows, 0.0)
+        if track_extrema:
+            # (index, value) pairs with increasing/decreasing values
+            self._minima = {window: deque() for window in self.windows}
+            self._maxima = {window: deque() for window in self.windows}
+
+    def push(self, value):
+        """
+        Adds a value to all windows.
+
+        :param value: float, the new value
+        """
+        count = self.count
+        for window in self.windows:
+            if count >= window:
+                # The value leaving the window is read before it is
+                # overwritten when window == size
+                old = self._values[(count - window) % self.size]
+                self._sums[window] += value - old
+                self._squares[window] += value * value - old * old
+            else:
+                self._sums[window] += value
+                self._squares[window] += value * value
+
+            if self.track_extrema:
+                _push_extremum(self._minima[window], count, value, window,
+                               lambda last: last >= value)
+                _push_extremum(self._maxima[window], count, value, window,
+                               lambda last: last <= value)
+
+        self._values[count % self.size] = value
+        self.count = count + 1
+        if self.count % self.size == 0:
+            self._resync()
+
+    def values(self):
+        """
+        :return: np.ndarray, the last values kept, oldest first, at most
+            the largest window
+        """
+        if self.count < self.size:
+            return self._values[:self.count].copy()
+        index = self.count % self.size
+        return np.concatenate((self._values[index:], self._values[:index]))
+
+    def mean(self, window):
+        """
+        :return: float, the mean of the last window values, or of all values
+            if fewer were pushed
+        """
+        return self._sums[window] / max(1, min(self.count, window))
+
+    def std(self, window):
+        """
+        :return: float, the population standard deviation of the last window
+            values
+        """
+        n = max(1, min(self.count, window))
+        mean = self._sums[window] / n
+        return sqrt(max(0.0, self._squares[window] / n - mean * mean))
+
+    def min(self, window):
+        """
+        :return: float, the minimum of the last window values, requires
+            track_extrema
+        """
+        return self._minima[window][0][1]
+
+    def max(self, window):
+        """
+        :return: float, the maximum of the last window values, requires
+            track_extrema
+        """
+        return self._maxima[window][0][1]
+
+    def _resync(self):
+        values = self.values()
+        for window in self.windows:
+            last = values[-window:]
+            self._sums[window] = float(np.sum(last))
+            self._squares[window] = float(np.dot(last, last))
+
+
+def _push_extremum(extrema, index, value, window, dominated):
+    while extrema and dominated(extrema[-1][1]):
+        extrema.pop()
+    extrema.append((index, value))
+    if extrema[0][0] <= index - window:
+        extrema.popleft()
@@ -0,0 +1,297 @@
+import json
+import math
+import time
+
+import numpy as np
+
+from deepbots.supervisor.controllers.deepbots_supervisor_env import \
+    DeepbotsSupervisorEnv
+
+# Methods of the wrapped environment that are timed, when present
+PROFILED_PHASES = (
+    "apply_action",
+    "handle_emitter",
+    "handle_receiver",
+    "_simulation_step",
+    "get_observations",
+    "get_reward",
+    "is_done",
+    "get_info",
+)
+
+
+class LatencyHistogram:
+    """
+    Streaming histogram of durations with logarithmic buckets, recording a
+    duration costs one log2() call and percentiles are estimated within
+    the bucket resolution.
+    """
+    def __init__(self,
+                 min_value=1e-7,
+                 max_value=100.0,
+                 buckets_per_octave=16):
+        """
+        :param min_value: The smallest duration distinguished, in seconds
+        :param max_value: The largest duration distinguished, in seconds
+        :param buckets_per_octave: Buckets per doubling of the duration,
+            16 gives a relative error of about 4%
+        """
+        self.min_value = min_value
+        self.buckets_per_octave = buckets_per_octave
+        self.counts = np.zeros(
+            int(math.log2(max_value / min_value) * buckets_per_octave) + 1,
+            dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        """
+        :param value: float, a duration in seconds
+        """
+        if value > self.min_value:
+            index = min(
+                int(math.log2(value / self.min_value) *
+                    self.buckets_per_octave),
+                len(self.counts) - 1)
+        else:
+            index = 0
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """
+        :param q: float, the percentile in [0, 100]
+        :return: float, the estimated duration at that percentile, in
+            seconds
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(math.ceil(q / 100.0 * self.count)))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        # Upper edge of the bucket, capped by the largest duration seen
+        return min(
+            self.min_value * 2**((index + 1) / self.buckets_per_octave),
+            self.max)
+
+    def summary(self):
+        """
+        :return: dict, count, total seconds and mean, p50, p99 and max in
+            microseconds
+        """
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_us": self.total / self.count * 1e6 if self.count else 0.0,
+            "p50_us": self.percentile(50) * 1e6,
+            "p99_us": self.percentile(99) * 1e6,
+            "max_us": self.max * 1e6,
+        }
+
+
+class StepProfiler(DeepbotsSupervisorEnv):
+    """
+    Wrapper that measures where the time of step() and reset() is spent.
+
+    The phases of the innermost environment, i.e. apply_action() or
+    handle_emitter(), the simulator timestep, handle_receiver() and the
+    user's get_observations(), get_reward(), is_done() and get_info(), are
+    timed by replacing them with timing closures on the environment
+    instance. Durations are kept in streaming latency histograms. Phases
+    called from within other phases, e.g. handle_receiver() from
+    get_observations(), are included in both.
+
+    The ratio of simulated time to wall-clock time is reported too.
+    Summaries are exported every report_every steps as JSON lines to
+    json_path and/or as scalars to a tensorboardX summary_writer.
+
+    When disabled, the timing closures are removed and step()/reset() only
+    delegate to the wrapped controller.
+    """
+    def __init__(self,
+                 controller,
+                 enabled=True,
+                 report_every=1000,
+                 json_path=None,
+                 summary_writer=None):
+        """
+        :param controller: The environment to profile, possibly wrapped
+        :param enabled: Whether profiling starts enabled, defaults to True
+        :param report_every: Export a summary every that many steps,
+            defaults to 1000, None disables exporting
+        :param json_path: Path of a file to append JSON summaries to,
+            defaults to None
+        :param summary_writer: A tensorboardX SummaryWriter to log
+            summaries to, defaults to None
+        """
+        self.controller = controller
+        self.report_every = report_every
+        self.json_path = json_path
+        self.summary_writer = summary_writer
+
+        # The innermost environment holds the phases and the simulation time
+        self.env = controller
+        while isinstance(getattr(self.env, "controller", None),
+                         DeepbotsSupervisorEnv):
+            self.env = self.env.controller
+
+        self.enabled = False
+        self.histograms = {}
+        self.steps = 0
+        self._wall_start = None
+        self._sim_start = None
+        self._installed = []
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        """
+        Starts profiling, clearing previous measurements.
+        """
+        if self.enabled:
+            return
+        self.histograms = {
+            phase.lstrip("_"): LatencyHistogram()
+            for phase in ("step", "reset") + PROFILED_PHASES
+        }
+        for phase in PROFILED_PHASES:
+            method = getattr(self.env, phase, None)
+            if method is not None:
+                setattr(self.env, phase,
+                        _timed(method, self.histograms[phase.lstrip("_")]))
+                self._installed.append(phase)
+        self.steps = 0
+        self._wall_start = time.perf_counter()
+        self._sim_start = self._sim_time()
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stops profiling and removes the timing closures.
+        """
+        for phase in self._installed:
+            delattr(self.env, phase)
+        self._installed = []
+        self.enabled = False
+
+    def step(self, action):
+        if not self.enabled:
+            return self.controller.step(action)
+
+        start = time.perf_counter()
+        result = self.controller.step(action)
+        self.histograms["step"].record(time.perf_counter() - start)
+
+        self.steps += 1
+        if self.report_every and self.steps % self.report_every == 0:
+            self.report()
+        return result
+
+    def reset(self):
+        if not self.enabled:
+            return self.controller.reset()
+
+        start = time.perf_counter()
+        observations = self.controller.reset()
+        self.histograms["reset"].record(time.perf_counter() - start)
+        return observations
+
+    def is_done(self):
+        return self.controller.is_done()
+
+    def get_observations(self):
+        return self.controller.get_observations()
+
+    def get_reward(self, action):
+        return self.controller.get_reward(action)
+
+    def get_info(self):
+        return self.controller.get_info()
+
+    def close(self):
+        """
+        Stops the stepping thread, see enable_async(), stops profiling and
+        closes the wrapped environment.
+        """
+        self.disable_async()
+        self.disable()
+        self.controller.close()
+
+    def summary(self):
+        """
+        :return: dict, the steps profiled, the simulated to wall-clock time
+            ratio and a latency summary per phase that was called. If
+            profiling was never enabled, the summary is empty, with zero
+            steps and no phases.
+        """
+        if self._wall_start is None:
+            return {
+                "steps": 0,
+                "wall_time_s": 0.0,
+                "sim_wall_ratio": None,
+                "phases": {},
+            }
+
+        wall_elapsed = time.perf_counter() - self._wall_start
+        sim_time = self._sim_time()
+        ratio = None
+        if (sim_time is not None and self._sim_start is not None
+                and wall_elapsed > 0):
+            ratio = (sim_time - self._sim_start) / wall_elapsed
+        return {
+            "steps": self.steps,
+            "wall_time_s": wall_elapsed,
+            "sim_wall_ratio": ratio,
+            "phases": {
+                phase: histogram.summary()
+                for phase, histogram in self.histograms.items()
+                if histogram.count
+            },
+        }
+
+    def report(self):
+        """
+        Exports the current summary to the JSON file and/or the summary
+        writer.
+
+        :return: dict, the summary exported
+        """
+        summary = self.summary()
+        if self.json_path is not None:
+            with open(self.json_path, "a") as json_file:
+                json_file.write(json.dumps(summary) + "\n")
+        if self.summary_writer is not None:
+            for phase, phase_summary in summary["phases"].items():
+                for key in ("mean_us", "p50_us", "p99_us"):
+                    self.summary_writer.add_scalar(
+                        "Profiler/{}/{}".format(phase, key),
+                        phase_summary[key], self.steps)
+            if summary["sim_wall_ratio"] is not None:
+                self.summary_writer.add_scalar("Profiler/Sim Wall Ratio",
+                                               summary["sim_wall_ratio"],
+                                               self.steps)
+        return summary
+
+    def _sim_time(self):
+        try:
+            return self.env.getTime()
+        except Exception:
+            # e.g. an environment that is not connected to a simulator
+            return None
+
+
+def _timed(function, histogram):
+    perf_counter = time.perf_counter
+    record = histogram.record
+
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record(perf_counter() - start)
+
+    return timed
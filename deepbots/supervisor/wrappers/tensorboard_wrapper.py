@@ -1,18 +1,45 @@
+import queue
+import threading
+import time
+from warnings import warn
+
 import numpy as np
-from tensorboardX import SummaryWriter
 
 from deepbots.supervisor.controllers.deepbots_supervisor_env import \
     DeepbotsSupervisorEnv
+from deepbots.supervisor.wrappers.rolling_window_stats import \
+    RollingWindowStats
 
 
 class TensorboardLogger(DeepbotsSupervisorEnv):
+    """
+    Wrapper that logs actions, observations, rewards and scores of the
+    wrapped controller to TensorBoard.
+
+    Summaries are handed to a background writer thread through a bounded
+    queue, so step() never waits for the disk. The writer flushes every
+    flush_secs seconds, every flush_items summaries and on flush()/close().
+    When the queue backs up, histograms are dropped first, once it is
+    half full, and scalars only when it is full; the numbers of dropped
+    summaries are kept in dropped_histograms and dropped_scalars.
+
+    Scores are averaged over the windows provided with rolling statistics,
+    see RollingWindowStats, so the cost of reset() and the memory used stay
+    constant during long training runs. Besides the mean, the standard
+    deviation, minimum and maximum of every window can be logged through
+    window_stats.
+    """
     def __init__(self,
                  controller,
                  log_dir="logs/results",
                  v_action=0,
                  v_observation=0,
                  v_reward=0,
-                 windows=[10, 100, 200]):
+                 windows=[10, 100, 200],
+                 flush_secs=30,
+                 flush_items=1000,
+                 queue_size=10000,
+                 window_stats=("mean", )):
         self.controller = controller
 
         self.step_cntr = 0
@@ -20,41 +47,52 @@ class TensorboardLogger(DeepbotsSupervisorEnv):
         self.step_reset = 0
 
         self.score = 0
-        self.score_history = []
+        self.window_stats = tuple(window_stats)
+        self.score_stats = RollingWindowStats(
+            windows,
+            track_extrema="min" in self.window_stats
+            or "max" in self.window_stats)
 
         self.v_action = v_action
         self.v_observation = v_observation
         self.v_reward = v_reward
         self.windows = windows
 
-        self.file_writer = SummaryWriter(log_dir, flush_secs=30)
+        # Imported on first use, tensorboardX imports protobuf and is slow
+        # to import
+        from tensorboardX import SummaryWriter
+
+        self.file_writer = SummaryWriter(log_dir, flush_secs=flush_secs)
+
+        self.flush_secs = flush_secs
+        self.flush_items = flush_items
+        self.dropped_histograms = 0
+        self.dropped_scalars = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._histogram_limit = queue_size // 2
+        self._writer_thread = threading.Thread(target=self._write_loop,
+                                               name="TensorboardLogger",
+                                               daemon=True)
+        self._writer_thread.start()
 
     def step(self, action):
         observation, reward, is_done, info = self.controller.step(action)
 
         if (self.v_action > 1):
-            self.file_writer.add_histogram(
-                "Actions/Per Global Step",
-                action,
-                global_step=self.step_global)
+            self._add_histogram("Actions/Per Global Step", action,
+                                self.step_global)
 
         if (self.v_observation > 1):
-            self.file_writer.add_histogram(
-                "Observations/Per Global Step",
-                observation,
-                global_step=self.step_global)
+            self._add_histogram("Observations/Per Global Step", observation,
+                                self.step_global)
 
         if (self.v_reward > 1):
-            self.file_writer.add_scalar("Rewards/Per Global Step", reward,
-                                        self.step_global)
+            self._add_scalar("Rewards/Per Global Step", reward,
+                             self.step_global)
 
         if (is_done):
-            self.file_writer.add_scalar(
-                "Is Done/Per Reset step",
-                self.step_cntr,
-                global_step=self.step_reset)
-
-        self.file_writer.flush()
+            self._add_scalar("Is Done/Per Reset step", self.step_cntr,
+                             self.step_reset)
 
         self.score += reward
 
@@ -65,8 +103,6 @@ class TensorboardLogger(DeepbotsSupervisorEnv):
 
     def is_done(self):
         is_done = self.controller.is_done()
-
-        self.file_writer.flush()
         return is_done
 
     def get_observations(self):
@@ -85,26 +121,18 @@ class TensorboardLogger(DeepbotsSupervisorEnv):
     def reset(self):
 
         observations = self.controller.reset()
-        self.score_history.append(self.score)
+        self.score_stats.push(self.score)
 
         if (self.v_observation > 0):
-            self.file_writer.add_histogram(
-                "Observations/Per Reset",
-                observations,
-                global_step=self.step_reset)
+            self._add_histogram("Observations/Per Reset", observations,
+                                self.step_reset)
 
         if (self.v_reward > 0):
-            self.file_writer.add_scalar(
-                "Score/Per Reset", self.score, global_step=self.step_reset)
+            self._add_scalar("Score/Per Reset", self.score, self.step_reset)
 
             for window in self.windows:
                 if self.step_reset > window:
-                    self.file_writer.add_scalar(
-                        "Score/With Window {}".format(window),
-                        np.average(self.score_history[-window:]),
-                        global_step=self.step_reset - window)
-
-        self.file_writer.flush()
+                    self._add_window_scalars(window)
 
         self.step_reset += 1
         self.step_cntr = 0
@@ -112,10 +140,106 @@ class TensorboardLogger(DeepbotsSupervisorEnv):
 
         return observations
 
+    @property
+    def score_history(self):
+        """
+        :return: np.ndarray, the scores of the last episodes, up to the
+            largest window
+        """
+        return self.score_stats.values()
+
+    def _add_window_scalars(self, window):
+        global_step = self.step_reset - window
+        stats = self.score_stats
+        if "mean" in self.window_stats:
+            self._add_scalar("Score/With Window {}".format(window),
+                             stats.mean(window), global_step)
+        if "std" in self.window_stats:
+            self._add_scalar("Score/Std With Window {}".format(window),
+                             stats.std(window), global_step)
+        if "min" in self.window_stats:
+            self._add_scalar("Score/Min With Window {}".format(window),
+                             stats.min(window), global_step)
+        if "max" in self.window_stats:
+            self._add_scalar("Score/Max With Window {}".format(window),
+                             stats.max(window), global_step)
+
     def flush(self):
-        if self._file_writer is not None:
-            self._file_writer.flush()
+        """
+        Waits for the queued summaries to be written and flushes them to
+        disk.
+        """
+        if self.file_writer is not None:
+            self._queue.join()
+            self.file_writer.flush()
 
     def close(self):
-        if self._file_writer is not None:
-            self._file_writer.close()
+        """
+        Stops the stepping thread, see enable_async(), writes the queued
+        summaries, stops the writer thread, closes the event file and closes
+        the wrapped environment.
+        """
+        self.disable_async()
+        if self.file_writer is not None:
+            self._queue.put(None)
+            self._writer_thread.join()
+            self.file_writer.close()
+            self.file_writer = None
+        self.controller.close()
+
+    def _add_scalar(self, tag, value, global_step):
+        try:
+            self._queue.put_nowait((False, tag, value, global_step))
+        except queue.Full:
+            self.dropped_scalars += 1
+
+    def _add_histogram(self, tag, values, global_step):
+        if self._queue.qsize() >= self._histogram_limit:
+            self.dropped_histograms += 1
+            return
+        try:
+            # A copy is queued since values may be a reused buffer
+            self._queue.put_nowait((True, tag, np.array(values), global_step))
+        except queue.Full:
+            self.dropped_histograms += 1
+
+    def _write_loop(self):
+        """
+        Writes the queued summaries, flushing on the time and size budgets.
+        """
+        last_flush = time.monotonic()
+        pending = 0
+        while True:
+            timeout = max(0.0, last_flush + self.flush_secs - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+
+            if item is None:
+                self._queue.task_done()
+                break
+            if item:
+                is_histogram, tag, value, global_step = item
+                try:
+                    if is_histogram:
+                        self.file_writer.add_histogram(
+                            tag, value, global_step=global_step)
+                    else:
+                        self.file_writer.add_scalar(tag,
+                                                    value,
+                                                    global_step=global_step)
+                    pending += 1
+                except Exception as exception:
+                    warn("TensorboardLogger could not write {}: {}".format(
+                        tag, exception))
+                finally:
+                    self._queue.task_done()
+
+            if pending and (pending >= self.flush_items or
+                            time.monotonic() - last_flush >= self.flush_secs):
+                self.file_writer.flush()
+                pending = 0
+                last_flush = time.monotonic()
+            elif not pending:
+                last_flush = time.monotonic()
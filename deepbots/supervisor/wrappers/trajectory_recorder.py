@@ -0,0 +1,65 @@
+from deepbots.supervisor.controllers.deepbots_supervisor_env import \
+    DeepbotsSupervisorEnv
+from deepbots.trajectories.trajectory_writer import TrajectoryWriter
+
+
+class TrajectoryRecorder(DeepbotsSupervisorEnv):
+    """
+    Wrapper that records every reset and transition of the wrapped
+    environment to disk with a TrajectoryWriter, for offline RL and
+    debugging. The recording is read back with
+    deepbots.trajectories.TrajectoryReader.
+
+    Observations and actions must be numeric arrays of fixed shape, the
+    numeric values of the info dicts are recorded too. close() must be
+    called at the end to finish the recording.
+    """
+    def __init__(self,
+                 controller,
+                 path,
+                 max_chunk_bytes=64 * 2**20,
+                 compress=False,
+                 fsync=True):
+        """
+        :param controller: The environment to record
+        :param path: The directory to record to, see TrajectoryWriter
+        :param max_chunk_bytes: The size of every chunk file, defaults to
+            64 MiB
+        :param compress: Whether finished chunks are compressed, defaults
+            to False
+        :param fsync: Whether finished chunks are fsynced, defaults to True
+        """
+        self.controller = controller
+        self.writer = TrajectoryWriter(path, max_chunk_bytes, compress,
+                                       fsync)
+
+    def step(self, action):
+        observation, reward, is_done, info = self.controller.step(action)
+        self.writer.step(observation, action, reward, is_done, info)
+        return observation, reward, is_done, info
+
+    def reset(self):
+        observations = self.controller.reset()
+        self.writer.reset(observations)
+        return observations
+
+    def is_done(self):
+        return self.controller.is_done()
+
+    def get_observations(self):
+        return self.controller.get_observations()
+
+    def get_reward(self, action):
+        return self.controller.get_reward(action)
+
+    def get_info(self):
+        return self.controller.get_info()
+
+    def close(self):
+        """
+        Stops the stepping thread, see enable_async(), finishes the
+        recording and closes the wrapped environment.
+        """
+        self.disable_async()
+        self.writer.close()
+        self.controller.close()
@@ -0,0 +1,7 @@
+from deepbots._lazy import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    "Episode": "deepbots.trajectories.trajectory_reader",
+    "TrajectoryReader": "deepbots.trajectories.trajectory_reader",
+    "TrajectoryWriter": "deepbots.trajectories.trajectory_writer",
+})
@@ -0,0 +1,164 @@
+import json
+import os
+
+import numpy as np
+
+from deepbots.trajectories.trajectory_writer import MANIFEST
+
+
+class Episode:
+    """
+    The rows of one recorded episode. The arrays are views on the
+    memory-mapped chunks, unless the episode spans several chunks or they
+    are compressed.
+
+    observations holds the reset observation followed by the observation of
+    every step, so it is one longer than actions, rewards, dones and infos.
+    """
+    def __init__(self, index, rows):
+        """
+        :param index: The index of the episode in the recording
+        :param rows: The structured array of the rows of the episode
+        """
+        self.index = index
+        self.rows = rows
+
+    def __len__(self):
+        return max(len(self.rows) - 1, 0)
+
+    @property
+    def observations(self):
+        return self.rows["observation"]
+
+    @property
+    def actions(self):
+        return self.rows["action"][1:]
+
+    @property
+    def rewards(self):
+        return self.rows["reward"][1:]
+
+    @property
+    def dones(self):
+        return self.rows["done"][1:]
+
+    @property
+    def infos(self):
+        """
+        :return: The structured array of the recorded info values, None if
+            no info values were recorded
+        """
+        if "info" not in self.rows.dtype.names:
+            return None
+        return self.rows["info"][1:]
+
+
+class TrajectoryReader:
+    """
+    Reads a recording made by TrajectoryWriter or the TrajectoryRecorder
+    wrapper. Episodes are loaded lazily, chunk files are memory-mapped when
+    first needed, so iterating a recording larger than memory is possible.
+
+    Only the rows listed in the manifest are read, i.e. the finished chunks
+    of a recording still in progress or interrupted.
+    """
+    def __init__(self, path):
+        """
+        :param path: The directory of the recording
+        """
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as manifest_file:
+            manifest = json.load(manifest_file)
+        self.rows = manifest["rows"]
+        self.episode_starts = manifest["episode_starts"]
+        self._files = [chunk["file"] for chunk in manifest["chunks"]]
+        self._chunk_rows = [chunk["rows"] for chunk in manifest["chunks"]]
+        self._chunk_offsets = np.cumsum([0] + self._chunk_rows)
+        self._chunks = {}
+
+    def __len__(self):
+        return len(self.episode_starts)
+
+    def __getitem__(self, index):
+        """
+        :param index: The index of the episode, negative indices count from
+            the last one
+        :return: Episode
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Episode index out of range")
+        start = self.episode_starts[index]
+        if index + 1 < len(self):
+            stop = self.episode_starts[index + 1]
+        else:
+            stop = self.rows
+        return Episode(index, self.read_rows(start, stop))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def episode_lengths(self):
+        """
+        :return: np.ndarray, the number of steps of every episode, computed
+            without reading the chunks
+        """
+        return np.diff(self.episode_starts + [self.rows]) - 1
+
+    @property
+    def dtype(self):
+        """
+        :return: The dtype of the recorded rows, None if nothing was recorded
+        """
+        if not self._files:
+            return None
+        return self._chunk(0).dtype
+
+    def read_rows(self, start, stop):
+        """
+        Reads a range of rows, regardless of episode boundaries.
+
+        :param start: The index of the first row
+        :param stop: The index after the last row
+        :return: The structured array of the rows, a view if they are in a
+            single memory-mapped chunk
+        """
+        start = max(start, 0)
+        stop = min(stop, self.rows)
+        first = int(np.searchsorted(self._chunk_offsets, start, "right")) - 1
+        parts = []
+        index = first
+        while start < stop:
+            offset = self._chunk_offsets[index]
+            end = min(stop, self._chunk_offsets[index + 1])
+            parts.append(self._chunk(index)[start - offset:end - offset])
+            start = end
+            index += 1
+        if not parts:
+            return np.zeros(0, dtype=self.dtype)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts)
+
+    def _chunk(self, index):
+        chunk = self._chunks.get(index)
+        if chunk is None:
+            file_path = os.path.join(self.path, self._files[index])
+            if file_path.endswith(".npz"):
+                # Compressed chunks are read in full, only the last one is
+                # kept in memory
+                with np.load(file_path) as archive:
+                    chunk = archive["rows"]
+                self._chunks = {
+                    key: value
+                    for key, value in self._chunks.items()
+                    if isinstance(value, np.memmap)
+                }
+            else:
+                chunk = np.load(file_path, mmap_mode="r")
+            chunk = chunk[:self._chunk_rows[index]]
+            self._chunks[index] = chunk
+        return chunk
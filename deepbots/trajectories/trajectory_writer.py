@@ -0,0 +1,298 @@
+import json
+import os
+import queue
+import threading
+from warnings import warn
+
+import numpy as np
+
+MANIFEST = "manifest.json"
+
+
+def _chunk_file(index):
+    return "chunk_{:05d}.npy".format(index)
+
+
+def _as_array(value, name):
+    array = np.asarray(value)
+    if array.dtype.kind not in "biuf":
+        raise TypeError("The {} must be numeric to be recorded, got dtype "
+                        "{}".format(name, array.dtype))
+    return array
+
+
+class TrajectoryWriter:
+    """
+    Streams transitions to disk as a directory of memory-mapped .npy
+    chunks, so that long rollouts can be recorded without keeping them in
+    memory. See TrajectoryReader for reading them back.
+
+    Every reset and every step is stored as one row of a structured array
+    with the fields episode, first (True for the rows of reset()), done,
+    reward, observation, action and, if the info dicts hold numeric values,
+    info. The schema is inferred from the first reset observation and the
+    first step: observations and actions must be numeric arrays of fixed
+    shape, non-numeric info values are not recorded.
+
+    Rows are written directly into a preallocated chunk file of
+    max_chunk_bytes. When it is full, writing moves on to a spare chunk
+    prepared in advance, while a background thread flushes, fsyncs and
+    optionally compresses the finished chunk and updates the manifest, so
+    that step() does not wait on disk. Rows of the current chunk are only
+    listed in the manifest once it is finished or the writer is closed.
+    """
+    def __init__(self, path, max_chunk_bytes=64 * 2**20, compress=False,
+                 fsync=True):
+        """
+        :param path: The directory to record to, created if needed, it must
+            not contain a recording already
+        :param max_chunk_bytes: The size of every chunk file, defaults to
+            64 MiB
+        :param compress: Whether finished chunks are compressed to .npz
+            files, which are smaller but cannot be memory-mapped by the
+            reader, defaults to False
+        :param fsync: Whether finished chunks are fsynced, defaults to True
+        """
+        if os.path.exists(os.path.join(path, MANIFEST)):
+            raise FileExistsError(
+                "{} already contains a recording".format(path))
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.max_chunk_bytes = max_chunk_bytes
+        self.compress = compress
+        self.fsync = fsync
+
+        self.dtype = None
+        self.rows = 0
+        self.episode_starts = []
+        self.info_keys = ()
+        self.rows_per_chunk = None
+
+        self._pending_reset = None
+        self._chunk = None
+        self._chunk_index = 0
+        self._row = 0
+        self._manifest_chunks = []
+        self._tasks = queue.Queue()
+        self._spares = queue.Queue()
+        self._thread = None
+        self._error = None
+        self._closed = False
+
+    def reset(self, observation):
+        """
+        Records the first observation of a new episode.
+
+        :param observation: The observation returned by reset()
+        """
+        if self.dtype is None:
+            self._pending_reset = np.array(observation)
+        else:
+            self._write_row(True, observation)
+
+    def step(self, observation, action, reward, done, info):
+        """
+        Records a transition of the current episode.
+
+        :param observation: The observation returned by step()
+        :param action: The action passed to step()
+        :param reward: The reward returned by step()
+        :param done: Whether the episode is done
+        :param info: The info dict returned by step(), may be None
+        """
+        if self.dtype is None:
+            if self._pending_reset is None:
+                raise RuntimeError(
+                    "reset() must be recorded before the first step()")
+            self._open(observation, action, info)
+            self._write_row(True, self._pending_reset)
+            self._pending_reset = None
+        self._write_row(False, observation, action, reward, done, info)
+
+    def close(self):
+        """
+        Finishes the current chunk, waits for the background thread and
+        writes the final manifest.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is None:
+            self._write_manifest([], [])
+            return
+
+        if self._row:
+            self._tasks.put(("finish", self._chunk, self._chunk_index,
+                             self._row, list(self.episode_starts)))
+        else:
+            self._tasks.put(("discard", self._chunk, self._chunk_index))
+        self._chunk = None
+        self._tasks.put(None)
+        self._thread.join()
+        # The spare chunk prepared for the next rollover is not needed
+        while not self._spares.empty():
+            self._discard(self._spares.get(), self._chunk_index + 1)
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _open(self, observation, action, info):
+        observation = _as_array(observation, "observation")
+        action = _as_array(action, "action")
+        info_dtype = []
+        skipped = []
+        for key, value in (info or {}).items():
+            value = np.asarray(value)
+            if value.dtype.kind in "biuf":
+                info_dtype.append((str(key), value.dtype.str, value.shape))
+            else:
+                skipped.append(key)
+        if skipped:
+            warn("Non-numeric info values are not recorded: {}".format(
+                ", ".join(map(str, skipped))))
+
+        dtype = [
+            ("episode", "<i8"),
+            ("first", "?"),
+            ("done", "?"),
+            ("reward", "<f8"),
+            ("observation", observation.dtype.str, observation.shape),
+            ("action", action.dtype.str, action.shape),
+        ]
+        if info_dtype:
+            dtype.append(("info", info_dtype))
+        self.dtype = np.dtype(dtype)
+        self.info_keys = tuple(key for key, _, _ in info_dtype)
+        self.rows_per_chunk = max(1,
+                                  self.max_chunk_bytes // self.dtype.itemsize)
+
+        self._set_chunk(self._create_chunk(0))
+        self._thread = threading.Thread(target=self._background_loop,
+                                        name="TrajectoryWriter",
+                                        daemon=True)
+        self._thread.start()
+        self._tasks.put(("spare", 1))
+
+    def _set_chunk(self, chunk):
+        self._chunk = chunk
+        self._episode = chunk["episode"]
+        self._first = chunk["first"]
+        self._done = chunk["done"]
+        self._reward = chunk["reward"]
+        self._observation = chunk["observation"]
+        self._action = chunk["action"]
+        self._info = chunk["info"] if self.info_keys else None
+
+    def _write_row(self,
+                   first,
+                   observation,
+                   action=None,
+                   reward=0.0,
+                   done=False,
+                   info=None):
+        if self._row == self.rows_per_chunk:
+            self._rollover()
+        row = self._row
+        if first:
+            self.episode_starts.append(self.rows)
+        # Chunks are created zero-filled, so reset rows skip action and info
+        self._episode[row] = len(self.episode_starts) - 1
+        self._first[row] = first
+        self._done[row] = done
+        self._reward[row] = reward
+        self._observation[row] = observation
+        if action is not None:
+            self._action[row] = action
+        if info and self._info is not None:
+            info_row = self._info[row]
+            for key in self.info_keys:
+                if key in info:
+                    info_row[key] = info[key]
+        self._row += 1
+        self.rows += 1
+
+    def _rollover(self):
+        self._raise_error()
+        self._tasks.put(("finish", self._chunk, self._chunk_index, self._row,
+                         list(self.episode_starts)))
+        self._chunk_index += 1
+        chunk = self._spares.get()
+        if chunk is None:
+            self._raise_error()
+        self._set_chunk(chunk)
+        self._row = 0
+        self._tasks.put(("spare", self._chunk_index + 1))
+
+    def _create_chunk(self, index):
+        return np.lib.format.open_memmap(os.path.join(self.path,
+                                                      _chunk_file(index)),
+                                         mode="w+",
+                                         dtype=self.dtype,
+                                         shape=(self.rows_per_chunk, ))
+
+    def _background_loop(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            try:
+                if task[0] == "spare":
+                    self._spares.put(self._create_chunk(task[1]))
+                elif task[0] == "finish":
+                    self._finish_chunk(*task[1:])
+                else:
+                    self._discard(*task[1:])
+            except Exception as error:
+                if self._error is None:
+                    self._error = error
+                if task[0] == "spare":
+                    # Unblock the writer, which raises the error
+                    self._spares.put(None)
+
+    def _finish_chunk(self, chunk, index, rows, episode_starts):
+        file_name = _chunk_file(index)
+        chunk_path = os.path.join(self.path, file_name)
+        chunk.flush()
+        if self.compress:
+            file_name = file_name[:-len(".npy")] + ".npz"
+            np.savez_compressed(os.path.join(self.path, file_name),
+                                rows=chunk[:rows])
+            del chunk
+            os.remove(chunk_path)
+            chunk_path = os.path.join(self.path, file_name)
+        else:
+            del chunk
+        if self.fsync:
+            with open(chunk_path, "rb+") as chunk_file:
+                os.fsync(chunk_file.fileno())
+
+        self._manifest_chunks.append({"file": file_name, "rows": rows})
+        self._write_manifest(self._manifest_chunks, episode_starts)
+
+    def _discard(self, chunk, index):
+        if chunk is not None:
+            del chunk
+            os.remove(os.path.join(self.path, _chunk_file(index)))
+
+    def _write_manifest(self, chunks, episode_starts):
+        rows = sum(chunk["rows"] for chunk in chunks)
+        manifest = {
+            "version": 1,
+            "rows": rows,
+            "chunks": chunks,
+            "episode_starts": [start for start in episode_starts
+                               if start < rows],
+        }
+        temporary_path = os.path.join(self.path, MANIFEST + ".tmp")
+        with open(temporary_path, "w") as manifest_file:
+            json.dump(manifest, manifest_file)
+        os.replace(temporary_path, os.path.join(self.path, MANIFEST))
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Writing the recording failed") from error
@@ -0,0 +1,5 @@
+from deepbots._lazy import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    "DeepbotsVectorEnv": "deepbots.vector.subproc_vector_env",
+})
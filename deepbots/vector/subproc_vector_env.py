@@ -0,0 +1,294 @@
+import multiprocessing as mp
+import os
+import traceback
+from copy import deepcopy
+
+import numpy as np
+from gym.error import (AlreadyPendingCallError, ClosedEnvironmentError,
+                       NoAsyncCallError)
+from gym.vector import VectorEnv
+from gym.vector.utils import concatenate, create_empty_array
+
+from deepbots.launcher.heartbeat import HEARTBEAT_FILE_VARIABLE
+
+
+class DeepbotsVectorEnv(VectorEnv):
+    """
+    A gym VectorEnv that drives several deepbots supervisor environments,
+    each one running in its own worker process as an extern controller of
+    its own Webots instance.
+
+    Every worker process sets the WEBOTS_CONTROLLER_URL environment variable
+    to its controller URL, e.g. "tcp://localhost:1234/supervisor", before
+    creating its environment, so each environment connects to a different
+    Webots instance. Commands and results are exchanged through pipes and
+    the observations of all environments are stacked in preallocated NumPy
+    arrays.
+
+    Environments that are done are reset automatically by their worker, the
+    observation returned is then the first observation of the new episode
+    and the last observation of the finished one is stored in the info dict
+    under "terminal_observation".
+
+    Since only the worker processes import the Webots controller module,
+    a stand-in controller module can be used by putting it on the PYTHONPATH
+    of the workers, e.g. to run in CI without Webots.
+    """
+    def __init__(self,
+                 env_fns,
+                 controller_urls=None,
+                 heartbeat_files=None,
+                 observation_space=None,
+                 action_space=None,
+                 context="spawn",
+                 copy=True):
+        """
+        Starts one worker process per environment.
+
+        :param env_fns: list of callables, each one creates a supervisor
+            environment, e.g. a DeepbotsSupervisorEnv subclass. With the
+            "spawn" context they must be picklable, i.e. module-level
+            functions or classes.
+        :param controller_urls: list of extern controller URLs, one per
+            environment, defaults to None, i.e. the WEBOTS_CONTROLLER_URL of
+            this process is inherited by the workers
+        :param heartbeat_files: list of heartbeat files, one per
+            environment, set as DEEPBOTS_HEARTBEAT_FILE in the workers so
+            that their environments report their steps, e.g. the
+            heartbeat_files of a WebotsPool, defaults to None
+        :param observation_space: The observation space of a single
+            environment, defaults to None, i.e. queried from the first worker
+        :param action_space: The action space of a single environment,
+            defaults to None, i.e. queried from the first worker
+        :param context: The multiprocessing start method, defaults to "spawn"
+            which avoids forking a process that may hold Webots resources
+        :param copy: Whether reset() and step() return copies of the stacked
+            observations, defaults to True
+        """
+        if controller_urls is not None and len(controller_urls) != len(
+                env_fns):
+            raise ValueError("controller_urls must contain one URL per "
+                             "environment, got {} for {} environments".format(
+                                 len(controller_urls), len(env_fns)))
+        if controller_urls is None:
+            controller_urls = [None] * len(env_fns)
+        if heartbeat_files is not None and len(heartbeat_files) != len(
+                env_fns):
+            raise ValueError("heartbeat_files must contain one file per "
+                             "environment, got {} for {} environments".format(
+                                 len(heartbeat_files), len(env_fns)))
+        if heartbeat_files is None:
+            heartbeat_files = [None] * len(env_fns)
+
+        ctx = mp.get_context(context)
+        self.parent_pipes, self.processes = [], []
+        for index, (env_fn, controller_url, heartbeat_file) in enumerate(
+                zip(env_fns, controller_urls, heartbeat_files)):
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                name="DeepbotsVectorEnvWorker-{}".format(index),
+                args=(child_pipe, parent_pipe, env_fn, controller_url,
+                      heartbeat_file),
+                daemon=True)
+            process.start()
+            child_pipe.close()
+            self.parent_pipes.append(parent_pipe)
+            self.processes.append(process)
+
+        if observation_space is None or action_space is None:
+            self.parent_pipes[0].send(("spaces", None))
+            spaces = self._receive([self.parent_pipes[0]])[0]
+            if observation_space is None:
+                observation_space = spaces[0]
+            if action_space is None:
+                action_space = spaces[1]
+
+        super(DeepbotsVectorEnv,
+              self).__init__(num_envs=len(env_fns),
+                             observation_space=observation_space,
+                             action_space=action_space)
+
+        self.copy = copy
+        self.observations = create_empty_array(self.single_observation_space,
+                                               n=self.num_envs,
+                                               fn=np.zeros)
+        self._pending = None
+
+    def reset_async(self):
+        """
+        Sends the reset command to all workers without waiting.
+        """
+        self._assert_is_running()
+        if self._pending is not None:
+            raise AlreadyPendingCallError(
+                "Calling reset_async while waiting for a pending call to "
+                "{} to complete".format(self._pending), self._pending)
+        for pipe in self.parent_pipes:
+            pipe.send(("reset", None))
+        self._pending = "reset"
+
+    def reset_wait(self, **kwargs):
+        """
+        Waits for all workers to reset.
+
+        :return: The stacked first observations of all environments
+        """
+        self._assert_pending("reset")
+        observations = self._receive(self.parent_pipes)
+
+        concatenate(observations, self.observations,
+                    self.single_observation_space)
+        return deepcopy(self.observations) if self.copy else self.observations
+
+    def step_async(self, actions):
+        """
+        Sends one action to each worker without waiting.
+
+        :param actions: Iterable of the actions of all environments
+        """
+        self._assert_is_running()
+        if self._pending is not None:
+            raise AlreadyPendingCallError(
+                "Calling step_async while waiting for a pending call to "
+                "{} to complete".format(self._pending), self._pending)
+        for pipe, action in zip(self.parent_pipes, actions):
+            pipe.send(("step", action))
+        self._pending = "step"
+
+    def step_wait(self):
+        """
+        Waits for all workers to step.
+
+        :return: (observations, rewards, dones, infos), the stacked
+            observations, arrays of rewards and dones and a list of infos
+        """
+        self._assert_pending("step")
+        results = self._receive(self.parent_pipes)
+
+        observations, rewards, dones, infos = zip(*results)
+        concatenate(observations, self.observations,
+                    self.single_observation_space)
+        return (
+            deepcopy(self.observations) if self.copy else self.observations,
+            np.array(rewards, dtype=np.float64),
+            np.array(dones, dtype=np.bool_),
+            list(infos),
+        )
+
+    def close_extras(self, timeout=None, terminate=False):
+        """
+        Stops the worker processes.
+
+        :param timeout: Seconds to wait for each worker to exit before it is
+            terminated, defaults to None, i.e. wait indefinitely
+        :param terminate: Whether to terminate the workers right away,
+            defaults to False
+        """
+        if not terminate:
+            if self._pending is not None:
+                try:
+                    self._receive(self.parent_pipes)
+                except RuntimeError:
+                    pass
+            for pipe in self.parent_pipes:
+                try:
+                    pipe.send(("close", None))
+                except (BrokenPipeError, OSError):
+                    pass
+            for process in self.processes:
+                process.join(timeout)
+
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        for pipe in self.parent_pipes:
+            pipe.close()
+        for process in self.processes:
+            process.join()
+
+    def _receive(self, pipes):
+        """
+        Receives one reply from every pipe, even if a worker failed, so that
+        no stale reply is left for the next call, and clears the pending
+        call.
+
+        :raises RuntimeError: The error of the first worker that failed
+        """
+        results = []
+        error = None
+        for index, pipe in enumerate(pipes):
+            try:
+                result, success = pipe.recv()
+            except (EOFError, OSError):
+                result, success = None, False
+                if error is None:
+                    error = RuntimeError(
+                        "Worker {} of DeepbotsVectorEnv exited unexpectedly, "
+                        "e.g. because its Webots instance was closed".format(
+                            index))
+            else:
+                if not success and error is None:
+                    error = RuntimeError(
+                        "Worker {} of DeepbotsVectorEnv raised an exception:"
+                        "\n{}".format(index, result))
+            results.append(result)
+        self._pending = None
+        if error is not None:
+            raise error
+        return results
+
+    def _assert_is_running(self):
+        if self.closed:
+            raise ClosedEnvironmentError(
+                "Trying to operate on DeepbotsVectorEnv after it was closed")
+
+    def _assert_pending(self, command):
+        self._assert_is_running()
+        if self._pending != command:
+            raise NoAsyncCallError(
+                "Calling {0}_wait without any prior call to "
+                "{0}_async".format(command), command)
+
+
+def _worker(pipe, parent_pipe, env_fn, controller_url, heartbeat_file):
+    """
+    Runs a supervisor environment in a worker process, executing the
+    commands received through the pipe.
+    """
+    parent_pipe.close()
+    if controller_url is not None:
+        os.environ["WEBOTS_CONTROLLER_URL"] = controller_url
+    if heartbeat_file is not None:
+        os.environ[HEARTBEAT_FILE_VARIABLE] = heartbeat_file
+
+    env = None
+    try:
+        env = env_fn()
+        while True:
+            command, data = pipe.recv()
+            if command == "step":
+                observation, reward, done, info = env.step(data)
+                if done:
+                    info = dict(info or {})
+                    # The environment may reuse the array in reset()
+                    info["terminal_observation"] = deepcopy(observation)
+                    observation = env.reset()
+                pipe.send(((observation, reward, done, info), True))
+            elif command == "reset":
+                pipe.send((env.reset(), True))
+            elif command == "spaces":
+                pipe.send(((env.observation_space, env.action_space), True))
+            elif command == "close":
+                break
+            else:
+                raise RuntimeError(
+                    "Received unknown command {}".format(command))
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        pipe.send((traceback.format_exc(), False))
+    finally:
+        if env is not None:
+            env.close()
+        pipe.close()